@@ -6,6 +6,10 @@ from typing import Any, Dict, List, NewType, Tuple
 import yaml
 
 from electricitymap.contrib.config.constants import EXCHANGE_FILENAME_ZONE_SEPARATOR
+from electricitymap.contrib.config.exchanges import (
+    ExchangeIndex,
+    generate_exchange_index,
+)
 
 ZoneKey = NewType("ZoneKey", str)
 Point = NewType("Point", Tuple[float, float])
@@ -71,6 +75,7 @@ for zone_key, zone_config in zones_config.items():
 
 ZONES_CONFIG = deepcopy(zones_config)
 EXCHANGES_CONFIG = deepcopy(exchanges_config)
+EXCHANGE_INDEX: ExchangeIndex = generate_exchange_index(EXCHANGES_CONFIG)
 CO2EQ_PARAMETERS_DIRECT = {**co2eq_parameters_all, **co2eq_parameters_direct}
 CO2EQ_PARAMETERS_LIFECYCLE = {**co2eq_parameters_all, **co2eq_parameters_lifecycle}
 CO2EQ_PARAMETERS = CO2EQ_PARAMETERS_LIFECYCLE  # Global LCA is the default
@@ -0,0 +1,81 @@
+"""
+Index of the exchanges of the config, built once when the config is loaded.
+
+Every exchange gets an integer id, its position among the sorted exchange
+keys, and the range its net flow is expected to lie in: its capacity widened
+by `CAPACITY_MARGIN` on both sides. Both directions of an exchange resolve to
+its id, with a flag telling whether the direction is reversed, i.e. whether
+its net flows change sign in the direction of the sorted key. Bounds are kept
+in sequences indexed by id, so that batches of events are checked with array
+lookups, and the last entry, `UNKNOWN_EXCHANGE`, doesn't bound anything.
+"""
+
+import math
+import sys
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+# Net flows may exceed the capacity of an interconnector by this fraction
+CAPACITY_MARGIN = 0.1
+# Id of exchanges that aren't in the config
+UNKNOWN_EXCHANGE = -1
+
+
+class ExchangeIndex(NamedTuple):
+    # sorted exchange keys, e.g. "DK-DK1->DK-DK2", by id
+    keys: Tuple[str, ...]
+    # exchange keys in both directions -> (id, reversed)
+    directions: Dict[str, Tuple[int, bool]]
+    # (min, max) capacities by id, None without capacity
+    capacities: Tuple[Optional[Tuple[float, float]], ...]
+    # bounds of net flows by id, followed by those of unknown exchanges
+    lower_bounds: Tuple[float, ...]
+    upper_bounds: Tuple[float, ...]
+
+    def resolve(self, exchange_key: str) -> Tuple[int, bool]:
+        """Returns the id of an exchange key in either direction, and whether it is reversed."""
+        return self.directions.get(exchange_key, (UNKNOWN_EXCHANGE, False))
+
+    def orient(self, zone_key1: str, zone_key2: str) -> Tuple[str, bool]:
+        """
+        Returns the sorted key of the exchange between two zones, and whether
+        `zone_key1 -> zone_key2` is its reverse direction.
+        """
+        exchange_id, reversed = self.resolve(f"{zone_key1}->{zone_key2}")
+        if exchange_id != UNKNOWN_EXCHANGE:
+            return self.keys[exchange_id], reversed
+        return "->".join(sorted((zone_key1, zone_key2))), zone_key1 > zone_key2
+
+    def is_within_capacity(self, exchange_key: str, net_flow: float) -> bool:
+        """Returns whether a net flow along `exchange_key` is within its capacity."""
+        exchange_id, reversed = self.resolve(exchange_key)
+        if reversed:
+            net_flow = -net_flow
+        return (
+            self.lower_bounds[exchange_id] <= net_flow <= self.upper_bounds[exchange_id]
+        )
+
+
+def generate_exchange_index(exchanges_config: Dict[str, Any]) -> ExchangeIndex:
+    keys = tuple(sys.intern(key) for key in sorted(exchanges_config))
+    directions: Dict[str, Tuple[int, bool]] = {}
+    capacities = []
+    lower_bounds, upper_bounds = [], []
+    for exchange_id, key in enumerate(keys):
+        zone_key1, zone_key2 = key.split("->")
+        directions[key] = (exchange_id, False)
+        directions[sys.intern(f"{zone_key2}->{zone_key1}")] = (exchange_id, True)
+        capacity = exchanges_config[key].get("capacity")
+        if capacity:
+            capacity = (float(min(capacity)), float(max(capacity)))
+            lower_bounds.append(capacity[0] - CAPACITY_MARGIN * abs(capacity[0]))
+            upper_bounds.append(capacity[1] + CAPACITY_MARGIN * abs(capacity[1]))
+        else:
+            capacity = None
+            lower_bounds.append(-math.inf)
+            upper_bounds.append(math.inf)
+        capacities.append(capacity)
+    lower_bounds.append(-math.inf)
+    upper_bounds.append(math.inf)
+    return ExchangeIndex(
+        keys, directions, tuple(capacities), tuple(lower_bounds), tuple(upper_bounds)
+    )
@@ -0,0 +1,213 @@
+"""
+Local, append-only Parquet storage of parser events, for backfills and offline
+analysis.
+
+Events are stored under `<root>/kind=<kind>/zone=<zone>/day=<YYYY-MM-DD>/`, one
+Parquet file per write and partition. Files are never modified: every row
+carries the sequence number of the write that produced it, and readers keep the
+last written row for each (zone, datetime, source). Writing the same events
+twice is therefore idempotent, and `compact` merges the files of a partition
+into one once they have accumulated.
+"""
+
+import os
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from electricitymap.contrib.config.constants import EXCHANGE_FILENAME_ZONE_SEPARATOR
+from electricitymap.contrib.lib.events import EVENT_COLUMNS, EVENT_LABELS, EventBatch
+
+SEQUENCE_COLUMN = "_seq"
+PARTITIONING = ds.partitioning(
+    pa.schema([("zone", pa.string()), ("day", pa.string())]), flavor="hive"
+)
+NS_PER_DAY = 24 * 3600 * 10**9
+
+
+def _zone_to_partition(key: str) -> str:
+    return key.replace("->", EXCHANGE_FILENAME_ZONE_SEPARATOR)
+
+
+def _to_ns(dt: Union[datetime, str]) -> int:
+    timestamp = pd.Timestamp(dt)
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.tz_convert("UTC")
+    return timestamp.value
+
+
+def _schema(kind: str) -> pa.Schema:
+    """
+    Schema of the stored files. Labels are stored as plain strings so that all
+    files share the same schema, Parquet dictionary-encodes them anyway.
+    """
+    return pa.schema(
+        [("datetime", pa.timestamp("ns", tz="UTC"))]
+        + [(column, pa.float64()) for column in EVENT_COLUMNS[kind]]
+        + [(field, pa.string()) for field in EVENT_LABELS[kind]]
+        + [(SEQUENCE_COLUMN, pa.int64())]
+    )
+
+
+def _to_table(events: EventBatch, seq: int) -> pa.Table:
+    table = events.to_arrow().append_column(
+        SEQUENCE_COLUMN, pa.array(np.full(len(events), seq, dtype=np.int64))
+    )
+    return table.cast(_schema(events.kind))
+
+
+class ParquetEventStore:
+    """
+    Parquet dataset of events partitioned by kind of event, zone and day.
+
+    >>> store = ParquetEventStore("data")
+    >>> store.write("production", fetch_production("FR"))
+    >>> store.read("production", zone_keys=["FR"], start=datetime(2022, 1, 1))
+    """
+
+    def __init__(self, root: Union[str, Path]):
+        self.root = Path(root)
+
+    def _kind_dir(self, kind: str) -> Path:
+        return self.root.joinpath(f"kind={kind}")
+
+    def write(
+        self, kind: str, events: Union[EventBatch, Sequence[Mapping]]
+    ) -> List[Path]:
+        """
+        Appends events to the store and returns the written files.
+        Events already in the store are overwritten by the new ones.
+        """
+        if not isinstance(events, EventBatch):
+            events = EventBatch.from_dicts(kind, list(events))
+        if not len(events):
+            return []
+
+        seq = time.time_ns()
+        table = _to_table(events, seq)
+        keys = events.labels[events.key_field]
+        days = events.datetimes // NS_PER_DAY
+        partitions = pd.DataFrame({"key": keys.codes, "day": days}).groupby(
+            ["key", "day"]
+        )
+
+        paths = []
+        for (code, day), positions in partitions.indices.items():
+            partition_dir = self._kind_dir(kind).joinpath(
+                f"zone={_zone_to_partition(keys.categories[code])}",
+                f"day={pd.Timestamp(day * NS_PER_DAY).date().isoformat()}",
+            )
+            part = table.take(pa.array(positions)).sort_by("datetime")
+            paths.append(self._write_part(partition_dir, part, seq))
+        return paths
+
+    @staticmethod
+    def _write_part(partition_dir: Path, table: pa.Table, seq: int) -> Path:
+        partition_dir.mkdir(parents=True, exist_ok=True)
+        name = f"part-{seq:020d}-{uuid.uuid4().hex[:8]}.parquet"
+        # Write to a temporary file first so that readers never see partial files
+        tmp_path = partition_dir.joinpath(f".{name}.tmp")
+        pq.write_table(table, tmp_path)
+        path = partition_dir.joinpath(name)
+        os.replace(tmp_path, path)
+        return path
+
+    def _dataset(self, kind: str) -> Optional[ds.Dataset]:
+        kind_dir = self._kind_dir(kind)
+        if not kind_dir.exists():
+            return None
+        return ds.dataset(
+            kind_dir,
+            schema=_schema(kind)
+            .append(pa.field("zone", pa.string()))
+            .append(pa.field("day", pa.string())),
+            format="parquet",
+            partitioning=PARTITIONING,
+        )
+
+    def read(
+        self,
+        kind: str,
+        zone_keys: Optional[Sequence[str]] = None,
+        start: Optional[Union[datetime, str]] = None,
+        end: Optional[Union[datetime, str]] = None,
+    ) -> EventBatch:
+        """
+        Reads the events of `zone_keys` (all zones when not given) with
+        `start <= datetime < end`. Naive datetimes are assumed to be UTC.
+        Zones and days outside of the query are pruned from the directory
+        structure, and row groups from the Parquet statistics.
+        """
+        dataset = self._dataset(kind)
+        if dataset is None:
+            return EventBatch.from_dicts(kind, [])
+
+        predicate = None
+
+        def add(expression):
+            nonlocal predicate
+            predicate = expression if predicate is None else predicate & expression
+
+        if zone_keys is not None:
+            add(ds.field("zone").isin([_zone_to_partition(k) for k in zone_keys]))
+        timestamp_type = pa.timestamp("ns", tz="UTC")
+        if start is not None:
+            start_ns = _to_ns(start)
+            add(ds.field("day") >= str(pd.Timestamp(start_ns).date()))
+            add(ds.field("datetime") >= pa.scalar(start_ns, type=timestamp_type))
+        if end is not None:
+            end_ns = _to_ns(end)
+            add(ds.field("day") <= str(pd.Timestamp(end_ns).date()))
+            add(ds.field("datetime") < pa.scalar(end_ns, type=timestamp_type))
+
+        df = dataset.to_table(filter=predicate).to_pandas()
+        return EventBatch.from_pandas(kind, self._deduplicate(kind, df))
+
+    @staticmethod
+    def _deduplicate(kind: str, df: pd.DataFrame) -> pd.DataFrame:
+        """Keeps the last written row of every (zone, datetime, source)."""
+        key_field = EVENT_LABELS[kind][0]
+        df = df.sort_values([SEQUENCE_COLUMN, "datetime"], kind="stable")
+        df = df.drop_duplicates([key_field, "datetime", "source"], keep="last")
+        return df.sort_values([key_field, "datetime"], kind="stable").set_index(
+            "datetime"
+        )
+
+    def compact(self, kind: str) -> int:
+        """
+        Merges the files of every partition of `kind` into a single file,
+        keeping only the last written events. Returns the number of files removed.
+        """
+        removed = 0
+        for partition_dir in sorted(self._kind_dir(kind).glob("zone=*/day=*")):
+            parts = sorted(partition_dir.glob("part-*.parquet"))
+            if len(parts) < 2:
+                continue
+            table = pa.concat_tables([pq.read_table(part) for part in parts])
+            df = self._deduplicate(kind, table.to_pandas())
+            # Compacted events keep the latest sequence number of the merged
+            # files, so that events written afterwards still take precedence.
+            seq = int(df[SEQUENCE_COLUMN].max())
+            events = EventBatch.from_pandas(kind, df)
+            self._write_part(partition_dir, _to_table(events, seq), seq)
+            for part in parts:
+                part.unlink()
+            removed += len(parts)
+        return removed
+
+    def zones(self, kind: str) -> Dict[str, List[str]]:
+        """Returns the days stored for every zone partition of `kind`."""
+        return {
+            zone_dir.name.split("=", 1)[1]: sorted(
+                day_dir.name.split("=", 1)[1] for day_dir in zone_dir.glob("day=*")
+            )
+            for zone_dir in sorted(self._kind_dir(kind).glob("zone=*"))
+        }
@@ -0,0 +1,236 @@
+"""
+Columnar batches of parser events.
+
+Parsers return lists of nested dictionaries, one per timestamp. `EventBatch`
+stores the same events column-wise: timestamps as int64 nanoseconds since the
+epoch (UTC), one fixed-order float64 column per value (NaN when missing) and
+the zone key, source and other labels as categoricals.
+
+Value columns are named after the flattened dictionary keys, e.g.
+`production.gas` or `storage.battery`, which is the layout the validators
+already expect.
+"""
+
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from electricitymap.contrib.config.constants import (
+    FORECASTED_PRODUCTION_MODES,
+    PRODUCTION_MODES,
+    STORAGE_MODES,
+)
+
+PRODUCTION_COLUMNS = [f"production.{mode}" for mode in PRODUCTION_MODES] + [
+    f"storage.{mode}" for mode in STORAGE_MODES
+]
+
+# Value columns of each kind of event, in their storage order
+EVENT_COLUMNS: Dict[str, List[str]] = {
+    "production": PRODUCTION_COLUMNS,
+    "consumption": ["consumption"],
+    "exchange": ["netFlow"],
+    "price": ["price"],
+    "consumptionForecast": ["value"],
+    "generationForecast": ["value"],
+    "exchangeForecast": ["netFlow"],
+    "productionPerModeForecast": [
+        f"production.{mode}" for mode in FORECASTED_PRODUCTION_MODES
+    ],
+}
+
+# Categorical fields of each kind of event. The first one identifies the zone
+# or the exchange the event belongs to.
+EVENT_LABELS: Dict[str, List[str]] = {
+    kind: (
+        ["sortedZoneKeys", "source"]
+        if kind in ("exchange", "exchangeForecast")
+        else ["zoneKey", "source"]
+    )
+    for kind in EVENT_COLUMNS
+}
+EVENT_LABELS["price"] = ["zoneKey", "source", "currency"]
+
+
+class EventBatch:
+    """
+    A batch of events of one kind (see `EVENT_COLUMNS`).
+
+    Values are kept in a single column-major array so that every column is a
+    contiguous buffer: `to_pandas` and `to_arrow` wrap them without copying.
+    """
+
+    def __init__(
+        self,
+        kind: str,
+        datetimes: np.ndarray,
+        values: np.ndarray,
+        labels: Mapping[str, Any],
+    ):
+        if kind not in EVENT_COLUMNS:
+            raise ValueError(f"Unknown event kind: {kind}")
+        self.kind = kind
+        self.columns = EVENT_COLUMNS[kind]
+        self.datetimes = np.asarray(datetimes, dtype=np.int64)
+        self.values = np.asfortranarray(values, dtype=np.float64)
+        if self.values.shape != (len(self.datetimes), len(self.columns)):
+            raise ValueError(
+                f"Expected values of shape {(len(self.datetimes), len(self.columns))}, "
+                f"got {self.values.shape}"
+            )
+        self.labels = {
+            field: pd.Categorical(labels.get(field, [None] * len(self.datetimes)))
+            for field in EVENT_LABELS[kind]
+        }
+
+    def __len__(self) -> int:
+        return len(self.datetimes)
+
+    def __repr__(self) -> str:
+        return f"<EventBatch {self.kind}: {len(self)} events>"
+
+    @property
+    def key_field(self) -> str:
+        return EVENT_LABELS[self.kind][0]
+
+    def column(self, name: str) -> np.ndarray:
+        """Returns a view on the values of a column."""
+        return self.values[:, self.columns.index(name)]
+
+    @classmethod
+    def from_dicts(cls, kind: str, events: Sequence[Mapping]) -> "EventBatch":
+        """Builds a batch from events in the dictionary format returned by parsers."""
+        columns = EVENT_COLUMNS[kind]
+        positions = {column: j for j, column in enumerate(columns)}
+        nested = {column.split(".")[0] for column in columns if "." in column}
+
+        values = np.full((len(columns), len(events)), np.nan).T
+        for i, event in enumerate(events):
+            for field, value in event.items():
+                if field in nested:
+                    for mode, mode_value in (value or {}).items():
+                        column = f"{field}.{mode}"
+                        if column not in positions:
+                            raise ValueError(
+                                f"Unknown key {column} in {kind} event {event}"
+                            )
+                        if mode_value is not None:
+                            values[i, positions[column]] = mode_value
+                elif field in positions and value is not None:
+                    values[i, positions[field]] = value
+
+        datetimes = pd.to_datetime([event["datetime"] for event in events], utc=True)
+        labels = {
+            field: [event.get(field) for event in events]
+            for field in EVENT_LABELS[kind]
+        }
+        return cls(kind, datetimes.asi8, values, labels)
+
+    @classmethod
+    def from_pandas(cls, kind: str, df: pd.DataFrame) -> "EventBatch":
+        """
+        Builds a batch from a DataFrame in the layout of `to_pandas`.
+        Value columns that are not in the DataFrame are set to NaN.
+        """
+        columns = EVENT_COLUMNS[kind]
+        values = np.full((len(columns), len(df)), np.nan).T
+        for j, column in enumerate(columns):
+            if column in df:
+                values[:, j] = df[column].to_numpy(dtype=np.float64)
+        datetimes = pd.DatetimeIndex(df.index).tz_convert("UTC").asi8
+        labels = {field: df[field] for field in EVENT_LABELS[kind] if field in df}
+        return cls(kind, datetimes, values, labels)
+
+    @classmethod
+    def concat(cls, batches: Sequence["EventBatch"]) -> "EventBatch":
+        kinds = {batch.kind for batch in batches}
+        if len(kinds) != 1:
+            raise ValueError(f"Can only concatenate batches of one kind, got {kinds}")
+        kind = kinds.pop()
+        values = np.full(
+            (len(EVENT_COLUMNS[kind]), sum(len(batch) for batch in batches)), np.nan
+        ).T
+        np.concatenate([batch.values for batch in batches], out=values)
+        labels = {
+            field: pd.api.types.union_categoricals(
+                [batch.labels[field] for batch in batches]
+            )
+            for field in EVENT_LABELS[kind]
+        }
+        datetimes = np.concatenate([batch.datetimes for batch in batches])
+        return cls(kind, datetimes, values, labels)
+
+    def datetime_index(self) -> pd.DatetimeIndex:
+        return pd.DatetimeIndex(
+            self.datetimes.view("datetime64[ns]"), name="datetime"
+        ).tz_localize("UTC")
+
+    def to_pandas(self) -> pd.DataFrame:
+        """
+        Returns the batch as a DataFrame indexed by datetime, with one column
+        per value and per label. Value columns share memory with the batch.
+        """
+        df = pd.DataFrame(
+            self.values, index=self.datetime_index(), columns=self.columns, copy=False
+        )
+        for field, categorical in self.labels.items():
+            df[field] = categorical
+        return df
+
+    def to_arrow(self):
+        """
+        Returns the batch as a `pyarrow.Table`. Value columns share memory with
+        the batch, missing values are therefore NaN rather than null.
+        """
+        import pyarrow as pa
+
+        arrays = {
+            "datetime": pa.array(self.datetimes, type=pa.int64()).view(
+                pa.timestamp("ns", tz="UTC")
+            ),
+        }
+        for j, column in enumerate(self.columns):
+            arrays[column] = pa.array(self.values[:, j])
+        for field, categorical in self.labels.items():
+            arrays[field] = pa.array(categorical)
+        return pa.table(arrays)
+
+    def to_dicts(self, keep_missing: Optional[bool] = None) -> List[Dict[str, Any]]:
+        """
+        Returns the events in the dictionary format returned by parsers.
+
+        Missing values are returned as None. Columns that are missing for the
+        whole batch are left out, unless `keep_missing` is set.
+        """
+        kept = [
+            j
+            for j in range(len(self.columns))
+            if keep_missing or not np.isnan(self.values[:, j]).all()
+        ]
+        paths = [self.columns[j].split(".") for j in kept]
+        rows = np.where(np.isnan(self.values[:, kept]), None, self.values[:, kept])
+
+        label_values = {
+            field: categorical.astype(object).tolist()
+            for field, categorical in self.labels.items()
+        }
+        nested_fields = sorted({path[0] for path in paths if len(path) == 2})
+
+        events = []
+        for i, (dt, row) in enumerate(
+            zip(self.datetime_index().to_pydatetime(), rows.tolist())
+        ):
+            event = {self.key_field: label_values[self.key_field][i], "datetime": dt}
+            for field in nested_fields:
+                event[field] = {}
+            for path, value in zip(paths, row):
+                if len(path) == 2:
+                    event[path[0]][path[1]] = value
+                else:
+                    event[path[0]] = value
+            for field, values in label_values.items():
+                if field != self.key_field:
+                    event[field] = values[i]
+            events.append(event)
+        return events
@@ -4,122 +4,105 @@ from typing import Optional, Union
 
 import arrow
 
-# Numpy and PIL are used to process the image
+# Numpy is used to process the image
 import numpy as np
-from PIL import Image
 from requests import Session
+from parsers import AX_data
 from parsers.func import get_data
-from AX_data import *
 from parsers.example import paeras_example
+from parsers.lib.images import (
+    ScreenshotCache,
+    colour_mask,
+    decode_image,
+    match_glyphs,
+    region,
+)
 URL = "http://194.110.178.135/grafik/stamnat.php"
 SOURCE = "kraftnat.ax"
 TZ = "Europe/Mariehamn"
+# Glyphs of the symbols used in the image, as (height, width) masks of their
+# foreground pixels
+SYMBOLS = ["-", ".", "0", "1", "2", "3", "4", "5", "6", "7", "8", "9"]
+GLYPHS = np.stack(
+    [
+        np.asarray(mask)[..., 0] == 0
+        for mask in [
+            AX_data.Minus,
+            AX_data.Dot,
+            AX_data.Zero,
+            AX_data.One,
+            AX_data.Two,
+            AX_data.Three,
+            AX_data.Four,
+            AX_data.Five,
+            AX_data.Six,
+            AX_data.Seven,
+            AX_data.Eight,
+            AX_data.Nine,
+        ]
+    ]
+)
+# Numbers are drawn in pure blue
+NUMBER_COLOUR = (0, 0, 255)
+SCREENSHOTS = ScreenshotCache()
+
+
 class get_data_AX(get_data):
     def get_data(self,session=None,url:str=" ",Format:str = None):
         r= session or Session()
-        r = r.get(url,stream=True).raw
-        return r
+        return r.get(url).content
 class extract_data(paeras_example):
     def _get_masks(self,session=None):
-        shorts = ["-", ".", "0", "1", "2", "3", "4", "5", "6", "7", "8", "9"]
-        masks = [Minus, Dot, Zero, One, Two, Three, Four, Five, Six, Seven, Eight, Nine]
+        return dict(zip(SYMBOLS, GLYPHS))
+
+    def _read_number(self, data: np.ndarray, x_start: int, x_end: int, y: int) -> float:
+        """Reads the number drawn in blue from x_start to x_end at height y."""
+        # Glyphs can start at any x in [x_start, x_end - 6)
+        roi = region(data, (x_start, y, x_end - 1, y + GLYPHS.shape[1]))
+        text = match_glyphs(colour_mask(roi, NUMBER_COLOUR), GLYPHS, SYMBOLS)
+        return round(float(text), 1)
+
 
-        return dict(zip(shorts, masks))
+    def _read_numbers(self, content: bytes) -> dict:
+        """Reads the flows and productions from the image file."""
+        # "data" is a height x width x 3 RGB numpy array, numbers are read
+        # from views of it
+        data = decode_image(content)
+        return {
+            # check import from Sweden
+            "SE3": self._read_number(data, 80, 130, 443),
+            # export Åland-Finland(Kustavi/Gustafs)
+            "Gustafs": self._read_number(data, 780, 825, 43),
+            # Reserve cable import Naantali-Åland
+            # Åland administration does not allow export
+            # to Finland through this cable
+            "Naantali": self._read_number(data, 760, 815, 328),
+            # The shown total consumption is not reliable according to the TSO
+            # Consumption
+            # "consumption": self._read_number(data, 650, 700, 564),
+            # Wind production
+            "wind": self._read_number(data, 650, 700, 576),
+            # Fossil fuel production
+            "fossil": self._read_number(data, 650, 700, 588),
+        }
 
 
     def _fetch_data(self,session: Optional[Session] = None) -> dict:
         """Return usable data from source."""
-        # Load masks for reading numbers from the image
-        # Create a dictionary of symbols and their pixel masks
-        mapping = self._get_masks(session)
-
         # Download the updating image from Kraftnät Åland
 
         reader = get_data_AX()
-        r = reader.get_data_warn(session,URL)
-
-        im = Image.open(r)
+        content = reader.get_data_warn(session,URL)
         # Get timestamp
         fetchtime = arrow.utcnow().floor("second").to(TZ)
 
-        # "data" is a height x width x 3 RGB numpy array
-        data = np.array(im)
-        # red, green, blue, alpha = data.T
-        # Temporarily unpack the bands for readability
-        red, green, blue = data.T
-        # Color non-blue areas in the image with white
-        blue_areas = (red == 0) & (green == 0) & (blue == 255)
-        data[~blue_areas.T] = (255, 255, 255)
-        # Color blue areas in the image with black
-        data[blue_areas.T] = (0, 0, 0)
-
-        # Transform the array back to image
-        im = Image.fromarray(data)
-
-        shorts = mapping.keys()
-
-        # check import from Sweden
-        se_3_flow = []
-        for x in range(80, 130 - 6):
-            for abr in shorts:
-                im1 = im.crop((x, 443, x + 6, 452))
-                if im1 == mapping[abr]:
-                    se_3_flow.append(abr)
-        se_3_flow = "".join(se_3_flow)
-        se_3_flow = round(float(se_3_flow), 1)
-
-        # export Åland-Finland(Kustavi/Gustafs)
-        gustafs_flow = []
-        for x in range(780, 825 - 6):
-            for abr in shorts:
-                im1 = im.crop((x, 43, x + 6, 52))
-                if im1 == mapping[abr]:
-                    gustafs_flow.append(abr)
-        gustafs_flow = "".join(gustafs_flow)
-        gustafs_flow = round(float(gustafs_flow), 1)
-
-        # Reserve cable import Naantali-Åland
-        # Åland administration does not allow export
-        # to Finland through this cable
-        fin_flow = []
-        for x in range(760, 815 - 6):
-            for abr in shorts:
-                im1 = im.crop((x, 328, x + 6, 337))
-                if im1 == mapping[abr]:
-                    fin_flow.append(abr)
-        fin_flow = "".join(fin_flow)
-        fin_flow = round(float(fin_flow), 1)
-
-        # The shown total consumption is not reliable according to the TSO
-        # Consumption
-        # Cons = []
-        # for x in range(650, 700-6):
-        #    for abr in shorts:
-        #        im1 = im.crop((x, 564, x+6, 573))
-        #        if im1 == mapping[abr]:
-        #            Cons.append(abr)
-        # Cons = "".join(Cons)
-        # Cons = round(float(Cons),1)
-
-        # Wind production
-        wind = []
-        for x in range(650, 700 - 6):
-            for abr in shorts:
-                im1 = im.crop((x, 576, x + 6, 585))
-                if im1 == mapping[abr]:
-                    wind.append(abr)
-        wind = "".join(wind)
-        wind = round(float(wind), 1)
-
-        # Fossil fuel production
-        fossil = []
-        for x in range(650, 700 - 6):
-            for abr in shorts:
-                im1 = im.crop((x, 588, x + 6, 597))
-                if im1 == mapping[abr]:
-                    fossil.append(abr)
-        fossil = "".join(fossil)
-        fossil = round(float(fossil), 1)
+        # The image is only decoded when it changed since the last poll
+        numbers = SCREENSHOTS.read(URL, content, self._read_numbers)
+        se_3_flow = numbers["SE3"]
+        gustafs_flow = numbers["Gustafs"]
+        fin_flow = numbers["Naantali"]
+        wind = numbers["wind"]
+        fossil = numbers["fossil"]
 
         # Both are confirmed to be import from Finland by the TSO
         fin_flow = fin_flow + gustafs_flow
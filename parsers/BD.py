@@ -7,9 +7,9 @@ from logging import Logger, getLogger
 from typing import List, Optional
 
 import arrow
-import pandas as pd
 from requests import Session
 
+from .lib.excel import ExcelReader
 from .lib.exceptions import ParserException
 from parsers.example import paeras_example
 GENERATION_MAPPING = {
@@ -33,7 +33,10 @@ OLD_GENERATION_MAPPING = {
     "SOLAR": "solar",
 }
 
+EXCEL = ExcelReader()
+
 class extract_data(paeras_example):
+    @staticmethod
     def timestamp_converter(raw_timestamp, target_datetime):
         """Converts string timestamp (e.g. 10:00:00) to arrow object."""
 
@@ -49,6 +52,7 @@ class extract_data(paeras_example):
         return dt_aware
 
 
+    @staticmethod
     def old_format_converter(df):
         """Returns a dataframe."""
 
@@ -61,6 +65,7 @@ class extract_data(paeras_example):
         return df
 
 
+    @staticmethod
     def new_format_converter(df, logger: Logger):
         """Returns a dataframe."""
 
@@ -136,7 +141,7 @@ class extract_data(paeras_example):
         return processed_data
 
 
-    def excel_handler(self,shifted_target_datetime, logger: Logger) -> tuple:
+    def excel_handler(self,shifted_target_datetime, logger: Logger, session: Optional[Session] = None) -> tuple:
         """
         Decides which url to request based on supplied arrow object.
         Converts returned excel data into dataframe, format of data varies by date.
@@ -188,20 +193,21 @@ class extract_data(paeras_example):
                 day, month, short_year
             )
 
+        # Reports cover past days and don't change once published
         if OLD_FORMAT:
-            df = pd.read_excel(URL, sheet_name="En.Curve", skiprows=[0, 1, 2, 3])
+            df = EXCEL.fetch(
+                URL, {"En.Curve": {"skiprows": [0, 1, 2, 3]}}, session, final=True
+            )["En.Curve"]
             df = self.old_format_converter(df)
         else:
             if XLS_END:
-                df = pd.read_excel(
-                    URL,
-                    sheet_name="YesterdayGen",
-                    skiprows=[0, 1, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12],
-                )
-                df = self.new_format_converter(df, logger)
+                skiprows = [0, 1, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12]
             else:
-                df = pd.read_excel(URL, sheet_name="YesterdayGen", skiprows=[0, 1, 3])
-                df = self.new_format_converter(df, logger)
+                skiprows = [0, 1, 3]
+            df = EXCEL.fetch(
+                URL, {"YesterdayGen": {"skiprows": skiprows}}, session, final=True
+            )["YesterdayGen"]
+            df = self.new_format_converter(df, logger)
 
         return df, OLD_FORMAT
 
@@ -224,7 +230,7 @@ class extract_data(paeras_example):
         target_datetime = arrow.get(target_datetime, "YYYYMMDD")
         shifted_target_datetime = target_datetime.shift(days=+1)
 
-        df, OLD_FORMAT = self.excel_handler(shifted_target_datetime, logger)
+        df, OLD_FORMAT = self.excel_handler(shifted_target_datetime, logger, session)
 
         generation = self.production_processer(df, target_datetime, old_format=OLD_FORMAT)
 
@@ -263,7 +269,7 @@ class extract_data(paeras_example):
         target_datetime = arrow.get(target_datetime, "YYYYMMDD")
         shifted_target_datetime = target_datetime.shift(days=+1)
 
-        df, OLD_FORMAT = self.excel_handler(shifted_target_datetime, logger)
+        df, OLD_FORMAT = self.excel_handler(shifted_target_datetime, logger, session)
         exchange = self.exchange_processer(df, target_datetime, old_format=OLD_FORMAT)
 
         data = []
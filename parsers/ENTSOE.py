@@ -14,18 +14,26 @@ Consumption Forecast
 """
 import itertools
 import re
-from collections import defaultdict
-from datetime import datetime, timedelta
+import time
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from copy import deepcopy
+from datetime import datetime, timedelta, timezone
+from functools import partial
+from io import BytesIO
 from logging import Logger, getLogger
 from random import shuffle
-from typing import Any, Dict, List, Optional, Tuple, Union
+from threading import Lock
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Union
 
 import arrow
 import numpy as np
 import pandas as pd
 from bs4 import BeautifulSoup
+from lxml import etree
 from requests import Response, Session
 
+from electricitymap.contrib.config import EXCHANGE_INDEX
 from parsers.lib.config import refetch_frequency
 
 from .lib.exceptions import ParserException
@@ -33,6 +41,10 @@ from .lib.utils import get_token, sum_production_dicts
 from .lib.validation import validate
 
 ENTSOE_ENDPOINT = "https://web-api.tp.entsoe.eu/api"
+NO_MATCHING_DATA = "No matching data found"
+# Live data is revised for a while after being published, incremental queries
+# request it again for this long
+REVISION_OVERLAP = timedelta(hours=2)
 ENTSOE_PARAMETER_DESC = {
     "B01": "Biomass",
     "B02": "Fossil Brown coal/Lignite",
@@ -452,34 +464,161 @@ def closest_in_time_key(
         return np.abs((x[datetime_key] - target_datetime).seconds)
 
 
-def query_ENTSOE(
+# query parameters, without the period and token -> SeriesBuffer
+SERIES_BUFFERS: Dict[Tuple[Tuple[str, str], ...], "SeriesBuffer"] = {}
+SERIES_BUFFERS_LOCK = Lock()
+# (domain, target datetime) -> (monotonic time of caching, UnitTable)
+UNIT_TABLE_CACHE: "OrderedDict[Tuple[str, Optional[datetime]], Tuple[float, UnitTable]]" = (
+    OrderedDict()
+)
+UNIT_TABLE_CACHE_SIZE = 16
+UNIT_TABLE_TTL = timedelta(minutes=10)
+UNIT_TABLE_LOCK = Lock()
+UNIT_QUERY_WORKERS = 8
+
+
+def parse_resolution(resolution: str) -> timedelta:
+    m = re.fullmatch(r"PT(\d+)M", resolution)
+    if m is None:
+        raise NotImplementedError("Could not recognise resolution %s" % resolution)
+    return timedelta(minutes=int(m.group(1)))
+
+
+def qualified_tag(namespace: Optional[str], name: str) -> str:
+    return f"{{{namespace}}}{name}" if namespace else name
+
+
+class SeriesBuffer:
+    """
+    Rolling buffer of the points of the time series returned by a query.
+
+    Responses are merged point by point, the points of the latest response
+    replacing those of the same series and datetime. Series are identified by
+    their elements other than the mRID and periods, which is how the same
+    series is recognised in different responses. The buffered points are
+    rendered back into a document with one time series per run of contiguous
+    points, which the parse functions read like any response.
+    """
+
+    def __init__(self):
+        self.lock = Lock()
+        self.root: Optional[etree._Element] = None
+        # series identity -> elements identifying the series
+        self.headers: Dict[bytes, List[etree._Element]] = {}
+        # series identity -> datetime -> (resolution, elements of the point)
+        self.points: Dict[bytes, Dict[datetime, Tuple[timedelta, list]]] = {}
+
+    def __bool__(self) -> bool:
+        return any(self.points.values())
+
+    def merge(self, xml_text: str) -> bool:
+        """Merges the points of a response. Returns False if it has none."""
+        root = etree.fromstring(
+            xml_text.encode(), etree.XMLParser(remove_blank_text=True)
+        )
+        tag = partial(qualified_tag, etree.QName(root).namespace)
+        all_series = root.findall(tag("TimeSeries"))
+        if not all_series:
+            return False
+        self.root = etree.Element(root.tag, nsmap=root.nsmap)
+        for series in all_series:
+            headers = [
+                child
+                for child in series
+                if child.tag not in (tag("mRID"), tag("Period"))
+            ]
+            identity = b"".join(etree.tostring(header) for header in headers)
+            self.headers[identity] = headers
+            points = self.points.setdefault(identity, {})
+            for period in series.iterfind(tag("Period")):
+                start = arrow.get(
+                    period.findtext(f"{tag('timeInterval')}/{tag('start')}")
+                )
+                resolution = parse_resolution(period.findtext(tag("resolution")))
+                for point in period.iterfind(tag("Point")):
+                    position = int(point.findtext(tag("position")))
+                    dt = (start + (position - 1) * resolution).datetime
+                    points[dt] = (
+                        resolution,
+                        [child for child in point if child.tag != tag("position")],
+                    )
+        return True
+
+    def prune(self, start: datetime) -> None:
+        """Drops the points before `start`."""
+        for identity, points in list(self.points.items()):
+            for dt in [dt for dt in points if dt < start]:
+                del points[dt]
+            if not points:
+                del self.points[identity]
+                del self.headers[identity]
+
+    def last_complete(self) -> Optional[datetime]:
+        """
+        Returns the end of the last point of the series that lags the most.
+        Series ending more than `REVISION_OVERLAP` before the most recent one
+        are ignored, as they may no longer be published and would otherwise
+        hold back every poll until they leave the window.
+        """
+        if not self:
+            return None
+        ends = [
+            max(dt + resolution for dt, (resolution, _) in points.items())
+            for points in self.points.values()
+        ]
+        return min(end for end in ends if end >= max(ends) - REVISION_OVERLAP)
+
+    def render(self) -> str:
+        tag = partial(qualified_tag, etree.QName(self.root).namespace)
+        root = etree.Element(self.root.tag, nsmap=self.root.nsmap)
+
+        def add_series(identity: bytes, run: List[datetime]) -> None:
+            resolution = self.points[identity][run[0]][0]
+            series = etree.SubElement(root, tag("TimeSeries"))
+            etree.SubElement(series, tag("mRID")).text = str(len(root))
+            series.extend(deepcopy(header) for header in self.headers[identity])
+            period = etree.SubElement(series, tag("Period"))
+            interval = etree.SubElement(period, tag("timeInterval"))
+            for name, dt in (("start", run[0]), ("end", run[-1] + resolution)):
+                etree.SubElement(interval, tag(name)).text = dt.strftime(
+                    "%Y-%m-%dT%H:%MZ"
+                )
+            etree.SubElement(
+                period, tag("resolution")
+            ).text = f"PT{int(resolution.total_seconds() // 60)}M"
+            for position, dt in enumerate(run, 1):
+                point = etree.SubElement(period, tag("Point"))
+                etree.SubElement(point, tag("position")).text = str(position)
+                point.extend(deepcopy(child) for child in self.points[identity][dt][1])
+
+        for identity, points in self.points.items():
+            run: List[datetime] = []
+            for dt in sorted(points):
+                if run and (
+                    points[dt][0] != points[run[0]][0]
+                    or dt != run[-1] + points[run[-1]][0]
+                ):
+                    add_series(identity, run)
+                    run = []
+                run.append(dt)
+            if run:
+                add_series(identity, run)
+        return etree.tostring(root, encoding="unicode")
+
+
+def request_ENTSOE(
     session: Session,
     params: Dict[str, str],
-    target_datetime: Optional[datetime] = None,
-    span: tuple = (-48, 24),
+    start: datetime,
+    end: datetime,
     function_name: str = "",
 ) -> str:
     """
-    Makes a standard query to the ENTSOE API with a modifiable set of parameters.
-    Allows an existing session to be passed.
+    Requests the data of `params` between the hours of `start` and `end` (UTC).
     Raises an exception if no API token is found.
-    Returns a request object.
     """
-    if target_datetime is None:
-        target_datetime = datetime.utcnow()
-    if isinstance(target_datetime, datetime):
-        # make sure we have an arrow object
-        params["periodStart"] = (target_datetime + timedelta(hours=span[0])).strftime(
-            "%Y%m%d%H00"  # YYYYMMDDHH00
-        )
-        params["periodEnd"] = (target_datetime + timedelta(hours=span[1])).strftime(
-            "%Y%m%d%H00"  # YYYYMMDDHH00
-        )
-    else:
-        raise ParserException(
-            parser="ENTSOE.py",
-            message="target_datetime has to be a datetime in query_entsoe",
-        )
+    params["periodStart"] = start.strftime("%Y%m%d%H00")  # YYYYMMDDHH00
+    params["periodEnd"] = end.strftime("%Y%m%d%H00")  # YYYYMMDDHH00
 
     # Due to rate limiting, we need to spread our requests across different tokens
     tokens = get_token("ENTSOE_TOKEN").split(",")
@@ -503,7 +642,7 @@ def query_ENTSOE(
         if len(text):
             error_text = soup.find_all("text")[0].prettify()
             if "No matching data found" in error_text:
-                exception_message = "No matching data found"
+                exception_message = NO_MATCHING_DATA
             else:
                 exception_message = (
                     f"{function_name} failed in ENTSOE.py. Reason: {error_text}"
@@ -519,6 +658,79 @@ def query_ENTSOE(
     )
 
 
+def query_ENTSOE_incremental(
+    session: Session,
+    params: Dict[str, str],
+    span: tuple,
+    function_name: str = "",
+) -> str:
+    """
+    Returns the latest data of `params` over `span` hours around now, like
+    `query_ENTSOE`, but only requests the data since the last complete point
+    of the previous poll, minus `REVISION_OVERLAP` for revised values, and
+    merges it into the rolling buffer of the query.
+    """
+    now = datetime.now(timezone.utc)
+    window_start = now + timedelta(hours=span[0])
+    window_end = now + timedelta(hours=span[1])
+    key = tuple(sorted(params.items()))
+    with SERIES_BUFFERS_LOCK:
+        buffer = SERIES_BUFFERS.setdefault(key, SeriesBuffer())
+
+    with buffer.lock:
+        buffer.prune(window_start)
+        last_complete = buffer.last_complete()
+        start = window_start
+        if last_complete is not None:
+            start = max(window_start, last_complete - REVISION_OVERLAP)
+        try:
+            xml_text = request_ENTSOE(
+                session, dict(params), start, window_end, function_name
+            )
+        except ParserException as e:
+            # nothing was published since the last poll
+            if buffer and e.args[0] == NO_MATCHING_DATA:
+                return buffer.render()
+            raise
+        if not buffer.merge(xml_text):
+            return buffer.render() if buffer else xml_text
+        buffer.prune(window_start)
+        return buffer.render()
+
+
+def query_ENTSOE(
+    session: Session,
+    params: Dict[str, str],
+    target_datetime: Optional[datetime] = None,
+    span: tuple = (-48, 24),
+    function_name: str = "",
+    incremental: bool = False,
+) -> str:
+    """
+    Makes a standard query to the ENTSOE API with a modifiable set of parameters.
+    Allows an existing session to be passed.
+    Raises an exception if no API token is found.
+    Returns a request object.
+    Live `incremental` queries only request new data, see `query_ENTSOE_incremental`.
+    """
+    if target_datetime is None:
+        if incremental:
+            return query_ENTSOE_incremental(session, params, span, function_name)
+        target_datetime = datetime.utcnow()
+    if not isinstance(target_datetime, datetime):
+        raise ParserException(
+            parser="ENTSOE.py",
+            message="target_datetime has to be a datetime in query_entsoe",
+        )
+    return request_ENTSOE(
+        session,
+        params,
+        target_datetime + timedelta(hours=span[0]),
+        target_datetime + timedelta(hours=span[1]),
+        function_name,
+    )
+
+
 def query_consumption(
     domain: str, session: Session, target_datetime: Optional[datetime] = None
 ) -> Union[str, None]:
@@ -533,6 +745,7 @@ def query_consumption(
         params,
         target_datetime=target_datetime,
         function_name=query_consumption.__name__,
+        incremental=True,
     )
 
 
@@ -550,6 +763,7 @@ def query_production(
         target_datetime=target_datetime,
         span=(-48, 0),
         function_name=query_production.__name__,
+        incremental=True,
     )
 
 
@@ -593,6 +807,7 @@ def query_exchange(
         params,
         target_datetime=target_datetime,
         function_name=query_exchange.__name__,
+        incremental=True,
     )
 
 
@@ -819,58 +1034,106 @@ def parse_self_consumption(xml_text: str):
     return res
 
 
-def parse_production_per_units(xml_text: str) -> Union[Any, None]:
-    values = {}
+class UnitTable(NamedTuple):
+    """
+    Production per unit, with a row per unit and datetime. Units are
+    dictionary-encoded: `units` holds the code of the unit of each row, its
+    index in `unit_keys`, `unit_names` and `production_types`.
+    """
+
+    unit_keys: List[str]
+    unit_names: List[str]
+    production_types: List[str]
+    units: np.ndarray  # int32
+    timestamps: np.ndarray  # int64, seconds since the epoch
+    values: np.ndarray  # float32
+
+
+# (unit key, unit name, ENTSOE production type, timestamps, values)
+UnitSeries = Tuple[str, str, str, np.ndarray, np.ndarray]
+
 
+def parse_production_per_units(xml_text: str) -> List[UnitSeries]:
+    """
+    Reads the production time series of a response one at a time, freeing
+    each one once its points are read into arrays.
+    """
+    series = []
     if not xml_text:
-        return None
-    soup = BeautifulSoup(xml_text, "html.parser")
-    # Get all points
-    for timeseries in soup.find_all("timeseries"):
-        resolution = str(timeseries.find_all("resolution")[0].contents[0])
-        datetime_start: arrow.Arrow = arrow.get(
-            timeseries.find_all("start")[0].contents[0]
-        )
-        is_production = (
-            len(timeseries.find_all("inBiddingZone_Domain.mRID".lower())) > 0
-        )
-        psr_type = str(
-            timeseries.find_all("mktpsrtype")[0].find_all("psrtype")[0].contents[0]
-        )
-        unit_key = str(
-            timeseries.find_all("mktpsrtype")[0]
-            .find_all("powersystemresources")[0]
-            .find_all("mrid")[0]
-            .contents[0]
-        )
-        unit_name = str(
-            timeseries.find_all("mktpsrtype")[0]
-            .find_all("powersystemresources")[0]
-            .find_all("name")[0]
-            .contents[0]
-        )
-        if not is_production:
-            continue
-        for entry in timeseries.find_all("point"):
-            quantity = float(entry.find_all("quantity")[0].contents[0])
-            position = int(entry.find_all("position")[0].contents[0])
-            datetime = datetime_from_position(datetime_start, position, resolution)
-            key = (unit_key, datetime)
-            if key in values:
-                if is_production:
-                    values[key]["production"] += quantity
-                else:
-                    values[key]["production"] -= quantity
-            else:
-                values[key] = {
-                    "datetime": datetime,
-                    "production": quantity,
-                    "productionType": ENTSOE_PARAMETER_BY_GROUP[psr_type],
-                    "unitKey": unit_key,
-                    "unitName": unit_name,
-                }
+        return series
+    for _, timeseries in etree.iterparse(
+        BytesIO(xml_text.encode()), tag="{*}TimeSeries"
+    ):
+        if timeseries.find("{*}inBiddingZone_Domain.mRID") is not None:
+            unit = timeseries.find("{*}MktPSRType/{*}PowerSystemResources")
+            timestamps, values = [], []
+            for period in timeseries.iterfind("{*}Period"):
+                start = arrow.get(period.findtext("{*}timeInterval/{*}start")).datetime
+                step = parse_resolution(period.findtext("{*}resolution"))
+                points = period.findall("{*}Point")
+                positions = np.array(
+                    [point.findtext("{*}position") for point in points], dtype=np.int64
+                )
+                timestamps.append(
+                    int(start.timestamp()) + (positions - 1) * int(step.total_seconds())
+                )
+                values.append(
+                    np.array(
+                        [point.findtext("{*}quantity") for point in points],
+                        dtype=np.float32,
+                    )
+                )
+            series.append(
+                (
+                    unit.findtext("{*}mRID"),
+                    unit.findtext("{*}name"),
+                    timeseries.findtext("{*}MktPSRType/{*}psrType"),
+                    np.concatenate(timestamps or [np.empty(0, dtype=np.int64)]),
+                    np.concatenate(values or [np.empty(0, dtype=np.float32)]),
+                )
+            )
+        # free the series, and the ones before it
+        timeseries.clear()
+        while timeseries.getprevious() is not None:
+            del timeseries.getparent()[0]
+    return series
+
 
-    return values.values()
+def build_unit_table(series: List[UnitSeries]) -> UnitTable:
+    """
+    Gathers unit time series into a table, in which the values of a unit at
+    the same datetime are summed. Rows are sorted by unit, in the order in
+    which units first appear, then by datetime.
+    """
+    codes: Dict[str, int] = {}
+    unit_names, production_types = [], []
+    units, timestamps, values = [], [], []
+    for unit_key, unit_name, psr_type, series_timestamps, series_values in series:
+        if unit_key not in codes:
+            codes[unit_key] = len(codes)
+            unit_names.append(unit_name)
+            production_types.append(ENTSOE_PARAMETER_BY_GROUP[psr_type])
+        units.append(np.full(len(series_timestamps), codes[unit_key], dtype=np.int32))
+        timestamps.append(series_timestamps)
+        values.append(series_values)
+    units = np.concatenate(units or [np.empty(0, dtype=np.int32)])
+    timestamps = np.concatenate(timestamps or [np.empty(0, dtype=np.int64)])
+    values = np.concatenate(values or [np.empty(0, dtype=np.float32)])
+
+    order = np.lexsort((timestamps, units))
+    units, timestamps, values = units[order], timestamps[order], values[order]
+    # first row of each unit and datetime
+    starts = np.flatnonzero(
+        np.concatenate(
+            [[True], (units[1:] != units[:-1]) | (timestamps[1:] != timestamps[:-1])]
+        )
+    )
+    if len(starts) < len(units):
+        values = np.add.reduceat(values, starts)
+        units, timestamps = units[starts], timestamps[starts]
+    return UnitTable(
+        list(codes), unit_names, production_types, units, timestamps, values
+    )
 
 
 def parse_exchange(
@@ -1181,6 +1444,76 @@ def fetch_production_aggregate(
     )
 
 
+def fetch_unit_tables(
+    domains: List[str],
+    session: Session,
+    target_datetime: Optional[datetime] = None,
+    logger: Logger = getLogger(__name__),
+) -> Dict[str, UnitTable]:
+    """
+    Returns the production per unit of `domains`, querying all their
+    production types concurrently. Tables are cached for a while, as the zones
+    of a domain share it.
+    """
+    keys = {domain: (domain, target_datetime) for domain in domains}
+    tables = {}
+    now = time.monotonic()
+    with UNIT_TABLE_LOCK:
+        for domain, key in keys.items():
+            cached_at, table = UNIT_TABLE_CACHE.get(key, (0.0, None))
+            if table is not None and now - cached_at < UNIT_TABLE_TTL.total_seconds():
+                UNIT_TABLE_CACHE.move_to_end(key)
+                tables[domain] = table
+
+    def query(domain_and_psr_type: Tuple[str, str]) -> Optional[List[UnitSeries]]:
+        """Returns the series of a production type, or None if the query failed."""
+        domain, psr_type = domain_and_psr_type
+        try:
+            return parse_production_per_units(
+                query_production_per_units(psr_type, domain, session, target_datetime)
+            )
+        except ParserException as e:
+            # most production types have no units in a domain
+            if e.args[0] == NO_MATCHING_DATA:
+                return []
+            logger.warning(f"Failed to fetch units of {psr_type} in {domain}: {e}")
+        except Exception as e:
+            # a failed query mustn't fail the others
+            logger.warning(f"Failed to fetch units of {psr_type} in {domain}: {e!r}")
+        return None
+
+    missing = [domain for domain in dict.fromkeys(domains) if domain not in tables]
+    queries = [
+        (domain, psr_type) for domain in missing for psr_type in ENTSOE_PARAMETER_DESC
+    ]
+    with ThreadPoolExecutor(max_workers=UNIT_QUERY_WORKERS) as executor:
+        results = list(executor.map(query, queries))
+    failed = set()
+    for domain in missing:
+        domain_results = [
+            domain_series
+            for (query_domain, _), domain_series in zip(queries, results)
+            if query_domain == domain
+        ]
+        if None in domain_results:
+            failed.add(domain)
+        tables[domain] = build_unit_table(
+            [
+                series
+                for domain_series in domain_results
+                for series in domain_series or []
+            ]
+        )
+    with UNIT_TABLE_LOCK:
+        # incomplete tables are queried again by the next fetch
+        for domain in missing:
+            if domain not in failed:
+                UNIT_TABLE_CACHE[keys[domain]] = (time.monotonic(), tables[domain])
+        while len(UNIT_TABLE_CACHE) > UNIT_TABLE_CACHE_SIZE:
+            UNIT_TABLE_CACHE.popitem(last=False)
+    return tables
+
+
 @refetch_frequency(timedelta(days=1))
 def fetch_production_per_units(
     zone_key: str,
@@ -1191,33 +1524,36 @@ def fetch_production_per_units(
     """Returns all production units and production values."""
     if not session:
         session = Session()
-    domain = ENTSOE_EIC_MAPPING[zone_key]
+    # aggregates are made of the units of their zones
+    zone_keys = set(ZONE_KEY_AGGREGATES.get(zone_key, [zone_key]))
+    domains = [ENTSOE_EIC_MAPPING[key] for key in sorted(zone_keys)]
     data = []
-    # Iterate over all psr types
-    for k in ENTSOE_PARAMETER_DESC.keys():
-        try:
-            raw_production_per_units = query_production_per_units(
-                k, domain, session, target_datetime
-            )
-            if raw_production_per_units is not None:
-                values = parse_production_per_units(raw_production_per_units) or []
-                for v in values:
-                    if not v:
-                        continue
-                    v["source"] = "entsoe.eu"
-                    if not v["unitName"] in ENTSOE_UNITS_TO_ZONE:
-                        logger.warning(
-                            f"Unknown unit {v['unitName']} with id {v['unitKey']}"
-                        )
-                    else:
-                        v["zoneKey"] = ENTSOE_UNITS_TO_ZONE[v["unitName"]]
-                        if v["zoneKey"] == zone_key:
-                            data.append(v)
-        except:
-            ParserException(
-                parser="ENTSOE.py",
-                message=f"Failed to fetch data for {k} in {zone_key}",
-                zone_key=zone_key,
+    for table in fetch_unit_tables(domains, session, target_datetime, logger).values():
+        unit_zones = []
+        for unit_key, unit_name in zip(table.unit_keys, table.unit_names):
+            if unit_name not in ENTSOE_UNITS_TO_ZONE:
+                logger.warning(f"Unknown unit {unit_name} with id {unit_key}")
+            unit_zones.append(ENTSOE_UNITS_TO_ZONE.get(unit_name))
+        selected = np.isin(
+            table.units,
+            [code for code, zone in enumerate(unit_zones) if zone in zone_keys],
+        )
+        datetimes = pd.to_datetime(
+            table.timestamps[selected], unit="s", utc=True
+        ).to_pydatetime()
+        # the shortest representation of float32 values are the reported ones
+        values = table.values[selected].astype(str).astype(float).tolist()
+        for code, dt, value in zip(table.units[selected].tolist(), datetimes, values):
+            data.append(
+                {
+                    "datetime": dt,
+                    "production": value,
+                    "productionType": table.production_types[code],
+                    "unitKey": table.unit_keys[code],
+                    "unitName": table.unit_names[code],
+                    "source": "entsoe.eu",
+                    "zoneKey": zone_key,
+                }
             )
 
     return data
@@ -1237,10 +1573,11 @@ def fetch_exchange(
     """
     if not session:
         session = Session()
-    sorted_zone_keys = sorted([zone_key1, zone_key2])
-    key = "->".join(sorted_zone_keys)
+    key, reversed = EXCHANGE_INDEX.orient(zone_key1, zone_key2)
     if key in ENTSOE_EXCHANGE_DOMAIN_OVERRIDE:
         domain1, domain2 = ENTSOE_EXCHANGE_DOMAIN_OVERRIDE[key]
+        # overridden domains follow the sorted key
+        reversed = False
     else:
         domain1 = ENTSOE_DOMAIN_MAPPINGS[zone_key1]
         domain2 = ENTSOE_DOMAIN_MAPPINGS[zone_key2]
@@ -1281,9 +1618,8 @@ def fetch_exchange(
                 {
                     "sortedZoneKeys": key,
                     "datetime": exchange_date,
-                    "netFlow": net_flow
-                    if zone_key1[0] == sorted_zone_keys
-                    else -1 * net_flow,
+                    # flows are queried into the first domain
+                    "netFlow": net_flow if reversed else -1 * net_flow,
                     "source": "entsoe.eu",
                 }
             )
@@ -1307,10 +1643,11 @@ def fetch_exchange_forecast(
     """Gets exchange forecast between two specified zones."""
     if not session:
         session = Session()
-    sorted_zone_keys = sorted([zone_key1, zone_key2])
-    key = "->".join(sorted_zone_keys)
+    key, reversed = EXCHANGE_INDEX.orient(zone_key1, zone_key2)
     if key in ENTSOE_EXCHANGE_DOMAIN_OVERRIDE:
         domain1, domain2 = ENTSOE_EXCHANGE_DOMAIN_OVERRIDE[key]
+        # overridden domains follow the sorted key
+        reversed = False
     else:
         domain1 = ENTSOE_DOMAIN_MAPPINGS[zone_key1]
         domain2 = ENTSOE_DOMAIN_MAPPINGS[zone_key2]
@@ -1345,7 +1682,6 @@ def fetch_exchange_forecast(
                 exchange_hashmap[datetimes[i]] = quantities[i]
 
     # Remove all dates in the future
-    sorted_zone_keys = sorted([zone_key1, zone_key2])
     exchange_dates = list(sorted(set(exchange_hashmap.keys()), reverse=True))
     if not len(exchange_dates):
         raise ParserException(
@@ -1359,9 +1695,7 @@ def fetch_exchange_forecast(
             {
                 "sortedZoneKeys": key,
                 "datetime": exchange_date,
-                "netFlow": netFlow
-                if zone_key1[0] == sorted_zone_keys
-                else -1 * netFlow,
+                "netFlow": netFlow if reversed else -1 * netFlow,
                 "source": "entsoe.eu",
             }
         )
@@ -13,6 +13,7 @@ from requests import Session
 
 # Local library imports
 from parsers.lib import config, validation
+from parsers.lib.excel import ExcelReader
 
 from .ENTSOE import fetch_exchange as ENTSOE_fetch_exchange
 
@@ -20,6 +21,7 @@ MINIMUM_PRODUCTION_THRESHOLD = 10  # MW
 TIMEZONE = "Asia/Tbilisi"
 URL = urllib.parse.urlsplit("https://gse.com.ge/apps/gsebackend/rest")
 URL_STRING = URL.geturl()
+EXCEL = ExcelReader()
 
 
 @config.refetch_frequency(timedelta(hours=1))
@@ -60,8 +62,13 @@ def fetch_production(
             .floor("hour")
             .span("day")
         )
-        response = session.get(
+        # Only the first rows of the diagram are needed, and past days' diagrams
+        # don't change anymore.
+        sheets = EXCEL.fetch(
             f"{URL_STRING}/diagramDownload",
+            {0: {"header": 2, "index_col": 1, "nrows": 6}},
+            session,
+            final=timestamp_to < arrow.now(TIMEZONE),
             params={
                 "fromDate": timestamp_from.format("YYYY-MM-DDTHH:mm:ss"),
                 "lang": "EN",
@@ -70,11 +77,7 @@ def fetch_production(
             },
             verify=False,
         )  # TODO: remove `verify=False` ASAP.
-        table = (
-            pandas.read_excel(response.content, header=2, index_col=1)
-            .iloc[2:6, 2:]
-            .dropna(axis="columns", how="all")
-        )
+        table = sheets[0].iloc[2:6, 2:].dropna(axis="columns", how="all")
         table.index = "gas", "hydro", "wind", "solar"
         table.columns = pandas.date_range(
             start=timestamp_from.datetime, freq="1H", periods=table.shape[1]
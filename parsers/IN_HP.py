@@ -8,9 +8,10 @@ from logging import Logger, getLogger
 from typing import Optional
 
 import arrow
-from bs4 import BeautifulSoup
 from requests import Session
 
+from .lib.html_tables import Column, TableSpec, parse_html, read_table
+
 # This URL is called from within the
 # https://hpsldc.com/intra-state-power-transaction/
 # page to load the data.
@@ -71,6 +72,22 @@ PLANT_NAMES_TO_TYPES = {
     "KOLDAM": GenType.HYDRO,
 }
 
+# Plant names and current generation, without the Total row.
+STATE_TABLE = TableSpec(
+    rows="(//div[contains(concat(' ', @class, ' '), ' table_5 ')])[1]/descendant::tbody[1]//tr",
+    columns=[Column("plant", 0), Column("generation", 1, "number"), Column("row", ".")],
+    skip_tail=1,
+)
+# Without the headers and the OTHERISGS and Total rows. The cells of the first
+# column (COMPANY), which only some rows have (using rowspan), have no class.
+ISGS_TABLE = TableSpec(
+    rows="(//div[contains(concat(' ', @class, ' '), ' table_4 ')])[1]/descendant::tbody[1]//tr",
+    columns=[Column("plant", 0), Column("generation", 2, "number"), Column("row", ".")],
+    cells="td[@class]",
+    skip_head=1,
+    skip_tail=2,
+)
+
 
 def fetch_production(
     zone_key: str = ZONE_KEY,
@@ -89,75 +106,61 @@ def fetch_production(
         f"Exception when fetching production for "
         "{zone_key}: {res.status_code} error when calling url={url}"
     )
-    soup = BeautifulSoup(res.text, "html.parser")
+    document = parse_html(res.content)
     return {
         "zoneKey": ZONE_KEY,
         "datetime": arrow.now(TZ).datetime,
         "production": combine_gen(
-            get_state_gen(soup, logger), get_isgs_gen(soup, logger)
+            get_state_gen(document, logger), get_isgs_gen(document, logger)
         ),
         "source": "hpsldc.com",
     }
 
 
-def get_state_gen(soup, logger: Logger):
+def get_state_gen(document, logger: Logger):
     """
     Gets the total generation by type from state powerplants (MW).
     Data is from the table titled GENERATION OF HP(Z).
     """
-    table_name = "GENERATION OF HP(Z)"
-    gen = {GenType.HYDRO.value: 0.0, GenType.UNKNOWN.value: 0.0}
-    # Read all rows except the last (Total).
-    for row in get_table_rows(soup, "table_5", table_name)[:-1]:
-        try:
-            cols = row.find_all("td")
-            # Column 1: plant name, column 2: current generation.
-            gen_type = PLANT_NAMES_TO_TYPES[cols[0].text]
-            gen[gen_type.value] += float(cols[1].text)
-        except (AttributeError, KeyError, IndexError, ValueError):
-            logger.error(
-                f"Error importing data from row: {row}", extra={"key": ZONE_KEY}
-            )
-    return gen
+    return sum_generation(
+        get_table(document, STATE_TABLE, "GENERATION OF HP(Z)"), logger
+    )
 
 
-def get_isgs_gen(soup, logger: Logger):
+def get_isgs_gen(document, logger: Logger):
     """
     Gets the total generation by type from ISGS powerplants (MW).
     ISGS means Inter-State Generating Station: one owned by multiple states.
     Data is from the table titled (B1)ISGS(HPSLDC WEB PORTAL).
     """
-    table_name = "(B1)ISGS(HPSLDC WEB PORTAL)"
-    gen = {GenType.HYDRO.value: 0.0, GenType.UNKNOWN.value: 0.0}
-    # Read all rows except the first (headers) and last two (OTHERISGS and
-    # Total).
-    for row in get_table_rows(soup, "table_4", table_name)[1:-2]:
-        try:
-            cols = row.find_all("td")
-            if not cols[0].has_attr("class"):
-                # Ignore first column (COMPANY), which only has cells for some
-                # rows (using rowspan).
-                del cols[0]
-            # Once COMPANY column is excluded, we have
-            # column 1: plant name, column 3: current generation.
-            gen_type = PLANT_NAMES_TO_TYPES[cols[0].text]
-            gen[gen_type.value] += float(cols[2].text)
-        except (AttributeError, KeyError, IndexError, ValueError):
-            logger.error(
-                f"Error importing data from row: {row}", extra={"key": ZONE_KEY}
-            )
-    return gen
+    return sum_generation(
+        get_table(document, ISGS_TABLE, "(B1)ISGS(HPSLDC WEB PORTAL)"), logger
+    )
 
 
-def get_table_rows(soup, container_class, table_name):
-    """Gets the table rows in the div identified by the provided class."""
-    try:
-        rows = soup.find("div", class_=container_class).find("tbody").find_all("tr")
-        if len(rows) == 0:
-            raise ValueError
-        return rows
-    except (AttributeError, ValueError) as err:
-        raise Exception(f"Error reading table {table_name}: {err}")
+def get_table(document, spec: TableSpec, table_name):
+    """Gets the plants and generation of a table."""
+    table = read_table(document, spec)
+    if table.empty:
+        raise Exception(f"Error reading table {table_name}: no rows found")
+    return table
+
+
+def sum_generation(table, logger: Logger):
+    """Sums the generation of the plants of a table by type (MW)."""
+    types = table["plant"].map(PLANT_NAMES_TO_TYPES)
+    invalid = types.isna() | table["generation"].isna()
+    for row in table["row"][invalid]:
+        logger.error(
+            f"Error importing data from row: {' '.join(row.split())}",
+            extra={"key": ZONE_KEY},
+        )
+    generation = table["generation"][~invalid].groupby(
+        types[~invalid].map(lambda gen_type: gen_type.value)
+    )
+    gen = {GenType.HYDRO.value: 0.0, GenType.UNKNOWN.value: 0.0}
+    gen.update(generation.sum().astype(float).to_dict())
+    return gen
 
 
 def combine_gen(gen1, gen2):
@@ -8,6 +8,7 @@ from requests import Session
 
 from .lib import IN, web, zonekey
 from .lib.exceptions import ParserException
+from .lib.html_tables import element_texts
 
 
 def fetch_consumption(
@@ -21,11 +22,16 @@ def fetch_consumption(
         raise NotImplementedError("This parser is not yet able to parse past dates")
 
     zonekey.assert_zone_key(zone_key, "IN-KA")
-    html = web.get_response_soup(zone_key, "http://kptclsldc.in/Default.aspx", session)
+    spans = element_texts(
+        web.get_response_document(
+            zone_key, "http://kptclsldc.in/Default.aspx", session
+        ),
+        "span",
+    )
 
-    india_date_time = IN.read_datetime_from_span_id(html, "Label6", "DD/MM/YYYY HH:mm")
+    india_date_time = IN.read_datetime(spans["Label6"], "DD/MM/YYYY HH:mm")
 
-    demand_value = IN.read_value_from_span_id(html, "Label5")
+    demand_value = float(spans["Label5"])
 
     data = {
         "zoneKey": zone_key,
@@ -49,107 +55,112 @@ def fetch_production(
 
     zonekey.assert_zone_key(zone_key, "IN-KA")
 
-    html = web.get_response_soup(zone_key, "http://kptclsldc.in/StateGen.aspx", session)
-
-    india_date_time = IN.read_datetime_from_span_id(
-        html, "lbldate", "DD/MM/YYYY HH:mm:ss"
+    # All values are read from the spans of the page at once
+    spans = element_texts(
+        web.get_response_document(
+            zone_key, "http://kptclsldc.in/StateGen.aspx", session
+        ),
+        "span",
     )
 
+    india_date_time = IN.read_datetime(spans["lbldate"], "DD/MM/YYYY HH:mm:ss")
+
     # RTPS Production: https://en.wikipedia.org/wiki/Raichur_Thermal_Power_Station
-    rtps_value = IN.read_value_from_span_id(html, "lblrtptot")
+    rtps_value = float(spans["lblrtptot"])
 
     # BTPS Production: https://en.wikipedia.org/wiki/Bellary_Thermal_Power_station
-    btps_value = IN.read_value_from_span_id(html, "lblbtptot")
+    btps_value = float(spans["lblbtptot"])
 
     # YTPS Production: https://en.wikipedia.org/wiki/Yermarus_Thermal_Power_Station
-    ytps_value = IN.read_value_from_span_id(html, "ytptot")
+    ytps_value = float(spans["ytptot"])
 
     # UPCL Production: https://en.wikipedia.org/wiki/Udupi_Power_Plant
-    upcl_value = IN.read_value_from_span_id(html, "lblupctot")
+    upcl_value = float(spans["lblupctot"])
 
     # JINDAl Production: https://en.wikipedia.org/wiki/JSW_Vijayanagar_Power_Station
-    jindal_value = IN.read_value_from_span_id(html, "lbljintot")
+    jindal_value = float(spans["lbljintot"])
 
     # Coal Production
     coal_value = rtps_value + btps_value + ytps_value + upcl_value + jindal_value
 
     # Sharavati Production: Sharavati  Hydroelectric
-    sharavati_value = IN.read_value_from_span_id(html, "lblshvytot")
+    sharavati_value = float(spans["lblshvytot"])
 
     # Nagjhari Production: Kalinadi-Nagjhari Hydroelectric
-    nagjhari_value = IN.read_value_from_span_id(html, "lblngjtot")
+    nagjhari_value = float(spans["lblngjtot"])
 
     # Varahi Production: https://en.wikipedia.org/wiki/Varahi_River#Varahi_Hydro-electric_Project
-    varahi_value = IN.read_value_from_span_id(html, "lblvrhtot")
+    varahi_value = float(spans["lblvrhtot"])
 
     # Kodsalli Production: Kalinadi Kodasalli Hydroelectric
-    kodsalli_value = IN.read_value_from_span_id(html, "lblkdsltot")
+    kodsalli_value = float(spans["lblkdsltot"])
 
     # Kadra Production: https://en.wikipedia.org/wiki/Kadra_Dam
-    kadra_value = IN.read_value_from_span_id(html, "lblkdrtot")
+    kadra_value = float(spans["lblkdrtot"])
 
     # GERUSOPPA production: Gerusoppa Dam
-    gerusoppa_value = IN.read_value_from_span_id(html, "lblgrsptot")
+    gerusoppa_value = float(spans["lblgrsptot"])
 
     # JOG production: https://en.wikipedia.org/wiki/Jog_Falls
-    jog_value = IN.read_value_from_span_id(html, "lbljogtot")
+    jog_value = float(spans["lbljogtot"])
 
     # LPH Production: Linganamakki Dam
-    lph_value = IN.read_value_from_span_id(html, "lbllphtot")
+    lph_value = float(spans["lbllphtot"])
 
     # Supa production: https://en.wikipedia.org/wiki/Supa_Dam
-    supa_value = IN.read_value_from_span_id(html, "lblsupatot")
+    supa_value = float(spans["lblsupatot"])
 
     # SHIMSHA: https://en.wikipedia.org/wiki/Shimsha#Power_generation
-    shimsha_value = IN.read_value_from_span_id(html, "lblshimtot")
+    shimsha_value = float(spans["lblshimtot"])
 
     # SHIVASAMUDRA: https://en.wikipedia.org/wiki/Shivanasamudra_Falls#Power_generation
-    shivasamudra_value = IN.read_value_from_span_id(html, "lblshivtot")
+    shivasamudra_value = float(spans["lblshivtot"])
 
     # MANIDAM: Mani Dam Hydroelectric
-    manidam_value = IN.read_value_from_span_id(html, "lblmanitot")
+    manidam_value = float(spans["lblmanitot"])
 
     # MUNRABAD: Munirabad Hydroelectric
-    munrabad_value = IN.read_value_from_span_id(html, "lblmbdtot")
+    munrabad_value = float(spans["lblmbdtot"])
 
     # BHADRA: https://en.wikipedia.org/wiki/Bhadra_Dam
-    bhadra_value = IN.read_value_from_span_id(html, "lblbdratot")
+    bhadra_value = float(spans["lblbdratot"])
 
     # GHATAPRABHA: Ghataprabha Hydroelectric
-    ghataprabha_value = IN.read_value_from_span_id(html, "lblgtprtot")
+    ghataprabha_value = float(spans["lblgtprtot"])
 
     # ALMATTI: https://en.wikipedia.org/wiki/Almatti_Dam
-    almatti_value = IN.read_value_from_span_id(html, "lblalmttot")
+    almatti_value = float(spans["lblalmttot"])
 
     # CGS (Central Generating Stations) Production
     # TODO: Search CGS production type
-    cgs_value = IN.read_value_from_span_id(html, "lblcgs")
+    cgs_value = float(spans["lblcgs"])
 
     # NCEP (Non-Conventional Energy Production)
-    ncep_html = web.get_response_soup(
-        zone_key, "http://kptclsldc.in/StateNCEP.aspx", session
-    )
-    ncep_date_time = IN.read_datetime_from_span_id(
-        ncep_html, "Label1", "DD/MM/YYYY HH:mm:ss"
+    ncep_spans = element_texts(
+        web.get_response_document(
+            zone_key, "http://kptclsldc.in/StateNCEP.aspx", session
+        ),
+        "span",
     )
+    ncep_date_time = IN.read_datetime(ncep_spans["Label1"], "DD/MM/YYYY HH:mm:ss")
 
     # Check ncep date is similar than state gen date
     if abs((india_date_time - ncep_date_time).seconds) > 600:
         raise ParserException("IN-KA", "NCEP or State datetime is not valid")
 
     # cogen type is sugarcane bagasee. Proof in Issue #1867
-    cogen_value = IN.read_value_from_span_id(ncep_html, "lbl_tc")
+    cogen_value = float(ncep_spans["lbl_tc"])
 
-    biomass_value = IN.read_value_from_span_id(ncep_html, "lbl_tb")
+    biomass_value = float(ncep_spans["lbl_tb"])
 
     # cogen_value is generated from sugarcane bagasse
     biomass_value += cogen_value
 
-    mini_hydro_value = IN.read_value_from_span_id(ncep_html, "lbl_tm")
+    mini_hydro_value = float(ncep_spans["lbl_tm"])
 
-    wind_value = IN.read_value_from_span_id(ncep_html, "lbl_tw")
+    wind_value = float(ncep_spans["lbl_tw"])
 
-    solar_value = IN.read_value_from_span_id(ncep_html, "lbl_ts")
+    solar_value = float(ncep_spans["lbl_ts"])
 
     # Hydro production
     hydro_value = (
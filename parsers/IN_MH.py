@@ -6,10 +6,10 @@ import arrow
 import cv2
 import numpy as np
 import pytesseract
-from imageio import imread
-from PIL import Image, ImageOps
 from requests import Session
 
+from parsers.lib.images import ScreenshotCache, decode_image, otsu_threshold, region
+
 url = "https://mahasldc.in/wp-content/reports/sldc/mvrreport3.jpg"
 
 # specifies locations of data in the image
@@ -98,20 +98,51 @@ CS = [
     "CS GEN. TTL.",
 ]
 
-# converts image into a black and white
-def RGBtoBW(pil_image):
-    # pylint: disable=no-member
-    image = cv2.cvtColor(np.array(pil_image), cv2.COLOR_RGB2GRAY)
-    image = cv2.threshold(image, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)[1]
-    return Image.fromarray(image)
-
+# values read from the last dashboard image, which is polled more often than
+# it changes
+SCREENSHOTS = ScreenshotCache()
+
+
+# converts image sections into black text on a white background
+def read_values(image: np.ndarray) -> np.ndarray:
+    """
+    Returns the value sections of the image, side by side in one line, as
+    black text on a white background.
+    """
+    boxes = [loc["value"] for loc in locations.values()]
+    height = boxes[0][3] - boxes[0][1]
+    widths = [right - left for left, _, right, _ in boxes]
+    line = np.empty((height, sum(widths)), dtype=np.uint8)
+    offset = 0
+    for box, width in zip(boxes, widths):
+        # pylint: disable=no-member
+        gray = cv2.cvtColor(region(image, box), cv2.COLOR_RGB2GRAY)
+        line[:, offset : offset + width] = otsu_threshold(gray, inverted=True)
+        offset += width
+    return line
+
+
+def recognize_values(content: bytes) -> dict:
+    """Reads the values of all locations from the dashboard image file."""
+    image = decode_image(content)
+
+    # string together all image sections and recognize resulting line,
+    # unless the sections look the same as in the last image
+    imgs_line = read_values(image)
+    text = SCREENSHOTS.read_region(
+        "values",
+        imgs_line,
+        lambda line: pytesseract.image_to_string(
+            line, lang="digits_comma", config="--psm 7"
+        ),
+    )
+    text = text.split(" ")
 
-# returns image section
-def read(location, source):
-    img = source.crop(location)
-    img = RGBtoBW(img)
-    img = ImageOps.invert(img)
-    return img
+    # generate dict from string list
+    values = {}
+    for count, key in enumerate(locations):
+        values[key] = max([float(text[count]), 0])
+    return values
 
 
 # TODO: this function actually fetches consumption data
@@ -144,21 +175,9 @@ def fetch_production(
         "source": "mahasldc.in",
     }
 
-    image = imread(url)
-    image = Image.fromarray(image)  # create PIL image
-
-    imgs = [read(loc["value"], image) for loc in locations.values()]
-
-    # string together all image sections and recognize resulting line
-    imgs_line = np.hstack(list(np.asarray(i) for i in imgs[:]))
-    imgs_line = Image.fromarray(imgs_line)
-    text = pytesseract.image_to_string(imgs_line, lang="digits_comma", config="--psm 7")
-    text = text.split(" ")
-
-    # generate dict from string list
-    values = {}
-    for count, key in enumerate(locations):
-        values[key] = max([float(text[count]), 0])
+    r = session or Session()
+    # the dashboard is only decoded and recognized again when it changed
+    values = SCREENSHOTS.read(url, r.get(url).content, recognize_values)
 
     # fraction of central state production that is exchanged with Maharashtra
     share = values["CS EXCH"] / values["CS GEN. TTL."]
@@ -2,9 +2,12 @@
 
 
 import json
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from logging import Logger, getLogger
-from typing import Optional
+from threading import Lock
+from typing import Callable, List, Optional, Tuple
 
 import arrow
 import pandas as pd
@@ -59,28 +62,70 @@ KIND_MAPPING = {
 }
 
 
-def get_date_range(dt: datetime):
+# Decoded data of a day, by kind and day (YYYY-MM-DD), with the monotonic time
+# of the fetch and whether the day was over then
+DAY_CACHE: "OrderedDict[Tuple[str, str], Tuple[float, bool, pd.DataFrame]]" = (
+    OrderedDict()
+)
+DAY_CACHE_SIZE = 32
+# the data of a day that isn't over is refetched once it is older than this
+CURRENT_DAY_TTL = timedelta(minutes=5)
+DAY_CACHE_LOCK = Lock()
+
+
+def get_date_range(dt: datetime, end: Optional[datetime] = None):
+    """Returns the hours of the day of `dt`, or of the days from `dt` to `end`."""
     return pd.date_range(
         arrow.get(dt).floor("day").datetime,
-        arrow.get(dt).ceil("day").floor("hour").datetime,
+        arrow.get(end or dt).ceil("day").floor("hour").datetime,
         freq="H",
     ).to_pydatetime()
 
 
+def to_local(dt: datetime) -> datetime:
+    """Returns `dt` in India, naive datetimes being Indian already."""
+    if dt.tzinfo is None:
+        return dt
+    return arrow.get(dt).to("Asia/Kolkata").datetime
+
+
+def is_day_over(day: str) -> bool:
+    """Whether the day `day` (YYYY-MM-DD) is over in India."""
+    return day < arrow.utcnow().to("Asia/Kolkata").format("YYYY-MM-DD")
+
+
+def round_to_minute(datetimes: pd.Series) -> pd.Series:
+    """Rounds datetimes to the nearest minute, half a minute being rounded up."""
+    return (datetimes + pd.Timedelta(seconds=30)).dt.floor("min")
+
+
 def fetch_data(
     zone_key: str = "IN-WE",
     kind: Optional[str] = None,
     session: Optional[Session] = None,
     target_datetime: Optional[datetime] = None,
     logger: Logger = getLogger(__name__),
-) -> dict:
-    """- get production data from wrldc.in
-    - filter all rows with same hour as target_datetime"""
+) -> pd.DataFrame:
+    """- get the data of the day of target_datetime from wrldc.in
+    - round its datetimes to the minute
+    Days are fetched once per kind, see DAY_CACHE."""
     assert target_datetime is not None
     assert kind is not None
 
+    day = to_local(target_datetime).strftime("%Y-%m-%d")
+    is_final = is_day_over(day)
+    cache_key = (kind, day)
+    with DAY_CACHE_LOCK:
+        fetched_at, was_final, df = DAY_CACHE.get(cache_key, (0.0, False, None))
+        # data fetched before the day was over expires like the current day
+        if df is not None and (
+            was_final or time.monotonic() - fetched_at < CURRENT_DAY_TTL.total_seconds()
+        ):
+            DAY_CACHE.move_to_end(cache_key)
+            return df.copy()
+
     r = session or Session()
-    payload = {"date": target_datetime.strftime("%Y-%m-%d")}
+    payload = {"date": day}
 
     resp: Response = r.post(url=KIND_MAPPING[kind]["url"], json=payload)
 
@@ -92,35 +137,38 @@ def fetch_data(
             message=f"{target_datetime}: {kind} data is not available",
         )
 
-    datetime_col = KIND_MAPPING[kind]["datetime_column"]
-    for item in data:
-        item[datetime_col] = datetime.strptime(item[datetime_col], "%Y-%d-%m %H:%M:%S")
-        dt = arrow.get(item[datetime_col])
-        if dt.second >= 30:
-            item[datetime_col] = dt.shift(minutes=1).floor("minute").datetime
-        else:
-            item[datetime_col] = dt.floor("minute").datetime
-    return data
+    df = pd.DataFrame(data)
+    if not df.empty:
+        datetime_col = KIND_MAPPING[kind]["datetime_column"]
+        df[datetime_col] = round_to_minute(
+            pd.to_datetime(df[datetime_col], format="%Y-%d-%m %H:%M:%S")
+        )
+
+    with DAY_CACHE_LOCK:
+        DAY_CACHE[cache_key] = (time.monotonic(), is_final, df)
+        DAY_CACHE.move_to_end(cache_key)
+        while len(DAY_CACHE) > DAY_CACHE_SIZE:
+            DAY_CACHE.popitem(last=False)
+    return df.copy()
 
 
 def format_raw_data(
     kind: str,
-    data: dict,
+    data: pd.DataFrame,
     target_datetime: datetime,
 ) -> pd.DataFrame:
     assert len(data) > 0
     assert kind != ""
 
-    dt_12_hour = arrow.get(target_datetime.strftime("%Y-%m-%d %I:%M")).datetime
+    # source data is in 12 hour format, without AM or PM
+    hour_12 = int(target_datetime.strftime("%I"))
     datetime_col = KIND_MAPPING[kind]["datetime_column"]
-    filtered_data = pd.DataFrame(
-        [item for item in data if item[datetime_col].hour == dt_12_hour.hour]
-    )
+    filtered_data = data[data[datetime_col].dt.hour == hour_12].reset_index(drop=True)
     return filtered_data
 
 
 def format_production_data(
-    data: dict, zone_key: str, target_datetime: datetime
+    data: pd.DataFrame, zone_key: str, target_datetime: datetime
 ) -> dict:
     """format production data:
     - filters out correct datetimes (source data is 12 hour format)
@@ -141,7 +189,7 @@ def format_production_data(
     if len(filtered_data) == len(POWER_PLANT_MAPPING):
         df_production = filtered_data.copy()
     else:
-        for plant in set(filtered_data.State_Name):
+        for plant in sorted(set(filtered_data.State_Name)):
             df_plant = filtered_data.loc[filtered_data.State_Name == plant].copy()
             for dt in set(df_plant.lastUpdate):
                 df_dt = df_plant.loc[df_plant.lastUpdate == dt]
@@ -217,7 +265,7 @@ def format_production_data(
 
 
 def format_exchanges_data(
-    data: dict, zone_key1: str, zone_key2: str, target_datetime: datetime
+    data: pd.DataFrame, zone_key1: str, zone_key2: str, target_datetime: datetime
 ) -> dict:
     """format exchanges data:
     - filters out correct datetimes (source data is 12 hour format)
@@ -258,7 +306,7 @@ def format_exchanges_data(
 
 
 def format_consumption_data(
-    data: dict, zone_key: str, target_datetime: datetime
+    data: pd.DataFrame, zone_key: str, target_datetime: datetime
 ) -> dict:
     """format consumption data:
     - filters out correct datetimes (source data is 12 hour format)
@@ -299,33 +347,57 @@ def format_consumption_data(
     return consumption
 
 
+FORMATTERS = {
+    "production": format_production_data,
+    "exchange": format_exchanges_data,
+    "consumption": format_consumption_data,
+}
+
+
+def fetch_range(
+    kind: str,
+    start: datetime,
+    end: Optional[datetime] = None,
+    session: Optional[Session] = None,
+    logger: Logger = getLogger(__name__),
+    **zone_keys: str,
+) -> List[dict]:
+    """
+    Returns the data points of `kind` of every hour of the days from `start`
+    to `end` (the day of `start` only by default), fetching each day once.
+    `zone_keys` are the zone_key, or zone_key1 and zone_key2 of exchanges.
+    """
+    format_hour: Callable[..., dict] = FORMATTERS[kind]
+    data_points = []
+    day = None
+    # hours are those of Indian days
+    for dt in get_date_range(to_local(start), end and to_local(end)):
+        if dt.date() != day:
+            day = dt.date()
+            data = fetch_data(
+                zone_key=zone_keys.get("zone_key", zone_keys.get("zone_key1")),
+                kind=kind,
+                session=session,
+                target_datetime=dt,
+                logger=logger,
+            )
+        data_points.append(format_hour(data=data, target_datetime=dt, **zone_keys))
+    return data_points
+
+
 @refetch_frequency(timedelta(days=1))
 def fetch_production(
     zone_key: str = "IN-WE",
     session: Optional[Session] = None,
     target_datetime: Optional[datetime] = None,
     logger: Logger = getLogger(__name__),
-) -> dict:
+) -> list:
     if target_datetime is None:
         target_datetime = arrow.utcnow().datetime
-    data = fetch_data(
-        zone_key=zone_key,
-        kind="production",
-        session=session,
-        target_datetime=target_datetime,
-        logger=logger,
+    return fetch_range(
+        "production", target_datetime, session=session, logger=logger, zone_key=zone_key
     )
 
-    production = [
-        format_production_data(
-            zone_key=zone_key,
-            data=data,
-            target_datetime=dt,
-        )
-        for dt in get_date_range(target_datetime)
-    ]
-    return production
-
 
 @refetch_frequency(timedelta(days=1))
 def fetch_exchange(
@@ -334,26 +406,17 @@ def fetch_exchange(
     session: Optional[Session] = None,
     target_datetime: Optional[datetime] = None,
     logger: Logger = getLogger(__name__),
-) -> dict:
+) -> list:
     if target_datetime is None:
         target_datetime = arrow.utcnow().datetime
-    data = fetch_data(
-        zone_key=zone_key1,
-        kind="exchange",
+    return fetch_range(
+        "exchange",
+        target_datetime,
         session=session,
-        target_datetime=target_datetime,
         logger=logger,
+        zone_key1=zone_key1,
+        zone_key2=zone_key2,
     )
-    exchanges = [
-        format_exchanges_data(
-            zone_key1=zone_key1,
-            zone_key2=zone_key2,
-            data=data,
-            target_datetime=dt,
-        )
-        for dt in get_date_range(target_datetime)
-    ]
-    return exchanges
 
 
 @refetch_frequency(timedelta(days=1))
@@ -362,24 +425,13 @@ def fetch_consumption(
     session: Optional[Session] = None,
     target_datetime: Optional[datetime] = None,
     logger: Logger = getLogger(__name__),
-) -> dict:
+) -> list:
     if target_datetime is None:
         target_datetime = arrow.utcnow().datetime
-    data = fetch_data(
-        zone_key=zone_key,
-        kind="consumption",
+    return fetch_range(
+        "consumption",
+        target_datetime,
         session=session,
-        target_datetime=target_datetime,
         logger=logger,
+        zone_key=zone_key,
     )
-
-    consumption = [
-        format_consumption_data(
-            zone_key=zone_key,
-            data=data,
-            target_datetime=dt,
-        )
-        for dt in get_date_range(target_datetime)
-    ]
-
-    return consumption
@@ -1,16 +1,23 @@
 #!/usr/bin/env python3
 # coding=utf-8
+import time
 from datetime import datetime, timedelta
+from io import StringIO
 from logging import Logger, getLogger
-from typing import Optional
+from threading import Lock
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple, TypeVar
 
 # The arrow library is used to handle datetimes
 import arrow
+import numpy as np
 import pandas as pd
 from requests import Session
 
 from parsers import occtonet
 from parsers.lib.config import refetch_frequency
+from parsers.lib.exceptions import ParserException
+
+T = TypeVar("T")
 
 # Abbreviations
 # JP-HKD : Hokkaido
@@ -37,6 +44,181 @@ sources = {
     "JP-ON": "www.okiden.co.jp/denki/",
 }
 ZONES_ONLY_LIVE = ["JP-TK", "JP-CB", "JP-SK"]
+PRICE_ZONES = [
+    "JP-HKD",
+    "JP-TH",
+    "JP-TK",
+    "JP-CB",
+    "JP-HR",
+    "JP-KN",
+    "JP-CG",
+    "JP-SK",
+    "JP-KY",
+]
+# Headers of the forecast column of hourly tables, JP-KN uses 予想値
+FORECAST_COLUMNS = ["予測値", "予想値"]
+JST_OFFSET = pd.Timedelta(hours=9)
+
+
+# Parsed files are reused by all the fetches of a cycle during this time
+CYCLE_TTL = timedelta(minutes=5)
+CYCLE_CACHE: Dict[str, Tuple[float, object]] = {}
+CYCLE_CACHE_LOCK = Lock()
+
+EXCHANGE_NEIGHBOURS = {
+    "JP-HKD": ["JP-TH"],
+    "JP-TH": ["JP-TK", "JP-HKD"],
+    "JP-TK": ["JP-TH", "JP-CB"],
+    "JP-CB": ["JP-TK", "JP-HR", "JP-KN"],
+    "JP-HR": ["JP-CB", "JP-KN"],
+    "JP-KN": ["JP-CB", "JP-HR", "JP-SK", "JP-CG"],
+    "JP-SK": ["JP-KN", "JP-CG"],
+    "JP-CG": ["JP-KN", "JP-SK", "JP-KY"],
+    "JP-ON": [],
+    "JP-KY": ["JP-CG"],
+}
+
+
+class AreaCSV(NamedTuple):
+    """
+    The two tables of a utility demand CSV: the hourly consumption and its
+    forecast, and the 5-minute consumption (and solar/wind for some areas).
+    Values are converted from 万kW to MW.
+    """
+
+    hourly: pd.DataFrame  # datetime, cons, fcst
+    five_minutes: pd.DataFrame  # datetime, cons, solar[, wind]
+
+
+def get_consumption_url(zone_key: str, datestamp: str, forecast: bool = False) -> str:
+    consumption_url = {
+        "JP-HKD": "http://denkiyoho.hepco.co.jp/area/data/juyo_01_{}.csv".format(
+            datestamp
+        ),
+        "JP-TH": "https://setsuden.nw.tohoku-epco.co.jp/common/demand/juyo_02_{}.csv".format(
+            datestamp
+        ),
+        "JP-TK": "http://www.tepco.co.jp/forecast/html/images/juyo-d-j.csv",
+        "JP-HR": "http://www.rikuden.co.jp/nw/denki-yoho/csv/juyo_05_{}.csv".format(
+            datestamp
+        ),
+        "JP-CB": "https://powergrid.chuden.co.jp/denki_yoho_content_data/juyo_cepco003.csv",
+        "JP-KN": "https://www.kansai-td.co.jp/yamasou/juyo1_kansai.csv",
+        "JP-CG": "https://www.energia.co.jp/nw/jukyuu/sys/juyo_07_{}.csv".format(
+            datestamp
+        ),
+        "JP-SK": "http://www.yonden.co.jp/denkiyoho/juyo_shikoku.csv",
+        "JP-KY": "https://www.kyuden.co.jp/td_power_usages/csv/juyo-hourly-{}.csv".format(
+            datestamp
+        ),
+        "JP-ON": "https://www.okiden.co.jp/denki2/juyo_10_{}.csv".format(datestamp),
+    }
+    if forecast and zone_key == "JP-TK":
+        # TEPCO publishes its forecast in a separate file
+        return "http://www.tepco.co.jp/forecast/html/images/juyo-d1-j.csv"
+    return consumption_url[zone_key]
+
+
+def get_cached(key: str, build: Callable[[], T]) -> T:
+    """Returns the value built for `key` during the current cycle, if any."""
+    now = time.monotonic()
+    with CYCLE_CACHE_LOCK:
+        if key in CYCLE_CACHE and now - CYCLE_CACHE[key][0] < CYCLE_TTL.total_seconds():
+            return CYCLE_CACHE[key][1]
+    value = build()
+    with CYCLE_CACHE_LOCK:
+        for stale_key in [
+            k
+            for k, (built_at, _) in CYCLE_CACHE.items()
+            if now - built_at >= CYCLE_TTL.total_seconds()
+        ]:
+            del CYCLE_CACHE[stale_key]
+        CYCLE_CACHE[key] = (now, value)
+    return value
+
+
+def fetch_csv_text(url: str, session: Optional[Session] = None) -> str:
+    r = (session or Session()).get(url)
+    r.raise_for_status()
+    r.encoding = "shift-jis"
+    return r.text
+
+
+def to_utc(dates: pd.Series, times: pd.Series) -> pd.DatetimeIndex:
+    """Converts local dates (Y/M/D) and times (H:mm, or H:mm AM) to UTC."""
+    local = dates.str.cat(times, sep=" ")
+    if times.str.contains("AM|PM").any():
+        naive = pd.to_datetime(local, format="%Y/%m/%d %I:%M %p")
+    else:
+        naive = pd.to_datetime(local, format="%Y/%m/%d %H:%M")
+    # Japan doesn't observe daylight saving time
+    return pd.DatetimeIndex(naive - JST_OFFSET).tz_localize("UTC")
+
+
+def parse_area_csv(text: str, zone_key: Optional[str] = None) -> AreaCSV:
+    """
+    Splits a utility demand CSV into its tables in a single pass over its lines.
+    Each table starts with a DATE,TIME header and ends at the next blank line.
+    The hourly table is the one with a forecast column, the 5-minute one is
+    the longest. Raises a ParserException if the CSV has neither.
+    """
+    tables: List[List[str]] = []
+    table: Optional[List[str]] = None
+    for line in text.splitlines():
+        if line.startswith("DATE,TIME"):
+            table = [line]
+            tables.append(table)
+        elif not line.strip(",\t "):
+            table = None
+        elif table is not None:
+            table.append(line)
+
+    def read_table(lines: List[str]) -> pd.DataFrame:
+        df = pd.read_csv(StringIO("\n".join(lines)))
+        df.insert(0, "datetime", to_utc(df["DATE"].str.strip(), df["TIME"].str.strip()))
+        return df.drop(columns=["DATE", "TIME"])
+
+    hourly = next(
+        (lines for lines in tables if any(c in lines[0] for c in FORECAST_COLUMNS)),
+        None,
+    )
+    if hourly is None:
+        raise ParserException("JP.py", "unexpected CSV layout", zone_key)
+    five_minutes = max(tables, key=len)
+
+    hourly_df = read_table(hourly[:25])
+    forecast_column = next(
+        (
+            column
+            for column in hourly_df.columns
+            if any(c in column for c in FORECAST_COLUMNS)
+        ),
+        None,
+    )
+    if forecast_column is None:
+        raise ParserException("JP.py", "unexpected CSV layout", zone_key)
+    hourly_df = pd.DataFrame(
+        {
+            "datetime": hourly_df["datetime"],
+            "cons": 10 * hourly_df.iloc[:, 1],
+            "fcst": 10 * hourly_df[forecast_column],
+        }
+    )
+
+    five_minutes_df = read_table(five_minutes).dropna()
+    five_minutes_columns = ["cons", "solar", "wind"][: five_minutes_df.shape[1] - 1]
+    five_minutes_df.columns = ["datetime"] + five_minutes_columns
+    five_minutes_df[five_minutes_columns] *= 10
+    return AreaCSV(hourly_df, five_minutes_df.reset_index(drop=True))
+
+
+def fetch_area_csv(
+    url: str, session: Optional[Session] = None, zone_key: Optional[str] = None
+) -> AreaCSV:
+    """Fetches and parses a utility demand CSV once per cycle."""
+    return get_cached(
+        url, lambda: parse_area_csv(fetch_csv_text(url, session), zone_key)
+    )
 
 
 @refetch_frequency(timedelta(days=1))
@@ -51,14 +233,12 @@ def fetch_production(
     All production is mapped to unknown
     """
     df = fetch_production_df(zone_key, session, target_datetime)
-    # add a row to production for each entry in the dictionary:
+    solar = df["solar"].tolist() if "solar" in df.columns else [None] * len(df)
 
-    datalist = []
-
-    for i in df.index:
-        data = {
+    return [
+        {
             "zoneKey": zone_key,
-            "datetime": df.loc[i, "datetime"].to_pydatetime(),
+            "datetime": dt,
             "production": {
                 "biomass": None,
                 "coal": None,
@@ -66,16 +246,19 @@ def fetch_production(
                 "hydro": None,
                 "nuclear": None,
                 "oil": None,
-                "solar": df.loc[i, "solar"] if "solar" in df.columns else None,
+                "solar": solar_value,
                 "wind": None,
                 "geothermal": None,
-                "unknown": df.loc[i, "unknown"],
+                "unknown": unknown,
             },
             "source": "occtonet.or.jp, {}".format(sources[zone_key]),
         }
-        datalist.append(data)
-
-    return datalist
+        for dt, solar_value, unknown in zip(
+            pd.DatetimeIndex(df["datetime"]).to_pydatetime(),
+            solar,
+            df["unknown"].tolist(),
+        )
+    ]
 
 
 def fetch_production_df(
@@ -88,49 +271,45 @@ def fetch_production_df(
     Calculates production from consumption and imports for a given area.
     All production is mapped to unknown.
     """
-    exch_map = {
-        "JP-HKD": ["JP-TH"],
-        "JP-TH": ["JP-TK", "JP-HKD"],
-        "JP-TK": ["JP-TH", "JP-CB"],
-        "JP-CB": ["JP-TK", "JP-HR", "JP-KN"],
-        "JP-HR": ["JP-CB", "JP-KN"],
-        "JP-KN": ["JP-CB", "JP-HR", "JP-SK", "JP-CG"],
-        "JP-SK": ["JP-KN", "JP-CG"],
-        "JP-CG": ["JP-KN", "JP-SK", "JP-KY"],
-        "JP-ON": [],
-        "JP-KY": ["JP-CG"],
-    }
-    df = fetch_consumption_df(zone_key, target_datetime)
-    df["imports"] = 0
-    for zone in exch_map[zone_key]:
-        df2 = occtonet.fetch_exchange(
+    df = fetch_consumption_df(zone_key, target_datetime, session=session).set_index(
+        "datetime"
+    )
+    imports = pd.Series(0.0, index=df.index)
+    for zone in EXCHANGE_NEIGHBOURS[zone_key]:
+        exchange = occtonet.fetch_exchange(
             zone_key1=zone_key,
             zone_key2=zone,
             session=session,
             target_datetime=target_datetime,
         )
-        df2 = pd.DataFrame(df2)
-        exchname = df2.loc[0, "sortedZoneKeys"]
-        df2 = df2[["datetime", "netFlow"]]
-        df2.columns = ["datetime", exchname]
-        df = pd.merge(df, df2, how="inner", on="datetime")
-        if exchname.split("->")[-1] == zone_key:
-            df["imports"] = df["imports"] + df[exchname]
+        net_flow = pd.Series(
+            [e["netFlow"] for e in exchange],
+            index=pd.DatetimeIndex([e["datetime"] for e in exchange], tz="UTC"),
+            dtype=float,
+        )
+        # Only keep the datetimes known for every exchange
+        imports = imports.reindex(imports.index.intersection(net_flow.index))
+        if sorted([zone_key, zone])[-1] == zone_key:
+            imports += net_flow.reindex(imports.index)
         else:
-            df["imports"] = df["imports"] - df[exchname]
+            imports -= net_flow.reindex(imports.index)
+
+    df = df.loc[imports.index]
+    df["imports"] = imports
     # By default all production is mapped to unknown
     df["unknown"] = df["cons"] - df["imports"]
     # When there is solar, remove it from other production
     if "solar" in df.columns:
         df["unknown"] = df["unknown"] - df["solar"]
 
-    return df
+    return df.rename_axis("datetime").reset_index()
 
 
 def fetch_consumption_df(
     zone_key: str = "JP-TK",
     target_datetime: Optional[datetime] = None,
     logger: Logger = getLogger(__name__),
+    session: Optional[Session] = None,
 ):
     """
     Returns the consumption for an area as a pandas DataFrame.
@@ -139,60 +318,15 @@ def fetch_consumption_df(
     if target_datetime is not None and zone_key in ZONES_ONLY_LIVE:
         raise NotImplementedError("This parser can only fetch live data")
     datestamp = arrow.get(target_datetime).to("Asia/Tokyo").strftime("%Y%m%d")
-    consumption_url = {
-        "JP-HKD": "http://denkiyoho.hepco.co.jp/area/data/juyo_01_{}.csv".format(
-            datestamp
-        ),
-        "JP-TH": "https://setsuden.nw.tohoku-epco.co.jp/common/demand/juyo_02_{}.csv".format(
-            datestamp
-        ),
-        "JP-TK": "http://www.tepco.co.jp/forecast/html/images/juyo-d-j.csv",
-        "JP-HR": "http://www.rikuden.co.jp/nw/denki-yoho/csv/juyo_05_{}.csv".format(
-            datestamp
-        ),
-        "JP-CB": "https://powergrid.chuden.co.jp/denki_yoho_content_data/juyo_cepco003.csv",
-        "JP-KN": "https://www.kansai-td.co.jp/yamasou/juyo1_kansai.csv",
-        "JP-CG": "https://www.energia.co.jp/nw/jukyuu/sys/juyo_07_{}.csv".format(
-            datestamp
-        ),
-        "JP-SK": "http://www.yonden.co.jp/denkiyoho/juyo_shikoku.csv",
-        "JP-KY": "https://www.kyuden.co.jp/td_power_usages/csv/juyo-hourly-{}.csv".format(
-            datestamp
-        ),
-        "JP-ON": "https://www.okiden.co.jp/denki2/juyo_10_{}.csv".format(datestamp),
-    }
-
-    # First roughly 40 rows of the consumption files have hourly data,
-    # the parser skips to the rows with 5-min actual values
-    if zone_key == "JP-KN":
-        startrow = 57
-    else:
-        startrow = 54
-
-    try:
-        df = pd.read_csv(
-            consumption_url[zone_key], skiprows=startrow, encoding="shift-jis"
-        )
-    except pd.errors.EmptyDataError as e:
-        logger.exception("Data not available yet")
-        raise e
-
-    if zone_key in ["JP-TH"]:
-        df.columns = ["Date", "Time", "cons", "solar", "wind"]
-    else:
-        df.columns = ["Date", "Time", "cons", "solar"]
-    # Convert 万kW to MW
-    df["cons"] = 10 * df["cons"]
-    if "solar" in df.columns:
-        df["solar"] = 10 * df["solar"]
 
-    df = df.dropna()
-    df["datetime"] = df.apply(parse_dt, axis=1)
-    if "solar" in df.columns:
-        df = df[["datetime", "cons", "solar"]]
-    else:
-        df = df[["datetime", "cons"]]
-    return df
+    df = fetch_area_csv(
+        get_consumption_url(zone_key, datestamp), session, zone_key
+    ).five_minutes
+    if df.empty:
+        raise ParserException("JP.py", "Data not available yet", zone_key)
+    return df[
+        ["datetime", "cons", "solar"] if "solar" in df.columns else ["datetime", "cons"]
+    ]
 
 
 def fetch_consumption_forecast(
@@ -212,65 +346,33 @@ def fetch_consumption_forecast(
             "Future dates(local time) not implemented for selected region"
         )
 
-    consumption_url = {
-        "JP-HKD": "http://denkiyoho.hepco.co.jp/area/data/juyo_01_{}.csv".format(
-            datestamp
-        ),
-        "JP-TH": "https://setsuden.nw.tohoku-epco.co.jp/common/demand/juyo_02_{}.csv".format(
-            datestamp
-        ),
-        "JP-TK": "http://www.tepco.co.jp/forecast/html/images/juyo-d1-j.csv",
-        "JP-HR": "http://www.rikuden.co.jp/nw/denki-yoho/csv/juyo_05_{}.csv".format(
-            datestamp
-        ),
-        "JP-CB": "https://powergrid.chuden.co.jp/denki_yoho_content_data/juyo_cepco003.csv",
-        "JP-KN": "https://www.kansai-td.co.jp/yamasou/juyo1_kansai.csv",
-        "JP-CG": "https://www.energia.co.jp/nw/jukyuu/sys/juyo_07_{}.csv".format(
-            datestamp
-        ),
-        "JP-SK": "http://www.yonden.co.jp/denkiyoho/juyo_shikoku.csv",
-        "JP-KY": "https://www.kyuden.co.jp/td_power_usages/csv/juyo-hourly-{}.csv".format(
-            datestamp
-        ),
-        "JP-ON": "https://www.okiden.co.jp/denki2/juyo_10_{}.csv".format(datestamp),
-    }
-    # Skip non-tabular data at the start of source files
-    if zone_key == "JP-KN":
-        startrow = 16
-    else:
-        startrow = 13
-    # Read the 24 hourly values
-    df = pd.read_csv(
-        consumption_url[zone_key], skiprows=startrow, nrows=24, encoding="shift-jis"
-    )
-    if zone_key == "JP-KN":
-        df = df[["DATE", "TIME", "予想値(万kW)"]]
-    else:
-        try:
-            df = df[["DATE", "TIME", "予測値(万kW)"]]
-        except KeyError:
-            df = df[["DATE", "TIME", "予測値（万kW)"]]
-    df.columns = ["Date", "Time", "fcst"]
-
-    df["datetime"] = df.apply(parse_dt, axis=1)
-
-    # convert from 万kW to MW
-    df["fcst"] = 10 * df["fcst"]
+    df = fetch_area_csv(
+        get_consumption_url(zone_key, datestamp, forecast=True), session, zone_key
+    ).hourly
     # validate
     df = df.loc[df["fcst"] > 0]
-    # return format
-    data = []
-    for i in df.index:
-        data.append(
-            {
-                "zoneKey": zone_key,
-                "datetime": df.loc[i, "datetime"].to_pydatetime(),
-                "value": float(df.loc[i, "fcst"]),
-                "source": sources[zone_key],
-            }
+    return [
+        {
+            "zoneKey": zone_key,
+            "datetime": dt,
+            "value": value,
+            "source": sources[zone_key],
+        }
+        for dt, value in zip(
+            pd.DatetimeIndex(df["datetime"]).to_pydatetime(),
+            df["fcst"].astype(float).tolist(),
         )
+    ]
 
-    return data
+
+def parse_spot_prices(text: str) -> pd.DataFrame:
+    df = pd.read_csv(StringIO(text)).iloc[:, [0, 1, 6, 7, 8, 9, 10, 11, 12, 13, 14]]
+    df.columns = ["Date", "Period"] + PRICE_ZONES
+    # Periods are the half hours of the day, starting at 1
+    df["datetime"] = to_utc(df["Date"], pd.Series("0:00", index=df.index)) + (
+        pd.to_timedelta(30 * (df["Period"] - 1), unit="min")
+    )
+    return df
 
 
 @refetch_frequency(timedelta(days=1))
@@ -283,80 +385,40 @@ def fetch_price(
     if target_datetime is None:
         target_datetime = datetime.now() + timedelta(days=1)
 
+    if zone_key not in PRICE_ZONES:
+        return []
+
     # price files contain data for fiscal year and not calendar year.
     if target_datetime.month <= 3:
         fiscal_year = target_datetime.year - 1
     else:
         fiscal_year = target_datetime.year
     url = "http://www.jepx.org/market/excel/spot_{}.csv".format(fiscal_year)
-    df = pd.read_csv(url, encoding="shift-jis")
-
-    df = df.iloc[:, [0, 1, 6, 7, 8, 9, 10, 11, 12, 13, 14]]
-    df.columns = [
-        "Date",
-        "Period",
-        "JP-HKD",
-        "JP-TH",
-        "JP-TK",
-        "JP-CB",
-        "JP-HR",
-        "JP-KN",
-        "JP-CG",
-        "JP-SK",
-        "JP-KY",
-    ]
-
-    if zone_key not in df.columns[2:]:
-        return []
+    df = fetch_area_prices(url, session)
 
     start = target_datetime - timedelta(days=1)
-    df["Date"] = pd.to_datetime(df["Date"], format="%Y/%m/%d").dt.date
-    df = df[(df["Date"] >= start.date()) & (df["Date"] <= target_datetime.date())]
-
-    df["datetime"] = df.apply(
-        lambda row: arrow.get(row["Date"])
-        .shift(minutes=30 * (row["Period"] - 1))
-        .replace(tzinfo="Asia/Tokyo"),
-        axis=1,
-    )
+    dates = pd.to_datetime(df["Date"], format="%Y/%m/%d").dt.date
+    df = df[(dates >= start.date()) & (dates <= target_datetime.date())]
 
-    data = list()
-    for row in df.iterrows():
-        data.append(
-            {
-                "zoneKey": zone_key,
-                "currency": "JPY",
-                "datetime": row[1]["datetime"].datetime,
-                "price": round(
-                    int(1000 * row[1][zone_key]), -1
-                ),  # Convert from JPY/kWh to JPY/MWh
-                "source": "jepx.org",
-            }
+    # Convert from JPY/kWh to JPY/MWh
+    prices = np.round((1000 * df[zone_key]).astype(int), -1)
+    return [
+        {
+            "zoneKey": zone_key,
+            "currency": "JPY",
+            "datetime": dt,
+            "price": price,
+            "source": "jepx.org",
+        }
+        for dt, price in zip(
+            pd.DatetimeIndex(df["datetime"]).to_pydatetime(), prices.tolist()
         )
-
-    return data
+    ]
 
 
-def parse_dt(row):
-    """Parses timestamps from date and time."""
-    if "AM" in row["Time"] or "PM" in row["Time"]:
-        timestamp = (
-            arrow.get(
-                " ".join([row["Date"], row["Time"]]).replace("/", "-"),
-                "YYYY-M-D H:mm A",
-            )
-            .replace(tzinfo="Asia/Tokyo")
-            .datetime
-        )
-    else:
-        timestamp = (
-            arrow.get(
-                " ".join([row["Date"], row["Time"]]).replace("/", "-"), "YYYY-M-D H:mm"
-            )
-            .replace(tzinfo="Asia/Tokyo")
-            .datetime
-        )
-    return timestamp
+def fetch_area_prices(url: str, session: Optional[Session] = None) -> pd.DataFrame:
+    """Fetches and parses a JEPX spot price file once per cycle."""
+    return get_cached(url, lambda: parse_spot_prices(fetch_csv_text(url, session)))
 
 
 if __name__ == "__main__":
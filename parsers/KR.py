@@ -13,6 +13,7 @@ from bs4 import BeautifulSoup
 from requests import Session
 
 from parsers.lib.config import refetch_frequency
+from parsers.lib.html_tables import Column, TableSpec, parse_html, read_table
 
 TIMEZONE = "Asia/Seoul"
 REAL_TIME_URL = "https://new.kpx.or.kr/powerinfoSubmain.es?mid=a10606030000"
@@ -23,6 +24,23 @@ LONG_TERM_PRODUCTION_URL = (
 
 pp = pprint.PrettyPrinter(indent=4)
 
+# 5-minute production (MW) of the long term production page, after the header
+# row: datetime, then other, gas, renewable, coal and nuclear.
+# Other can be negative as well as positive due to pumped hydro.
+LONG_TERM_PRODUCTION_TABLE = TableSpec(
+    rows="//tr",
+    columns=[
+        Column("datetime", 0, "datetime", "%Y년 %m월 %d일 %H시 %M분"),
+        Column("other", 1, "number"),
+        Column("gas", 2, "number"),
+        Column("renewable", 3, "number"),
+        Column("coal", 4, "number"),
+        Column("nuclear", 5, "number"),
+    ],
+    skip_head=1,
+    tz=TIMEZONE,
+)
+
 #### Classification of New & Renewable Energy Sources ####
 # Source: https://cms.khnp.co.kr/eng/content/563/main.do?mnCd=EN040101
 # New energy: Hydrogen, Fuel Cell, Coal liquefied or gasified energy, and vacuum residue gasified energy, etc.
@@ -200,48 +218,28 @@ def get_long_term_prod_data(
 
     assert res.status_code == 200
 
-    all_data = []
-
-    soup = BeautifulSoup(res.text, "html.parser")
-    table_rows = soup.find_all("tr")[1:]
-
-    for row in table_rows:
-
-        sanitized_date = [value[:-1] for value in row.find_all("td")[0].text.split(" ")]
-        curr_prod_datetime_string = (
-            "-".join(sanitized_date[:3]) + "T" + ":".join(sanitized_date[3:]) + ":00"
-        )
-        arw_datetime = arrow.get(
-            curr_prod_datetime_string, "YYYY-MM-DDTHH:mm:ss", tzinfo=TIMEZONE
-        ).datetime
+    table = read_table(parse_html(res.content), LONG_TERM_PRODUCTION_TABLE)
+    table["unknown"] = table["other"] + table["renewable"]
 
-        data = {
+    return [
+        {
             "zoneKey": "KR",
-            "datetime": arw_datetime,
+            "datetime": dt,
             "capacity": {},
-            "production": {},
+            "production": {
+                "unknown": unknown,
+                "gas": gas,
+                "coal": coal,
+                "nuclear": nuclear,
+            },
             "storage": {},
             "source": "https://new.kpx.or.kr",
         }
-
-        row_values = row.find_all("td")
-        production_values = [
-            int("".join(value.text.split(","))) for value in row_values[1:]
-        ]
-
-        # order of production_values
-        # 0. other, 1. gas, 2. renewable, 3. coal, 4. nuclear
-        # other can be negative as well as positive due to pumped hydro
-
-        data["datetime"] = arw_datetime
-        data["production"]["unknown"] = production_values[0] + production_values[2]
-        data["production"]["gas"] = production_values[1]
-        data["production"]["coal"] = production_values[3]
-        data["production"]["nuclear"] = production_values[4]
-
-        all_data.append(data)
-
-    return all_data
+        for dt, unknown, gas, coal, nuclear in zip(
+            pd.DatetimeIndex(table["datetime"]).to_pydatetime(),
+            *(table[mode].tolist() for mode in ["unknown", "gas", "coal", "nuclear"]),
+        )
+    ]
 
 
 def get_granular_real_time_prod_data(session: Optional[Session] = None) -> dict:
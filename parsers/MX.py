@@ -1,17 +1,24 @@
 #!/usr/bin/env python3
 
+import time
 import urllib
-from datetime import datetime
-from io import StringIO
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from io import BytesIO, StringIO
 from logging import Logger, getLogger
-from typing import Optional
+from pathlib import Path
+from threading import Lock
+from typing import Optional, Tuple
 
 import arrow
+import numpy as np
 import pandas as pd
 from bs4 import BeautifulSoup
 from dateutil import tz
 from requests import Session
 
+from parsers.lib.cache import get_cache_dir, write_atomic
+
 MX_PRODUCTION_URL = (
     "https://www.cenace.gob.mx/SIM/VISTA/REPORTES/EnergiaGenLiqAgregada.aspx"
 )
@@ -47,15 +54,41 @@ MAPPING = {
     "Turbo Gas": "gas",
 }
 
-# cache where the data for whole months is stored as soon as it has been fetched once
-DATA_CACHE = {}
-
-
-def parse_date(date, hour):
-    tzoffset = tz.tzoffset("CST", -3600 * 6)
-    dt = datetime.strptime(date, "%d/%m/%Y")
-    dt = dt.replace(hour=int(hour) - 1, tzinfo=tzoffset)
-    return dt
+PRODUCTION_MODES = [
+    "biomass",
+    "coal",
+    "gas",
+    "hydro",
+    "nuclear",
+    "oil",
+    "solar",
+    "wind",
+    "geothermal",
+    "unknown",
+]
+
+# CENACE reports in Mexico's standard time all year round
+TZ_OFFSET = tz.tzoffset("CST", -3600 * 6)
+
+# cache where the data for whole months is stored as soon as it has been fetched
+# once, in memory for the most recently used months and on disk for final months,
+# whose data doesn't change anymore
+# month -> (monotonic time of the fetch, whether the month was final then, data)
+DATA_CACHE: "OrderedDict[str, Tuple[float, bool, pd.DataFrame]]" = OrderedDict()
+DATA_CACHE_SIZE = 12
+# the data of months that aren't final is refetched once it is older than this
+CURRENT_MONTH_TTL = timedelta(hours=1)
+# CENACE keeps publishing the last days of a month after it ends, its data is
+# only final, and stored on disk, once the month has been over for this long
+MONTH_PUBLICATION_DELAY = timedelta(days=7)
+DATA_CACHE_LOCK = Lock()
+
+
+def parse_dates(dates: pd.Series, hours: pd.Series) -> pd.Series:
+    """Parses days (DD/MM/YYYY) and hours, hour 1 starting at midnight."""
+    days = pd.to_datetime(dates, format="%d/%m/%Y")
+    naive = days + pd.to_timedelta(hours.astype(int) - 1, unit="h")
+    return naive.dt.tz_localize(TZ_OFFSET)
 
 
 def fetch_csv_for_date(dt, session: Optional[Session] = None):
@@ -113,31 +146,84 @@ def fetch_csv_for_date(dt, session: Optional[Session] = None):
     csv_str = response.text
     csv_str = csv_str[csv_str.find('"Sistema"') :]
 
-    return pd.read_csv(
-        StringIO(csv_str), parse_dates={"instante": [1, 2]}, date_parser=parse_date
-    )
+    df = pd.read_csv(StringIO(csv_str))
+    date_column, hour_column = df.columns[1], df.columns[2]
+    instante = parse_dates(df[date_column], df[hour_column])
+    df = df.drop(columns=[date_column, hour_column])
+    df.insert(0, "instante", instante)
+    return df
 
 
-def convert_production(series):
-    aggregated = {
-        "biomass": 0.0,
-        "coal": 0.0,
-        "gas": 0.0,
-        "hydro": 0.0,
-        "nuclear": 0.0,
-        "oil": 0.0,
-        "solar": 0.0,
-        "wind": 0.0,
-        "geothermal": 0.0,
-        "unknown": 0.0,
-    }
+def is_month_final(month: str) -> bool:
+    """
+    Whether the month `month` (YYYY-MM) has been over in Mexico for
+    `MONTH_PUBLICATION_DELAY`, so that its data won't change anymore.
+    """
+    month_end = arrow.get(month, "YYYY-MM").replace(tzinfo=TZ_OFFSET).shift(months=1)
+    return arrow.utcnow() >= month_end + MONTH_PUBLICATION_DELAY
 
-    for name, val in series.iteritems():
-        name = name.strip()
-        if isinstance(val, float) or isinstance(val, int):
-            target = MAPPING.get(name, "unknown")  # default to unknown
-            aggregated[target] += val
 
+def get_month_data(
+    target_datetime: datetime,
+    session: Optional[Session] = None,
+    cache_dir: Optional[Path] = None,
+) -> pd.DataFrame:
+    """
+    Returns the data of the whole month of `target_datetime`, from the memory
+    cache, the disk cache for final months, or CENACE.
+    """
+    month = target_datetime.strftime("%Y-%m")
+    is_final = is_month_final(month)
+    with DATA_CACHE_LOCK:
+        fetched_at, was_final, df = DATA_CACHE.get(month, (0.0, False, None))
+        # data fetched before the month was final expires like the current month
+        if df is not None and (
+            was_final
+            or time.monotonic() - fetched_at < CURRENT_MONTH_TTL.total_seconds()
+        ):
+            DATA_CACHE.move_to_end(month)
+            return df.copy()
+
+    path = (cache_dir or get_cache_dir("MX")).joinpath(f"{month}.parquet")
+    if is_final and path.exists():
+        df = pd.read_parquet(path)
+        # datetimes are stored in UTC, the offset's name isn't a time zone
+        df["instante"] = df["instante"].dt.tz_convert(TZ_OFFSET)
+    else:
+        df = fetch_csv_for_date(target_datetime, session=session)
+        if is_final:
+            buffer = BytesIO()
+            df.assign(instante=df["instante"].dt.tz_convert("UTC")).to_parquet(
+                buffer, index=False
+            )
+            write_atomic(path, buffer.getvalue())
+
+    with DATA_CACHE_LOCK:
+        DATA_CACHE[month] = (time.monotonic(), is_final, df)
+        DATA_CACHE.move_to_end(month)
+        while len(DATA_CACHE) > DATA_CACHE_SIZE:
+            DATA_CACHE.popitem(last=False)
+    return df.copy()
+
+
+def convert_production(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Sums the numeric columns of `df` by production mode, in a single reduction
+    over all rows. A missing value makes the sum of its mode missing.
+    """
+    columns = [
+        column for column in df.select_dtypes("number").columns if column != "instante"
+    ]
+    # unmapped columns default to unknown
+    modes = [MAPPING.get(column.strip(), "unknown") for column in columns]
+    order = np.argsort([PRODUCTION_MODES.index(mode) for mode in modes], kind="stable")
+    sorted_modes = [modes[i] for i in order]
+    present = list(dict.fromkeys(sorted_modes))
+    aggregated = pd.DataFrame(0.0, index=df.index, columns=PRODUCTION_MODES)
+    if columns:
+        values = df[columns].to_numpy(dtype=float)[:, order]
+        starts = [sorted_modes.index(mode) for mode in present]
+        aggregated[present] = np.add.reduceat(values, starts, axis=1)
     return aggregated
 
 
@@ -157,25 +243,22 @@ def fetch_production(
             "Parser only supports fetching historical production data, please specify a terget_datetime in the past"
         )
 
-    # retrieve data for the month either from the cache or fetch it
-    cache_key = target_datetime.strftime("%Y-%m")
-    if cache_key in DATA_CACHE:
-        df = DATA_CACHE[cache_key]
-    else:
-        df = fetch_csv_for_date(target_datetime, session=session)
-        DATA_CACHE[cache_key] = df
-
-    data = []
-    for idx, series in df.iterrows():
-        data.append(
-            {
-                "zoneKey": zone_key,
-                "datetime": series["instante"].to_pydatetime(),
-                "production": convert_production(series),
-                "source": "cenace.gob.mx",
-            }
+    # retrieve data for the month either from the caches or fetch it
+    df = get_month_data(target_datetime, session=session)
+
+    production = convert_production(df)
+    return [
+        {
+            "zoneKey": zone_key,
+            "datetime": dt,
+            "production": mix,
+            "source": "cenace.gob.mx",
+        }
+        for dt, mix in zip(
+            [ts.to_pydatetime() for ts in df["instante"]],
+            production.to_dict("records"),
         )
-    return data
+    ]
 
 
 def fetch_MX_exchange(sorted_zone_keys: str, s: Session) -> float:
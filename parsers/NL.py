@@ -1,22 +1,24 @@
 #!/usr/bin/env python3
 
 import math
-from copy import copy
 from datetime import datetime, timedelta
 from logging import Logger, getLogger
-from typing import Optional
+from typing import Dict, List, Optional
 
 import arrow
+import numpy as np
 import pandas as pd
 import pytz
-from requests import Session, get
+from requests import Session
 
 from electricitymap.contrib.config import ZONES_CONFIG
 from parsers import DK, ENTSOE
+from parsers.lib.capacity import CapacityStore, YearlyCapacities
 from parsers.lib.config import refetch_frequency
 
 ZONE_CONFIG = ZONES_CONFIG["NL"]
 UTC = pytz.UTC
+CAPACITY_STORE = CapacityStore()
 
 
 @refetch_frequency(timedelta(days=1))
@@ -146,13 +148,13 @@ def fetch_production(
             )
 
     # Add capacities
-    solar_capacity_df = get_solar_capacities()
-    wind_capacity_df = get_wind_capacities()
-    for p in productions:
-        p["capacity"] = {
-            "solar": round(get_solar_capacity_at(p["datetime"], solar_capacity_df), 3),
-            "wind": round(get_wind_capacity_at(p["datetime"], wind_capacity_df), 3),
-        }
+    capacities = get_capacities_at([p["datetime"] for p in productions], r, logger)
+    for p, solar_capacity, wind_capacity in zip(
+        productions,
+        capacities["solar"].round(3).tolist(),
+        capacities["wind"].round(3).tolist(),
+    ):
+        p["capacity"] = {"solar": solar_capacity, "wind": wind_capacity}
 
     # Filter invalid
     # We should probably add logging to this
@@ -244,88 +246,67 @@ def get_production_data_energieopwek(date, session: Optional[Session] = None):
     return df
 
 
-def get_wind_capacities() -> pd.DataFrame:
+def fetch_wind_capacities(
+    session: Optional[Session] = None, logger: Logger = getLogger(__name__)
+) -> YearlyCapacities:
     url_wind_capacities = "https://api.windstats.nl/stats"
 
-    capacities_df = pd.DataFrame(columns=["datetime", "capacity (MW)"])
-    try:
-        r = get(url_wind_capacities)
-        per_year_split_capacity = r.json()["combinedPowerPerYearSplitByLandAndSea"]
-    except Exception as e:
-        Logger.error(f"Error fetching wind capacities: {e}")
-        return capacities_df
-
-    per_year_capacity = {
-        f"{year}-01-01 00:00:00+00:00": sum(split.values())
+    r = (session or Session()).get(url_wind_capacities)
+    per_year_split_capacity = r.json()["combinedPowerPerYearSplitByLandAndSea"]
+    return {
+        int(year): float(sum(split.values()))
         for (year, split) in per_year_split_capacity.items()
     }
 
-    capacities_df["datetime"] = pd.to_datetime(list(per_year_capacity.keys()))
-    capacities_df["capacity (MW)"] = list(per_year_capacity.values())
-    capacities_df = capacities_df.set_index("datetime")
-
-    return capacities_df
-
 
-def get_solar_capacities() -> pd.DataFrame:
+def fetch_solar_capacities(
+    session: Optional[Session] = None, logger: Logger = getLogger(__name__)
+) -> YearlyCapacities:
     solar_capacity_base_url = "https://opendata.cbs.nl/ODataApi/odata/82610ENG/UntypedDataSet?$filter=((EnergySourcesTechniques+eq+%27E006590+%27))+and+("
 
     START_YEAR = 2010
     end_year = arrow.now().year
 
-    years = list(range(START_YEAR, end_year + 1))
-    url_solar_capacity = copy(solar_capacity_base_url)
+    url_solar_capacity = solar_capacity_base_url + "+or+".join(
+        f"(Periods+eq+%27{year}JJ00%27)" for year in range(START_YEAR, end_year + 1)
+    )
+    url_solar_capacity += ")"
 
-    for i, year in enumerate(years):
-        if i == len(years) - 1:
-            url_solar_capacity += f"(Periods+eq+%27{year}JJ00%27))"
-        else:
-            url_solar_capacity += f"(Periods+eq+%27{year}JJ00%27)+or+"
-
-    solar_capacity_df = pd.DataFrame(columns=["datetime", "capacity (MW)"])
-
-    try:
-        r = get(url_solar_capacity)
-        per_year_capacity = r.json()["value"]
-    except Exception as e:
-        Logger.error(f"Error fetching solar capacities: {e}")
-        return solar_capacity_df
-
-    for yearly_row in per_year_capacity:
-        capacity = float(yearly_row["ElectricalCapacityEndOfYear_8"])
-        datetime = arrow.get(yearly_row["Periods"].split("JJ")[0]).format()
-        solar_capacity_df = solar_capacity_df.append(
-            {"datetime": datetime, "capacity (MW)": capacity}, ignore_index=True
+    r = (session or Session()).get(url_solar_capacity)
+    per_year_capacity = r.json()["value"]
+    return {
+        int(yearly_row["Periods"].split("JJ")[0]): float(
+            yearly_row["ElectricalCapacityEndOfYear_8"]
         )
-    solar_capacity_df.datetime = pd.to_datetime(solar_capacity_df.datetime)
-    solar_capacity_df = solar_capacity_df.set_index("datetime")
-
-    return solar_capacity_df
-
-
-def _get_capacity_at(date: datetime, mode: str, capacity_df: pd.DataFrame) -> float:
-    assert mode in ["solar", "wind"]
-    default_capacity = ZONE_CONFIG["capacity"][mode]
-    if capacity_df.empty:
-        return default_capacity
-    latest_year = date.year
-    while latest_year > 2015:
-        # Latest capacity for the year to date might not have been published yet, so revert back to latest known year
-        if capacity_df[capacity_df.index.year == latest_year]["capacity (MW)"].empty:
-            latest_year -= 1
-        else:
-            return float(
-                capacity_df[capacity_df.index.year == latest_year]["capacity (MW)"][0]
-            )
-    return default_capacity
-
-
-def get_solar_capacity_at(date: datetime, solar_capacity_df: pd.DataFrame) -> float:
-    return _get_capacity_at(date, "solar", solar_capacity_df)
+        for yearly_row in per_year_capacity
+    }
 
 
-def get_wind_capacity_at(date: datetime, wind_capacity_df: pd.DataFrame) -> float:
-    return _get_capacity_at(date, "wind", wind_capacity_df)
+def get_capacities_at(
+    datetimes: List[datetime],
+    session: Optional[Session] = None,
+    logger: Logger = getLogger(__name__),
+) -> Dict[str, np.ndarray]:
+    """
+    Returns the solar and wind capacities at each of `datetimes`, from the
+    yearly capacities kept in the capacity store.
+    """
+    return {
+        mode: CAPACITY_STORE.capacity_at(
+            "NL",
+            mode,
+            datetimes,
+            fetch=lambda: fetch(session, logger),
+            # Latest capacity for the year to date might not have been published
+            # yet, so revert back to the latest known year since 2016
+            min_year=2016,
+            logger=logger,
+        )
+        for mode, fetch in [
+            ("solar", fetch_solar_capacities),
+            ("wind", fetch_wind_capacities),
+        ]
+    }
 
 
 if __name__ == "__main__":
@@ -3,6 +3,7 @@ from logging import Logger, getLogger
 from typing import Dict, List, Mapping, Optional, Tuple, Union
 
 import arrow
+import numpy as np
 import pandas as pd
 import requests
 from requests import Session
@@ -63,30 +64,121 @@ OPENNEM_STORAGE_CATEGORIES = {
 SOURCE = "opennem.org.au"
 
 
-def dataset_to_df(dataset):
-    series = dataset["history"]
-    interval = series["interval"]
-    dt_start = arrow.get(series["start"]).datetime
-    dt_end = arrow.get(series["last"]).datetime
+def _dataset_name(dataset: Mapping) -> str:
     data_type = dataset["data_type"]
-    _id = dataset.get("id")
-
     if data_type != "power":
-        name = data_type.upper()
-    else:
-        # When `power` is given, the multiple power sources will be given
-        # we therefore set `name` to the power source
-        name = _id.split(".")[-2].upper()
+        return data_type.upper()
+    # When `power` is given, the multiple power sources will be given
+    # we therefore set `name` to the power source
+    return dataset.get("id").split(".")[-2].upper()
 
+
+def _interval_to_ns(interval: str) -> int:
     # Turn into minutes
     if interval[-1] == "m":
         interval += "in"
+    return pd.Timedelta(interval).value
+
+
+class DecodedPayload:
+    """
+    All datasets of an OpenNEM payload, decoded once into a single preallocated
+    [time x dataset] array.
+
+    Every dataset is a regular series described by its `start`, `last` and
+    `interval`. They are all placed on one shared UTC grid whose step is the
+    greatest common divisor of the intervals, so that no per-dataset index
+    needs to be built. Production, price and exchange frames for any region
+    are then column selections of that array.
+    """
+
+    def __init__(self, datasets: List[Mapping]):
+        self.datasets = datasets
+        self.names = [_dataset_name(ds) for ds in datasets]
+        self.types = [ds["type"] for ds in datasets]
+        self.regions = [ds.get("region") for ds in datasets]
+        self.ids = [ds.get("id").split(".")[-2] for ds in datasets]
+
+        histories = [ds["history"] for ds in datasets]
+        starts = np.array(
+            [pd.Timestamp(h["start"]).value for h in histories], dtype=np.int64
+        )
+        lasts = np.array(
+            [pd.Timestamp(h["last"]).value for h in histories], dtype=np.int64
+        )
+        intervals = np.array(
+            [_interval_to_ns(h["interval"]) for h in histories], dtype=np.int64
+        )
+        lengths = np.array([len(h["data"]) for h in histories], dtype=np.int64)
+        assert ((lasts - starts) // intervals + 1 == lengths).all()
+
+        origin = starts.min() if datasets else 0
+        step = np.gcd.reduce(np.concatenate([intervals, starts - origin, [0]]))
+        n_steps = (lasts.max() - origin) // step + 1 if datasets else 0
+        self.timestamps = origin + step * np.arange(n_steps, dtype=np.int64)
+
+        self.values = np.full((n_steps, len(datasets)), np.nan)
+        self.rows = []
+        for j, history in enumerate(histories):
+            rows = (starts[j] - origin) // step + np.arange(lengths[j]) * (
+                intervals[j] // step
+            )
+            # `None` values are decoded as NaN
+            self.values[rows, j] = np.array(history["data"], dtype=float)
+            self.rows.append(rows)
+
+    def select(
+        self,
+        data_type: str,
+        zone_key: Optional[str] = None,
+        sorted_zone_keys: Optional[List[str]] = None,
+    ) -> List[int]:
+        """Returns the positions of the datasets of a zone or an exchange."""
+        region = ZONE_KEY_TO_REGION.get(zone_key)
+        flow_id = None
+        if sorted_zone_keys:
+            flow_id = EXCHANGE_MAPPING_DICTIONARY["->".join(sorted_zone_keys)][
+                "region_id"
+            ]
+        return [
+            j
+            for j, (_type, _region, _id) in enumerate(
+                zip(self.types, self.regions, self.ids)
+            )
+            if _type == data_type
+            and ((zone_key and _region == region) or (flow_id and _id == flow_id))
+        ]
 
-    index = pd.date_range(start=dt_start, end=dt_end, freq=interval)
-    assert len(index) == len(series["data"])
-    df = pd.DataFrame(index=index, data=series["data"], columns=[name])
-
-    return df
+    def to_df(
+        self, positions: List[int], logger: Logger = getLogger(__name__)
+    ) -> pd.DataFrame:
+        """
+        Returns the selected datasets as a DataFrame. Only timestamps covered by
+        at least one of them are kept, which is the index `pd.concat` would
+        have produced.
+        """
+        # Sometimes we get twice the columns. In that case, only keep the first one
+        names = [self.names[j] for j in positions]
+        first_positions = dict(zip(reversed(names), reversed(positions)))
+        if len(first_positions) != len(names):
+            duplicated = sorted({name for name in names if names.count(name) > 1})
+            logger.warning(f"Dropping columns {duplicated} that appear more than once")
+        names = list(dict.fromkeys(names))
+        positions = [first_positions[name] for name in names]
+
+        covered = np.zeros(len(self.timestamps), dtype=bool)
+        for j in positions:
+            covered[self.rows[j]] = True
+        covered_rows = np.flatnonzero(covered)
+
+        index = pd.DatetimeIndex(self.timestamps[covered_rows], tz="UTC")
+        values = self.values[np.ix_(covered_rows, positions)]
+        return pd.DataFrame(values, index=index, columns=names)
+
+
+def datasets_to_df(datasets: List[Mapping], logger: Logger = getLogger(__name__)):
+    """Decodes datasets into a single [time x dataset] DataFrame."""
+    return DecodedPayload(datasets).to_df(range(len(datasets)), logger=logger)
 
 
 def process_solar_rooftop(df: pd.DataFrame) -> pd.DataFrame:
@@ -122,6 +214,38 @@ def sum_vector(pd_series, keys, ignore_nans=False):
         return None
 
 
+def category_matrix(columns: List[str], categories: Mapping[str, List[str]]):
+    """Returns a [column x category] matrix with ones where a column belongs to a category."""
+    return np.array(
+        [[column in keys for keys in categories.values()] for column in columns],
+        dtype=float,
+    ).reshape(len(columns), len(categories))
+
+
+def sum_categories(
+    values: np.ndarray,
+    columns: List[str],
+    categories: Mapping[str, List[str]],
+    ignore_nans=False,
+) -> np.ndarray:
+    """
+    Vectorised `sum_vector` for all categories at once.
+    `values` is a [column] vector or a [time x column] array. Categories for which
+    `sum_vector` would return None are set to NaN.
+    """
+    mapping = category_matrix(columns, categories)
+    totals = np.nan_to_num(values) @ mapping
+    invalid = ~mapping.any(axis=0)
+    if not ignore_nans:
+        invalid = invalid | (np.isnan(values) @ mapping > 0)
+    return np.where(invalid, np.nan, totals)
+
+
+def nan_to_none(values: np.ndarray) -> list:
+    """Converts an array to (nested) lists of floats, with None instead of NaN."""
+    return np.where(np.isnan(values), None, values).tolist()
+
+
 def filter_production_objs(
     objs: List[Dict], logger: Logger = getLogger(__name__)
 ) -> List[Dict]:
@@ -171,6 +295,19 @@ def generate_url(
     return url
 
 
+def fetch_decoded_payload(
+    url: str, session: Optional[Session], logger: Logger
+) -> DecodedPayload:
+    # Fetches the last week of data
+    logger.info(f"Requesting {url}..")
+    r = (session or requests).get(url)
+    r.raise_for_status()
+    logger.debug("Parsing JSON..")
+    datasets = r.json()["data"]
+    logger.debug("Decoding datasets..")
+    return DecodedPayload(datasets)
+
+
 def fetch_main_price_df(
     zone_key: Union[str, None] = None,
     sorted_zone_keys: Union[str, None] = None,
@@ -195,17 +332,26 @@ def fetch_main_power_df(
     target_datetime: Optional[datetime] = None,
     logger: Logger = getLogger(__name__),
 ) -> Tuple[pd.DataFrame, list]:
-    df, filtered_datasets = _fetch_main_df(
-        "power",
-        zone_key=zone_key,
-        sorted_zone_keys=sorted_zone_keys,
-        session=session,
+    payload = _fetch_payload(
+        zone_key, sorted_zone_keys, session, target_datetime, logger
+    )
+    return _get_power_df(payload, zone_key, sorted_zone_keys, logger)
+
+
+def _fetch_payload(
+    zone_key: Optional[str],
+    sorted_zone_keys: Optional[List[str]],
+    session: Optional[Session],
+    target_datetime: Optional[datetime],
+    logger: Logger,
+) -> DecodedPayload:
+    url = generate_url(
+        zone_key=zone_key or sorted_zone_keys[0],
+        is_flow=sorted_zone_keys is not None,
         target_datetime=target_datetime,
         logger=logger,
     )
-    # Solar rooftop is a special case
-    df = process_solar_rooftop(df)
-    return df, filtered_datasets
+    return fetch_decoded_payload(url, session, logger)
 
 
 def _fetch_main_df(
@@ -216,46 +362,36 @@ def _fetch_main_df(
     target_datetime: datetime,
     logger: Logger,
 ) -> Tuple[pd.DataFrame, list]:
-    region = ZONE_KEY_TO_REGION.get(zone_key)
-    url = generate_url(
-        zone_key=zone_key or sorted_zone_keys[0],
-        is_flow=sorted_zone_keys is not None,
-        target_datetime=target_datetime,
-        logger=logger,
+    payload = _fetch_payload(
+        zone_key, sorted_zone_keys, session, target_datetime, logger
     )
+    return _get_main_df(payload, data_type, zone_key, sorted_zone_keys, logger)
 
-    # Fetches the last week of data
-    logger.info(f"Requesting {url}..")
-    r = (session or requests).get(url)
-    r.raise_for_status()
-    logger.debug("Parsing JSON..")
-    datasets = r.json()["data"]
-    logger.debug("Filtering datasets..")
-
-    def filter_dataset(ds: dict) -> bool:
-        filter_data_type = ds["type"] == data_type
-        filter_region = False
-        if zone_key:
-            filter_region |= ds.get("region") == region
-        if sorted_zone_keys:
-            filter_region |= (
-                ds.get("id").split(".")[-2]
-                == EXCHANGE_MAPPING_DICTIONARY["->".join(sorted_zone_keys)]["region_id"]
-            )
-        return filter_data_type and filter_region
 
-    filtered_datasets = [ds for ds in datasets if filter_dataset(ds)]
-    logger.debug("Concatenating datasets..")
-    df = pd.concat([dataset_to_df(ds) for ds in filtered_datasets], axis=1)
+def _get_main_df(
+    payload: DecodedPayload,
+    data_type: str,
+    zone_key: Optional[str],
+    sorted_zone_keys: Optional[List[str]],
+    logger: Logger,
+) -> Tuple[pd.DataFrame, list]:
+    logger.debug("Filtering datasets..")
+    positions = payload.select(data_type, zone_key, sorted_zone_keys)
+    filtered_datasets = [payload.datasets[j] for j in positions]
+    return payload.to_df(positions, logger=logger), filtered_datasets
 
-    # Sometimes we get twice the columns. In that case, only return the first one
-    is_duplicated_column = df.columns.duplicated(keep="last")
-    if is_duplicated_column.sum():
-        logger.warning(
-            f"Dropping columns {df.columns[is_duplicated_column]} that appear more than once"
-        )
-        df = df.loc[:, is_duplicated_column]
 
+def _get_power_df(
+    payload: DecodedPayload,
+    zone_key: Optional[str],
+    sorted_zone_keys: Optional[List[str]],
+    logger: Logger,
+) -> Tuple[pd.DataFrame, list]:
+    df, filtered_datasets = _get_main_df(
+        payload, "power", zone_key, sorted_zone_keys, logger
+    )
+    # Solar rooftop is a special case
+    df = process_solar_rooftop(df)
     return df, filtered_datasets
 
 
@@ -266,86 +402,83 @@ def fetch_production(
     target_datetime: Optional[Session] = None,
     logger: Logger = getLogger(__name__),
 ):
-    df, filtered_datasets = fetch_main_power_df(
-        zone_key=zone_key,
-        session=session,
-        target_datetime=target_datetime,
-        logger=logger,
-    )
+    payload = _fetch_payload(zone_key, None, session, target_datetime, logger)
+    return _get_production(payload, zone_key, logger)
+
+
+def _get_production(
+    payload: DecodedPayload, zone_key: str, logger: Logger
+) -> List[Dict]:
+    df, filtered_datasets = _get_power_df(payload, zone_key, None, logger)
     region = ZONE_KEY_TO_REGION.get(zone_key)
     if region:
         capacities = get_capacities(filtered_datasets, region)
     else:
-        capacities = pd.Series()
+        capacities = pd.Series(dtype=float)
 
     # Drop interconnectors
-    df = df.drop([x for x in df.columns if "->" in x], axis=1)
+    columns = [x for x in df.columns if "->" not in x]
+    values = df[columns].to_numpy(dtype=float, copy=True)
 
     # Make sure charging is counted positively
     # and discharging negetively
-    if "BATTERY_DISCHARGING" in df.columns:
-        df["BATTERY_DISCHARGING"] = df["BATTERY_DISCHARGING"] * -1
+    if "BATTERY_DISCHARGING" in columns:
+        values[:, columns.index("BATTERY_DISCHARGING")] *= -1
 
     logger.debug("Preparing final objects..")
+    # We here assume all rooftop solar is fed to the grid
+    # This assumption should be checked and we should here only report
+    # grid-level generation
+    production = sum_categories(values, columns, OPENNEM_PRODUCTION_CATEGORIES)
+    # opennem reports charging as negative, we here should report as positive
+    # Note: we made the sign switch before, so we can just sum them up.
+    # opennem reports pumping as positive, we here should report as positive
+    storage = sum_categories(values, columns, OPENNEM_STORAGE_CATEGORIES)
+
+    # Validation: set small negative values to 0 for entries that are kept
+    solar = production[:, list(OPENNEM_PRODUCTION_CATEGORIES).index("solar")]
+    is_small_negative = (production < 0) & (production > -50)
+    is_small_negative &= ~np.isnan(solar)[:, np.newaxis]
+    for i, j in np.argwhere(is_small_negative):
+        logger.warning(
+            f"Setting small value of {list(OPENNEM_PRODUCTION_CATEGORIES)[j]} "
+            f"({production[i, j]}) to 0.",
+            extra={"key": zone_key},
+        )
+    production[is_small_negative] = 0
+
+    capacity = dict(
+        zip(
+            OPENNEM_PRODUCTION_CATEGORIES,
+            nan_to_none(
+                sum_categories(
+                    capacities.to_numpy(dtype=float),
+                    list(capacities.index),
+                    OPENNEM_PRODUCTION_CATEGORIES,
+                )
+            ),
+        )
+    )
+    capacity["hydro storage"] = capacities.get(OPENNEM_STORAGE_CATEGORIES["hydro"][0])
+    capacity["battery storage"] = capacities.get(
+        OPENNEM_STORAGE_CATEGORIES["battery"][0]
+    )
+
     objs = [
         {
-            "datetime": arrow.get(dt.to_pydatetime()).datetime,
-            "production": {  # Unit is MW
-                "coal": sum_vector(row, OPENNEM_PRODUCTION_CATEGORIES["coal"]),
-                "gas": sum_vector(row, OPENNEM_PRODUCTION_CATEGORIES["gas"]),
-                "oil": sum_vector(row, OPENNEM_PRODUCTION_CATEGORIES["oil"]),
-                "hydro": sum_vector(row, OPENNEM_PRODUCTION_CATEGORIES["hydro"]),
-                "wind": sum_vector(row, OPENNEM_PRODUCTION_CATEGORIES["wind"]),
-                "biomass": sum_vector(row, OPENNEM_PRODUCTION_CATEGORIES["biomass"]),
-                # We here assume all rooftop solar is fed to the grid
-                # This assumption should be checked and we should here only report
-                # grid-level generation
-                "solar": sum_vector(row, OPENNEM_PRODUCTION_CATEGORIES["solar"]),
-            },
-            "storage": {
-                # opennem reports charging as negative, we here should report as positive
-                # Note: we made the sign switch before, so we can just sum them up
-                "battery": sum_vector(row, OPENNEM_STORAGE_CATEGORIES["battery"]),
-                # opennem reports pumping as positive, we here should report as positive
-                "hydro": sum_vector(row, OPENNEM_STORAGE_CATEGORIES["hydro"]),
-            },
-            "capacity": {
-                "coal": sum_vector(capacities, OPENNEM_PRODUCTION_CATEGORIES["coal"]),
-                "gas": sum_vector(capacities, OPENNEM_PRODUCTION_CATEGORIES["gas"]),
-                "oil": sum_vector(capacities, OPENNEM_PRODUCTION_CATEGORIES["oil"]),
-                "hydro": sum_vector(capacities, OPENNEM_PRODUCTION_CATEGORIES["hydro"]),
-                "wind": sum_vector(capacities, OPENNEM_PRODUCTION_CATEGORIES["wind"]),
-                "biomass": sum_vector(
-                    capacities, OPENNEM_PRODUCTION_CATEGORIES["biomass"]
-                ),
-                "solar": sum_vector(capacities, OPENNEM_PRODUCTION_CATEGORIES["solar"]),
-                "hydro storage": capacities.get(OPENNEM_STORAGE_CATEGORIES["hydro"][0]),
-                "battery storage": capacities.get(
-                    OPENNEM_STORAGE_CATEGORIES["battery"][0]
-                ),
-            },
+            "datetime": dt,
+            "production": dict(zip(OPENNEM_PRODUCTION_CATEGORIES, production_row)),
+            "storage": dict(zip(OPENNEM_STORAGE_CATEGORIES, storage_row)),
+            "capacity": dict(capacity),
             "source": SOURCE,
             "zoneKey": zone_key,
         }
-        for dt, row in df.iterrows()
+        for dt, production_row, storage_row in zip(
+            df.index.to_pydatetime(), nan_to_none(production), nan_to_none(storage)
+        )
     ]
 
-    objs = filter_production_objs(objs)
-
-    # Validation
-    logger.debug("Validating..")
-    for obj in objs:
-        for k, v in obj["production"].items():
-            if v is None:
-                continue
-            if v < 0 and v > -50:
-                # Set small negative values to 0
-                logger.warning(
-                    f"Setting small value of {k} ({v}) to 0.", extra={"key": zone_key}
-                )
-                obj["production"][k] = 0
-
-    return objs
+    return filter_production_objs(objs, logger=logger)
 
 
 @refetch_frequency(REFETCH_FREQUENCY)
@@ -355,22 +488,25 @@ def fetch_price(
     target_datetime: Optional[datetime] = None,
     logger: Logger = getLogger(__name__),
 ) -> list:
-    df = fetch_main_price_df(
-        zone_key=zone_key,
-        session=session,
-        target_datetime=target_datetime,
-        logger=logger,
-    )
-    df = df.loc[~df["PRICE"].isna()]  # Only keep prices that are defined
+    payload = _fetch_payload(zone_key, None, session, target_datetime, logger)
+    return _get_price(payload, zone_key, logger)
+
+
+def _get_price(payload: DecodedPayload, zone_key: str, logger: Logger) -> List[Dict]:
+    df, _ = _get_main_df(payload, "price", zone_key, None, logger)
+    prices = df["PRICE"].to_numpy(dtype=float)
+    is_defined = ~np.isnan(prices)  # Only keep prices that are defined
     return [
         {
-            "datetime": arrow.get(dt.to_pydatetime()).datetime,
-            "price": sum_vector(row, ["PRICE"]),  # currency / MWh
+            "datetime": dt,
+            "price": price,  # currency / MWh
             "currency": "AUD",
             "source": SOURCE,
             "zoneKey": zone_key,
         }
-        for dt, row in df.iterrows()
+        for dt, price in zip(
+            df.index[is_defined].to_pydatetime(), prices[is_defined].tolist()
+        )
     ]
 
 
@@ -383,29 +519,75 @@ def fetch_exchange(
     logger: Logger = getLogger(__name__),
 ) -> list:
     sorted_zone_keys = sorted([zone_key1, zone_key2])
+    payload = _fetch_payload(None, sorted_zone_keys, session, target_datetime, logger)
+    return _get_exchange(payload, sorted_zone_keys, logger)
+
+
+def _get_exchange(
+    payload: DecodedPayload, sorted_zone_keys: List[str], logger: Logger
+) -> List[Dict]:
     key = "->".join(sorted_zone_keys)
-    df, _ = fetch_main_power_df(
-        sorted_zone_keys=sorted_zone_keys,
-        session=session,
-        target_datetime=target_datetime,
-        logger=logger,
-    )
+    df, _ = _get_power_df(payload, None, sorted_zone_keys, logger)
     direction = EXCHANGE_MAPPING_DICTIONARY[key]["direction"]
 
     # Take the first column (there's only one)
-    series = df.iloc[:, 0]
+    net_flows = df.iloc[:, 0].to_numpy(dtype=float) * direction
 
     return [
         {
-            "datetime": arrow.get(dt.to_pydatetime()).datetime,
-            "netFlow": value * direction,
+            "datetime": dt,
+            "netFlow": net_flow,
             "source": SOURCE,
             "sortedZoneKeys": key,
         }
-        for dt, value in series.iteritems()
+        for dt, net_flow in zip(df.index.to_pydatetime(), net_flows.tolist())
     ]
 
 
+def fetch_network(
+    network: Optional[str] = None,
+    session: Optional[Session] = None,
+    target_datetime: Optional[datetime] = None,
+    logger: Logger = getLogger(__name__),
+) -> Dict[str, Dict[str, List[Dict]]]:
+    """
+    Fetches production, price and exchange events of every zone of a network
+    (`NEM` or `WEM`, or all of them when not given).
+
+    Each distinct payload is downloaded and decoded only once: in real time
+    a single payload contains every region and interconnector.
+
+    Returns a dictionary in the form:
+    {
+        "production": {zone_key: [...]},
+        "price": {zone_key: [...]},
+        "exchange": {sorted_zone_keys: [...]},
+    }
+    """
+    payloads: Dict[str, DecodedPayload] = {}
+
+    def get_payload(zone_key: str, is_flow: bool) -> DecodedPayload:
+        url = generate_url(zone_key, is_flow, target_datetime, logger)
+        if url not in payloads:
+            payloads[url] = fetch_decoded_payload(url, session, logger)
+        return payloads[url]
+
+    events = {"production": {}, "price": {}, "exchange": {}}
+    for zone_key, zone_network in ZONE_KEY_TO_NETWORK.items():
+        if network not in (None, zone_network):
+            continue
+        payload = get_payload(zone_key, is_flow=False)
+        events["production"][zone_key] = _get_production(payload, zone_key, logger)
+        events["price"][zone_key] = _get_price(payload, zone_key, logger)
+    for key in EXCHANGE_MAPPING_DICTIONARY:
+        sorted_zone_keys = key.split("->")
+        if network not in (None, ZONE_KEY_TO_NETWORK[sorted_zone_keys[0]]):
+            continue
+        payload = get_payload(sorted_zone_keys[0], is_flow=True)
+        events["exchange"][key] = _get_exchange(payload, sorted_zone_keys, logger)
+    return events
+
+
 if __name__ == "__main__":
     """Main method, never used by the electricityMap backend, but handy for testing."""
     # print(fetch_price('AUS-SA'))
@@ -12,6 +12,8 @@ import pandas as pd
 from bs4 import BeautifulSoup
 from requests import Session
 
+from .lib.html_tables import Column, TableSpec, parse_html, read_table
+
 TIMEZONE = "America/Panama"
 
 EXCHANGE_URL = "https://sitr.cnd.com.pa/m/pub/int.html"
@@ -99,6 +101,23 @@ MAP_THERMAL_GENERATION_UNIT_NAME_TO_FUEL_TYPE = {
 }
 
 
+# Units of the tables of the "Térmicas (MW)" tile, their output being coloured
+# by state.
+THERMAL_UNITS_TABLE = TableSpec(
+    rows=(
+        "//h3[contains(., 'Térmicas')]/following-sibling::*[1]"
+        "//table[contains(concat(' ', @class, ' '), ' sitr-gen-group ')]//tr"
+    ),
+    columns=[
+        Column("unit", 0),
+        Column("generation", 1, "number"),
+        Column("colour", "td[2]/span/@style"),
+    ],
+)
+# Units whose output counts towards the thermal generation
+THERMAL_UNIT_COLOURS = ["color:#222", "color:ROYALBLUE"]
+
+
 def extract_pie_chart_data(html):
     """Extracts generation breakdown pie chart data from the source code of the page"""
     data_source = re.search(r"var localPie = (\[\{.+\}\]);", html).group(
@@ -110,7 +129,7 @@ def extract_pie_chart_data(html):
     return json.loads(data_source)
 
 
-def sum_thermal_units(soup) -> float:
+def sum_thermal_units(thermal_units: pd.DataFrame) -> float:
     """
     Sums thermal units of the generation mix to prevent using slightly outdated chart data.
 
@@ -118,29 +137,12 @@ def sum_thermal_units(soup) -> float:
     presumably because they aren't updated at the exact same moment.
     """
 
-    thermal_h3 = soup.find("h3", string=re.compile(r"\s*Térmicas\s*"))
-    thermal_tables = thermal_h3.find_next_sibling().find_all(
-        "table", {"class": "table table-hover table-striped table-sm sitr-gen-group"}
+    return float(
+        thermal_units["generation"][
+            thermal_units["colour"].isin(THERMAL_UNIT_COLOURS)
+        ].sum()
     )
 
-    thermal_units = 0
-
-    for thermal_table in thermal_tables:
-        thermal_units += sum(
-            [
-                float(span.text)
-                for span in thermal_table.find_all("span", {"style": "color:#222"})
-            ]
-        )
-        thermal_units += sum(
-            [
-                float(span.text)
-                for span in thermal_table.find_all("span", {"style": "color:ROYALBLUE"})
-            ]
-        )
-
-    return thermal_units
-
 
 def fetch_production(
     zone_key: str = "PA",
@@ -158,15 +160,20 @@ def fetch_production(
     response = r.get(url)
     response.encoding = "utf-8"
     html_doc = response.text
-    soup = BeautifulSoup(html_doc, "html.parser")
+    document = parse_html(response.content)
 
     # Parse production from pie chart
     productions = extract_pie_chart_data(
         html_doc
     )  # [{name:"Hídrica 1342.54 (80.14%)",value:1342.54,color:"#99ccee"}, ...]
 
-    # Sum thermal units from table Térmicas (MW)
-    thermal_sum = sum_thermal_units(soup)
+    # Thermal units from table Térmicas (MW)
+    thermal_units = read_table(document, THERMAL_UNITS_TABLE)
+    assert not thermal_units.empty, (
+        "Exception when extracting thermal generation breakdown for {}: no table "
+        "found under the 'Térmicas' header".format(zone_key)
+    )
+    thermal_sum = sum_thermal_units(thermal_units)
 
     map_generation = {
         "Hídrica": "hydro",
@@ -203,29 +210,9 @@ def fetch_production(
     data["production"]["unknown"] = thermal_sum
 
     # Known fossil plants: parse, subtract from "unknown", add to "coal"/"oil"/"gas"
-    thermal_production_breakdown = soup.find_all("table", {"class": "sitr-table-gen"})[
-        1
-    ]
-    # Make sure the table header is indeed "Térmicas (MW)" (in case the tables are re-arranged)
-    thermal_production_breakdown_table_header = (
-        thermal_production_breakdown.parent.parent.parent.select("> .tile-title")[
-            0
-        ].string
-    )
-    assert "Térmicas" in thermal_production_breakdown_table_header, (
-        "Exception when extracting thermal generation breakdown for {}: table header does not contain "
-        "'Térmicas' but is instead named {}".format(
-            zone_key, thermal_production_breakdown_table_header
-        )
-    )
-    thermal_production_units = thermal_production_breakdown.select(
-        "tbody tr td table.sitr-gen-group tr"
-    )
-
-    for thermal_production_unit in thermal_production_units:
-        unit_name_and_generation = thermal_production_unit.find_all("td")
-        unit_name = unit_name_and_generation[0].string
-        unit_generation = float(unit_name_and_generation[1].string)
+    for unit_name, unit_generation in zip(
+        thermal_units["unit"], thermal_units["generation"].tolist()
+    ):
         if unit_name in MAP_THERMAL_GENERATION_UNIT_NAME_TO_FUEL_TYPE:
             if unit_generation > 0:  # Ignore self-consumption
                 unit_fuel_type = MAP_THERMAL_GENERATION_UNIT_NAME_TO_FUEL_TYPE[
@@ -253,7 +240,9 @@ def fetch_production(
         data["production"]["unknown"] = 0.0
 
     # Parse the datetime and return a python datetime object
-    spanish_date = soup.find("h3", {"class": "sitr-update"}).string
+    spanish_date = document.xpath(
+        "string(//h3[contains(concat(' ', @class, ' '), ' sitr-update ')])"
+    )
     date = arrow.get(
         spanish_date, "DD-MMMM-YYYY H:mm:ss", locale="es", tzinfo="America/Panama"
     )
@@ -2,12 +2,13 @@
 # -*- coding: utf-8 -*-
 
 import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from functools import reduce
 from logging import Logger, getLogger
-from typing import List, Optional, Union
+from typing import List, Optional, Tuple, Union
 
 import arrow
+import numpy as np
 import pandas as pd
 from requests import Session
 
@@ -57,6 +58,37 @@ exchange_ids = {
 
 tz = "Europe/Moscow"
 
+SUBZONES = ["RU-1", "RU-2", "RU-AS"]
+
+
+def production_arrays(
+    data: List[dict], modes: List[str]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Decodes production events into sorted datetimes (in ns since the epoch) and
+    a (datetimes, modes) array of production, where unknown values are 0 and
+    modes absent from the events are missing.
+    """
+    data = sorted(data, key=lambda d: d["datetime"])
+    times = pd.to_datetime([d["datetime"] for d in data], utc=True).asi8
+    values = np.array(
+        [[d["production"].get(mode, np.nan) for mode in modes] for d in data],
+        dtype=float,
+    ).reshape(len(data), len(modes))
+    present = [any(mode in d["production"] for d in data) for mode in modes]
+    values[:, present] = np.nan_to_num(values[:, present], nan=0.0)
+    return times, values
+
+
+def add_half_hours(
+    times: np.ndarray, values: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Repeats hourly values at the half hours, as a forward fill would."""
+    half_hour = pd.Timedelta(minutes=30).value
+    all_times = np.union1d(times, times + half_hour)
+    indices = np.searchsorted(times, all_times, side="right") - 1
+    return all_times, values[indices]
+
 
 def fetch_production(
     zone_key: str = "RU",
@@ -66,35 +98,49 @@ def fetch_production(
 ) -> Union[List[dict], dict]:
     """Requests the last known production mix (in MW) of a given country."""
     if zone_key == "RU":
-        # Get data for all zones
-        dfs = {}
-        for subzone_key in ["RU-1", "RU-2", "RU-AS"]:
-            data = fetch_production(subzone_key, session, target_datetime, logger)
-            df = pd.DataFrame(data).set_index("datetime")
-            df_prod = df["production"].apply(pd.Series).fillna(0)
-
+        # Get data for all zones at once
+        with ThreadPoolExecutor(max_workers=len(SUBZONES)) as executor:
+            subzone_data = list(
+                executor.map(
+                    lambda subzone_key: fetch_production(
+                        subzone_key, session, target_datetime, logger
+                    ),
+                    SUBZONES,
+                )
+            )
+        modes = sorted(
+            {mode for data in subzone_data for d in data for mode in d["production"]}
+        )
+
+        # Compute the sum over the datetimes known in all zones
+        total = None
+        for subzone_key, data in zip(SUBZONES, subzone_data):
+            times, values = production_arrays(data, modes)
             # Set a 30 minutes frequency
             if subzone_key in ["RU-1", "RU-2"]:
-                df_30m_index = df_prod.index.union(
-                    df_prod.index + pd.Timedelta(minutes=30)
+                times, values = add_half_hours(times, values)
+            if total is None:
+                total_times, total = times, values
+            else:
+                total_times, total_indices, indices = np.intersect1d(
+                    total_times, times, assume_unique=True, return_indices=True
                 )
-                df_prod = df_prod.reindex(df_30m_index).ffill()
-
-            dfs[subzone_key] = df_prod
-
-        # Compute the sum
-        df_prod = reduce(lambda x, y: x + y, dfs.values()).dropna()
+                total = total[total_indices] + values[indices]
+        complete = ~np.isnan(total).any(axis=1)
+        total_times, total = total_times[complete], total[complete]
 
         # Format to dict
-        df_prod = df_prod.apply(dict, axis=1).reset_index(name="production")
-        df_prod["zoneKey"] = "RU"
-        df_prod["storage"] = [{} for i in range(len(df_prod))]
-        df_prod["source"] = "so-ups.ru"
-        data = df_prod.to_dict("records")
-        for row in data:
-            row["datetime"] = row["datetime"].to_pydatetime()
-
-        return data
+        datetimes = pd.to_datetime(total_times, utc=True).tz_convert(tz)
+        return [
+            {
+                "datetime": dt,
+                "production": dict(zip(modes, row)),
+                "zoneKey": "RU",
+                "storage": {},
+                "source": "so-ups.ru",
+            }
+            for dt, row in zip(datetimes.to_pydatetime(), total.tolist())
+        ]
 
     elif zone_key == "RU-1" or zone_key == "RU-2":
         return fetch_production_1st_synchronous_zone(zone_key, session, target_datetime)
@@ -7,15 +7,26 @@ from logging import Logger, getLogger
 from typing import Optional
 
 import arrow
-from PIL import Image, ImageOps
+import numpy as np
 from pytesseract import image_to_string
 from requests import Session
 
+from parsers.lib.images import (
+    ScreenshotCache,
+    decode_image,
+    invert,
+    region,
+    relative_box,
+    to_gray,
+)
+
 TIMEZONE = "Asia/Singapore"
 
 TICKER_URL = "https://www.emcsg.com/ChartServer/blue/ticker"
 
 SOLAR_URL = "https://www.ema.gov.sg/cmsmedia/irradiance/plot.png"
+# OCR results of the last solar map, which is polled more often than it changes
+SOLAR_SCREENSHOTS = ScreenshotCache()
 
 """
 Around 95% of Singapore's generation is done with combined-cycle gas turbines.
@@ -61,10 +72,12 @@ def get_solar(session: Session, logger: Logger) -> Optional[float]:
     """
 
     url = SOLAR_URL
-    solar_image = Image.open(session.get(url, stream=True).raw)
-
-    solar_mw = __detect_output_from_solar_image(solar_image, logger)
-    solar_dt = __detect_datetime_from_solar_image(solar_image, logger)
+    # The map is only decoded again when it changed since the last poll
+    solar_mw, solar_dt = SOLAR_SCREENSHOTS.read(
+        url,
+        session.get(url).content,
+        lambda content: __read_solar_image(decode_image(content), logger),
+    )
 
     singapore_dt = arrow.now("Asia/Singapore")
     diff = singapore_dt - solar_dt
@@ -252,18 +265,23 @@ def fetch_price(
     }
 
 
+def __read_solar_image(solar_image, logger: Logger):
+    solar_mw = __detect_output_from_solar_image(solar_image, logger)
+    solar_dt = __detect_datetime_from_solar_image(solar_image, logger)
+    return solar_mw, solar_dt
+
+
 def __detect_datetime_from_solar_image(solar_image, logger: Logger):
-    w, h = solar_image.size
-    crop_left = int(w * 0.75)
-    crop_top = int(h * 0.87)
-    crop_right = int(w * 0.93)
-    crop_bottom = int(h * 0.92)
-    time_img = solar_image.crop((crop_left, crop_top, crop_right, crop_bottom))
+    time_img = region(solar_image, relative_box(solar_image, 0.75, 0.87, 0.93, 0.92))
     processed_img = __preprocess_image_for_ocr(time_img)
-    text = image_to_string(
+    text = SOLAR_SCREENSHOTS.read_region(
+        "datetime",
         processed_img,
-        lang="eng",
-        config='--psm 7 -c tessedit_char_whitelist="0123456789:- "',
+        lambda img: image_to_string(
+            img,
+            lang="eng",
+            config='--psm 7 -c tessedit_char_whitelist="0123456789:- "',
+        ),
     )
 
     try:
@@ -279,14 +297,13 @@ def __detect_datetime_from_solar_image(solar_image, logger: Logger):
 
 
 def __detect_output_from_solar_image(solar_image, logger: Logger):
-    w, h = solar_image.size
-    crop_left = int(w * 0.65)
-    crop_top = int(h * 0.74)
-    crop_right = int(w * 0.93)
-    crop_bottom = int(h * 0.80)
-    output_img = solar_image.crop((crop_left, crop_top, crop_right, crop_bottom))
+    output_img = region(solar_image, relative_box(solar_image, 0.65, 0.74, 0.93, 0.80))
     processed_img = __preprocess_image_for_ocr(output_img)
-    text = image_to_string(processed_img, lang="eng", config="--psm 7")
+    text = SOLAR_SCREENSHOTS.read_region(
+        "output",
+        processed_img,
+        lambda img: image_to_string(img, lang="eng", config="--psm 7"),
+    )
 
     try:
         pattern = r"Est. PV Output: (.*)MWac"
@@ -316,17 +333,17 @@ def __preprocess_image_for_ocr(img):
     """
     Perform a number of image pre-processing recommendations to improve success of character recognition.
 
-    :param img: the image to be processed
+    :param img: the image region to be processed, inverted in place
     :return: pre-processed image, optimized for optical character recognition (OCR)
     """
     # https://tesseract-ocr.github.io/tessdoc/ImproveQuality#inverting-images
-    inverted_img = ImageOps.invert(
+    inverted_img = invert(
         img
     )  # assumes black background of Singapore solar output image
-    dark_text_on_light_bg = inverted_img.convert("L")
+    dark_text_on_light_bg = to_gray(inverted_img)
 
     # https://tesseract-ocr.github.io/tessdoc/ImproveQuality#missing-borders
-    img_with_border = ImageOps.expand(dark_text_on_light_bg, border=2)
+    img_with_border = np.pad(dark_text_on_light_bg, 2)
 
     return img_with_border
 
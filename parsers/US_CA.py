@@ -1,15 +1,19 @@
 #!/usr/bin/env python3
 
-from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from io import BytesIO, StringIO
 from logging import Logger, getLogger
-from typing import List, Optional, Union
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
 
 import arrow
+import numpy as np
 import pandas
 from bs4 import BeautifulSoup
 from requests import Session
 
+from parsers.lib.cache import get_cache_dir, write_atomic
 from parsers.lib.config import refetch_frequency
 
 CAISO_PROXY = "https://us-ca-proxy-jfnx5klx2a-uw.a.run.app"
@@ -18,6 +22,87 @@ FUEL_SOURCE_CSV = f"{CAISO_PROXY}/outlook/SP/fuelsource.csv?host=https://www.cai
 MX_EXCHANGE_URL = "http://www.cenace.gob.mx/Paginas/Publicas/Info/DemandaRegional.aspx"
 
 
+PRODUCTION_MAP = {
+    "Solar": "solar",
+    "Wind": "wind",
+    "Geothermal": "geothermal",
+    "Biomass": "biomass",
+    "Biogas": "biomass",
+    "Small hydro": "hydro",
+    "Coal": "coal",
+    "Nuclear": "nuclear",
+    "Natural Gas": "gas",
+    "Large Hydro": "hydro",
+    "Other": "unknown",
+}
+STORAGE_MAP = {"Batteries": "battery"}
+# Sources that can't be negative, negative values are clamped to 0
+CLAMPED_SOURCES = ["Solar", "Nuclear"]
+
+DAILY_RENEWABLES_WATCH_URL = (
+    "http://content.caiso.com/green/renewrpt/{}_DailyRenewablesWatch.txt"
+)
+RENEWABLE_RESOURCES_COLUMNS = [
+    "Hour",
+    "GEOTHERMAL",
+    "BIOMASS",
+    "BIOGAS",
+    "SMALL HYDRO",
+    "WIND TOTAL",
+    "SOLAR PV",
+    "SOLAR THERMAL",
+]
+OTHER_RESOURCES_COLUMNS = [
+    "Hour",
+    "RENEWABLES",
+    "NUCLEAR",
+    "THERMAL",
+    "IMPORTS",
+    "HYDRO",
+]
+# Positions of the hourly rows of both tables in the DailyRenewablesWatch file
+RENEWABLE_RESOURCES_LINES = slice(2, 26)
+OTHER_RESOURCES_LINES = slice(30, 54)
+
+
+def localize(naive: pandas.Series, tz: str = "US/Pacific") -> pandas.DatetimeIndex:
+    """
+    Localizes naive local times in one pass. Ambiguous times are assumed to be
+    daylight saving times, and nonexistent ones are shifted forward.
+    """
+    return pandas.DatetimeIndex(naive).tz_localize(
+        tz, ambiguous=np.ones(len(naive), dtype=bool), nonexistent="shift_forward"
+    )
+
+
+def sum_columns(df: pandas.DataFrame, mapping: Dict[str, str]) -> pandas.DataFrame:
+    """
+    Sums the columns of `df` mapped to the same key, in a single reduction.
+    A missing value in any of the summed columns makes the sum missing.
+    """
+    keys = list(dict.fromkeys(mapping.values()))
+    columns = sorted(mapping, key=lambda column: keys.index(mapping[column]))
+    values = df[columns].to_numpy(dtype=float)
+    starts = np.searchsorted(
+        [keys.index(mapping[column]) for column in columns], range(len(keys))
+    )
+    return pandas.DataFrame(
+        np.add.reduceat(values, starts, axis=1), index=df.index, columns=keys
+    )
+
+
+def read_fuel_source(session: Session) -> pandas.DataFrame:
+    """
+    Reads today's CAISO fuel source CSV, indexed by its localized datetimes.
+    """
+    r = session.get(FUEL_SOURCE_CSV)
+    csv = pandas.read_csv(StringIO(r.text))
+    today = arrow.utcnow().to("US/Pacific").format("YYYY-MM-DD")
+    naive = pandas.to_datetime(today + " " + csv["Time"], format="%Y-%m-%d %H:%M")
+    csv.index = localize(naive)
+    return csv
+
+
 @refetch_frequency(timedelta(days=1))
 def fetch_production(
     zone_key: str = "US-CA",
@@ -27,158 +112,235 @@ def fetch_production(
 ) -> list:
     """Requests the last known production mix (in MW) of a given country."""
     if target_datetime:
-        return fetch_historical_production(target_datetime, zone_key)
-
-    target_datetime = arrow.get(target_datetime)
+        return fetch_historical_production(target_datetime, zone_key, session)
 
     # Get the production from the CSV
-    csv = pandas.read_csv(FUEL_SOURCE_CSV)
-    latest_index = len(csv) - 1
-    production_map = {
-        "Solar": "solar",
-        "Wind": "wind",
-        "Geothermal": "geothermal",
-        "Biomass": "biomass",
-        "Biogas": "biomass",
-        "Small hydro": "hydro",
-        "Coal": "coal",
-        "Nuclear": "nuclear",
-        "Natural Gas": "gas",
-        "Large Hydro": "hydro",
-        "Other": "unknown",
-    }
-    storage_map = {"Batteries": "battery"}
-    daily_data = []
-    for i in range(0, latest_index + 1):
-        h, m = map(int, csv["Time"][i].split(":"))
-        date = (
-            arrow.utcnow()
-            .to("US/Pacific")
-            .replace(hour=h, minute=m, second=0, microsecond=0)
-        )
-        data = {
+    csv = read_fuel_source(session or Session())
+
+    sources = csv[list(PRODUCTION_MAP)].astype(float)
+    for source in CLAMPED_SOURCES:
+        is_negative = sources[source] < 0
+        if is_negative.any():
+            logger.warning(
+                f"{source} production for US_CA was reported as less than 0 "
+                f"{is_negative.sum()} times and was clamped"
+            )
+            sources.loc[is_negative, source] = 0.0
+
+    # map items from names in CAISO CSV to names used in Electricity Map,
+    # summing up the sources mapped to the same mode
+    production = sum_columns(sources, PRODUCTION_MAP)
+    storage = -sum_columns(csv, STORAGE_MAP)
+
+    return [
+        {
             "zoneKey": zone_key,
-            "production": defaultdict(float),
-            "storage": defaultdict(float),
+            "production": dict(zip(production.columns, production_row)),
+            "storage": dict(zip(storage.columns, storage_row)),
             "source": "caiso.com",
-            "datetime": date.datetime,
+            "datetime": dt,
         }
+        for dt, production_row, storage_row in zip(
+            csv.index.to_pydatetime(),
+            production.values.tolist(),
+            storage.values.tolist(),
+        )
+    ]
 
-        # map items from names in CAISO CSV to names used in Electricity Map
-        for ca_gen_type, mapped_gen_type in production_map.items():
-            production = float(csv[ca_gen_type][i])
 
-            if production < 0 and (
-                mapped_gen_type == "solar" or mapped_gen_type == "nuclear"
-            ):
-                logger.warn(
-                    ca_gen_type
-                    + " production for US_CA was reported as less than 0 and was clamped"
-                )
-                production = 0.0
+def fetch_historical_production(
+    target_datetime: datetime, zone_key: str, session: Optional[Session] = None
+):
+    return fetch_historical_data(target_datetime, zone_key, session)[0]
 
-            # if another mean of production created a value, sum them up
-            data["production"][mapped_gen_type] += production
 
-        for ca_storage_type, mapped_storage_type in storage_map.items():
-            storage = -float(csv[ca_storage_type][i])
+def fetch_historical_exchange(
+    target_datetime: datetime, session: Optional[Session] = None
+):
+    return fetch_historical_data(target_datetime, session=session)[1]
 
-            # if another mean of storage created a value, sum them up
-            data["storage"][mapped_storage_type] += storage
 
-        daily_data.append(data)
+def parse_daily_renewables_watch(text: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Reads the values of both hourly tables of a DailyRenewablesWatch file, with
+    the columns of RENEWABLE_RESOURCES_COLUMNS and OTHER_RESOURCES_COLUMNS.
+    """
+    lines = text.splitlines()
+    return (
+        np.loadtxt(lines[RENEWABLE_RESOURCES_LINES], ndmin=2),
+        np.loadtxt(lines[OTHER_RESOURCES_LINES], ndmin=2),
+    )
 
-    return daily_data
 
+def daily_renewables_watch_frames(
+    renewable_values: np.ndarray, other_values: np.ndarray, target_date: arrow.Arrow
+) -> Tuple[pandas.DataFrame, pandas.DataFrame]:
+    """
+    Builds both hourly tables of a DailyRenewablesWatch file, indexed by the end
+    of each hour.
+    """
+    renewable_resources = pandas.DataFrame(
+        renewable_values, columns=RENEWABLE_RESOURCES_COLUMNS
+    )
+    other_resources = pandas.DataFrame(other_values, columns=OTHER_RESOURCES_COLUMNS)
 
-def fetch_historical_production(target_datetime: datetime, zone_key: str):
-    return fetch_historical_data(target_datetime, zone_key)[0]
+    naive = pandas.Timestamp(target_date.format("YYYY-MM-DD")) + pandas.to_timedelta(
+        renewable_resources["Hour"], unit="h"
+    )
+    index = localize(naive)
+    renewable_resources.index = index
+    other_resources.index = index
+    return renewable_resources, other_resources
+
+
+def read_daily_renewables_watch(
+    target_date: arrow.Arrow, session: Session, cache_dir: Optional[Path] = None
+) -> Tuple[pandas.DataFrame, pandas.DataFrame]:
+    """
+    Reads the DailyRenewablesWatch file of `target_date`.
+
+    With a `cache_dir`, files of past days are immutable and are kept on disk,
+    both as downloaded and as parsed arrays, so that they are downloaded and
+    parsed only once.
+    """
+    day = target_date.format("YYYYMMDD")
+    is_complete = target_date < arrow.utcnow().to("US/Pacific").floor("day")
+    raw_path = parsed_path = None
+    if cache_dir is not None:
+        raw_path = cache_dir / f"{day}_DailyRenewablesWatch.txt"
+        parsed_path = cache_dir / f"{day}_DailyRenewablesWatch.npz"
+
+    if parsed_path is not None and parsed_path.exists():
+        with np.load(parsed_path) as parsed:
+            return daily_renewables_watch_frames(
+                parsed["renewable_resources"], parsed["other_resources"], target_date
+            )
+
+    if raw_path is not None and raw_path.exists():
+        text = raw_path.read_text()
+    else:
+        r = session.get(DAILY_RENEWABLES_WATCH_URL.format(day))
+        r.raise_for_status()
+        text = r.text
+    renewable_values, other_values = parse_daily_renewables_watch(text)
+
+    if cache_dir is not None and is_complete:
+        if not raw_path.exists():
+            write_atomic(raw_path, text.encode())
+        parsed = BytesIO()
+        np.savez_compressed(
+            parsed, renewable_resources=renewable_values, other_resources=other_values
+        )
+        write_atomic(parsed_path, parsed.getvalue())
 
+    return daily_renewables_watch_frames(renewable_values, other_values, target_date)
 
-def fetch_historical_exchange(target_datetime: datetime):
-    return fetch_historical_data(target_datetime)[1]
 
+def historical_events(
+    renewable_resources: pandas.DataFrame,
+    other_resources: pandas.DataFrame,
+    zone_key: str = "US-CA",
+) -> Tuple[List[dict], List[dict]]:
+    """Maps DailyRenewablesWatch tables to production and exchange events."""
+    production = pandas.DataFrame(
+        {
+            "biomass": renewable_resources["BIOMASS"],
+            "gas": renewable_resources["BIOGAS"] + other_resources["THERMAL"],
+            "hydro": renewable_resources["SMALL HYDRO"] + other_resources["HYDRO"],
+            "nuclear": other_resources["NUCLEAR"].clip(lower=0),
+            "solar": (
+                renewable_resources["SOLAR PV"] + renewable_resources["SOLAR THERMAL"]
+            ).clip(lower=0),
+            "wind": renewable_resources["WIND TOTAL"],
+            "geothermal": renewable_resources["GEOTHERMAL"],
+        }
+    )
 
-def fetch_historical_data(target_datetime: datetime, zone_key: str = "US-CA"):
+    daily_data = [
+        {
+            "zoneKey": zone_key,
+            "storage": {},
+            "source": "caiso.com",
+            "production": dict(zip(production.columns, production_row)),
+            "datetime": dt,
+        }
+        for dt, production_row in zip(
+            production.index.to_pydatetime(), production.values.tolist()
+        )
+    ]
+    import_data = [
+        {
+            "sortedZoneKeys": "US->US-CA",
+            "datetime": dt,
+            "netFlow": net_flow,
+            "source": "caiso.com",
+        }
+        for dt, net_flow in zip(
+            other_resources.index.to_pydatetime(), other_resources["IMPORTS"].tolist()
+        )
+    ]
+
+    return daily_data, import_data
+
+
+def fetch_historical_data(
+    target_datetime: datetime,
+    zone_key: str = "US-CA",
+    session: Optional[Session] = None,
+):
     # caiso.com provides daily data until the day before today
     # get a clean date at the beginning of yesterday
-    target_date = (
-        arrow.get(target_datetime)
-        .to("US/Pacific")
-        .replace(hour=0, minute=0, second=0, microsecond=0)
-    )
+    target_date = arrow.get(target_datetime).to("US/Pacific").floor("day")
 
-    url = (
-        "http://content.caiso.com/green/renewrpt/"
-        + target_date.format("YYYYMMDD")
-        + "_DailyRenewablesWatch.txt"
+    renewable_resources, other_resources = read_daily_renewables_watch(
+        target_date, session or Session()
     )
+    return historical_events(renewable_resources, other_resources, zone_key)
 
-    renewable_resources = pandas.read_table(
-        url,
-        sep="\t\t",
-        skiprows=2,
-        header=None,
-        names=[
-            "Hour",
-            "GEOTHERMAL",
-            "BIOMASS",
-            "BIOGAS",
-            "SMALL HYDRO",
-            "WIND TOTAL",
-            "SOLAR PV",
-            "SOLAR THERMAL",
-        ],
-        skipfooter=27,
-        skipinitialspace=True,
-        engine="python",
-    )
-    other_resources = pandas.read_table(
-        url,
-        sep="\t\t",
-        skiprows=30,
-        header=None,
-        names=["Hour", "RENEWABLES", "NUCLEAR", "THERMAL", "IMPORTS", "HYDRO"],
-        skipinitialspace=True,
-        engine="python",
-    )
 
-    daily_data, import_data = [], []
-
-    for i in range(0, 24):
-        daily_data.append(
-            {
-                "zoneKey": zone_key,
-                "storage": {},
-                "source": "caiso.com",
-                "production": {
-                    "biomass": float(renewable_resources["BIOMASS"][i]),
-                    "gas": float(renewable_resources["BIOGAS"][i])
-                    + float(other_resources["THERMAL"][i]),
-                    "hydro": float(renewable_resources["SMALL HYDRO"][i])
-                    + float(other_resources["HYDRO"][i]),
-                    "nuclear": max(float(other_resources["NUCLEAR"][i]), 0),
-                    "solar": max(
-                        float(renewable_resources["SOLAR PV"][i])
-                        + float(renewable_resources["SOLAR THERMAL"][i]),
-                        0,
-                    ),
-                    "wind": float(renewable_resources["WIND TOTAL"][i]),
-                    "geothermal": float(renewable_resources["GEOTHERMAL"][i]),
-                },
-                "datetime": target_date.shift(hours=i + 1).datetime,
-            }
-        )
-        import_data.append(
-            {
-                "sortedZoneKeys": "US->US-CA",
-                "datetime": target_date.shift(hours=i + 1).datetime,
-                "netFlow": float(other_resources["IMPORTS"][i]),
-                "source": "caiso.com",
-            }
-        )
+def fetch_historical_data_range(
+    start_datetime: datetime,
+    end_datetime: datetime,
+    zone_key: str = "US-CA",
+    session: Optional[Session] = None,
+    cache_dir: Optional[Path] = None,
+    max_workers: int = 8,
+    logger: Logger = getLogger(__name__),
+) -> Tuple[List[dict], List[dict]]:
+    """
+    Fetches the hourly production and imports of every day between
+    `start_datetime` and `end_datetime` (inclusive, in US/Pacific time) as one
+    series each. Days are downloaded in parallel and cached in `cache_dir`,
+    which defaults to the US_CA parser cache directory. Days that can't be
+    fetched are logged and skipped.
+    """
+    cache_dir = cache_dir or get_cache_dir("US_CA")
+    session = session or Session()
+    days = arrow.Arrow.range(
+        "day",
+        arrow.get(start_datetime).to("US/Pacific").floor("day"),
+        arrow.get(end_datetime).to("US/Pacific").floor("day"),
+    )
 
-    return daily_data, import_data
+    def read_day(day: arrow.Arrow):
+        try:
+            return read_daily_renewables_watch(day, session, cache_dir)
+        except Exception as e:
+            logger.warning(
+                f"US_CA: DailyRenewablesWatch of {day.format('YYYY-MM-DD')} "
+                f"could not be read: {e}"
+            )
+            return None
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        tables = [table for table in executor.map(read_day, days) if table]
+
+    if not tables:
+        return [], []
+    renewable_resources, other_resources = zip(*tables)
+    return historical_events(
+        pandas.concat(renewable_resources), pandas.concat(other_resources), zone_key
+    )
 
 
 def fetch_MX_exchange(s: Session) -> float:
@@ -222,32 +384,24 @@ def fetch_exchange(
         return exchange
 
     if isinstance(target_datetime, datetime):
-        return fetch_historical_exchange(target_datetime)
+        return fetch_historical_exchange(target_datetime, s)
 
     # CSV has imports to California as positive.
     # Electricity Map expects A->B to indicate flow to B as positive.
     # So values in CSV can be used as-is.
 
-    csv = pandas.read_csv(FUEL_SOURCE_CSV)
-    latest_index = len(csv) - 1
-    daily_data = []
-    for i in range(0, latest_index + 1):
-        h, m = map(int, csv["Time"][i].split(":"))
-        date = (
-            arrow.utcnow()
-            .to("US/Pacific")
-            .replace(hour=h, minute=m, second=0, microsecond=0)
-        )
-        data = {
+    csv = read_fuel_source(s)
+    return [
+        {
             "sortedZoneKeys": sorted_zone_keys,
-            "datetime": date.datetime,
-            "netFlow": float(csv["Imports"][i]),
+            "datetime": dt,
+            "netFlow": net_flow,
             "source": "caiso.com",
         }
-
-        daily_data.append(data)
-
-    return daily_data
+        for dt, net_flow in zip(
+            csv.index.to_pydatetime(), csv["Imports"].astype(float).tolist()
+        )
+    ]
 
 
 if __name__ == "__main__":
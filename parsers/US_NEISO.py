@@ -3,6 +3,7 @@
 
 """Real time parser for the New England ISO (NEISO) area."""
 
+import json
 import time
 from collections import defaultdict
 from datetime import datetime, timedelta
@@ -13,8 +14,10 @@ import arrow
 from requests import Session
 
 from parsers.lib.config import refetch_frequency
+from parsers.lib.iso_files import ISOFileFetcher
 
 url = "https://www.iso-ne.com/ws/wsclient"
+NEISO_FILES = ISOFileFetcher("US_NEISO", "America/New_York")
 
 generation_mapping = {
     "Coal": "coal",
@@ -60,11 +63,20 @@ def get_json_data(
     }
     postdata.update(params)
 
-    s = session or Session()
-
-    req = s.post(url, data=postdata)
-    json_data = req.json()
-    raw_data = json_data[0]["data"]
+    # Days that are over don't change anymore. The form timestamp isn't part
+    # of the request identity.
+    cache_key = json.dumps(
+        {k: v for k, v in postdata.items() if k != "_nstmp_formDate"}, sort_keys=True
+    )
+    content = NEISO_FILES.get(
+        url,
+        session,
+        final=NEISO_FILES.is_final(target_ne.date()),
+        data=postdata,
+        cache_key=cache_key,
+    )
+    # Datapoints are modified by the processers, so they are decoded per call
+    raw_data = json.loads(content)[0]["data"]
 
     return raw_data
 
@@ -1,21 +1,18 @@
 #!/usr/bin/env python3
 
 """Real time parser for the state of New York."""
-from collections import defaultdict
 from datetime import datetime, timedelta
+from io import BytesIO
 from logging import Logger, getLogger
-from operator import itemgetter
-from typing import Optional
-from urllib.error import HTTPError
+from typing import List, Optional, Tuple
 
 import arrow
+import numpy as np
 import pandas as pd
-
-# Pumped storage is present but is not split into a separate category.
-from arrow.parser import ParserError
-from requests import Session
+from requests import HTTPError, Session
 
 from parsers.lib.config import refetch_frequency
+from parsers.lib.iso_files import ISOFileFetcher, day_range
 
 # Dual Fuel systems can run either Natural Gas or Oil, they represent
 # significantly more capacity in NY State than plants that can only
@@ -37,65 +34,74 @@ mapping = {
 }
 
 
-def read_csv_data(url):
-    """Gets csv data from a url and returns a dataframe."""
-
-    csv_data = pd.read_csv(url)
-
-    return csv_data
+MIX_URL = "http://mis.nyiso.com/public/csv/rtfuelmix/{}rtfuelmix.csv"
+EXCHANGE_URL = (
+    "http://mis.nyiso.com/public/csv/ExternalLimitsFlows/{}ExternalLimitsFlows.csv"
+)
+NYISO_FILES = ISOFileFetcher("US_NY", "America/New_York")
 
 
-def timestamp_converter(timestamp_string):
-    """Converts timestamps in nyiso data into aware datetime objects."""
-    try:
-        dt_naive = arrow.get(timestamp_string, "MM/DD/YYYY HH:mm:ss")
-    except ParserError:
-        dt_naive = arrow.get(timestamp_string, "MM/DD/YYYY HH:mm")
-    dt_aware = dt_naive.replace(tzinfo="America/New_York").datetime
-
-    return dt_aware
+def decode_csv(content: bytes) -> pd.DataFrame:
+    return pd.read_csv(BytesIO(content))
 
 
-def data_parser(df) -> list:
+def read_csv_data(
+    url: str, session: Optional[Session] = None, final: bool = False
+) -> pd.DataFrame:
     """
-    Takes dataframe and loops over rows to form dictionaries consisting of datetime and generation type.
-    Merges these dictionaries using datetime key.
-
-    :return: list of tuples containing datetime string and production.
+    Gets csv data from a url and returns a dataframe, shared by all the callers
+    that need the same file.
     """
+    return NYISO_FILES.decode(NYISO_FILES.get(url, session, final=final), decode_csv)
 
-    chunks = []
-    for row in df.itertuples():
-        piece = {}
-        piece["datetime"] = row[1]
-        piece[row[3]] = row[4]
-        chunks.append(piece)
-
-    # Join dicts on shared 'datetime' keys.
-    combine = defaultdict(dict)
-    for elem in chunks:
-        combine[elem["datetime"]].update(elem)
 
-    ordered = sorted(combine.values(), key=itemgetter("datetime"))
+def parse_timestamps(
+    timestamps: pd.Series, time_zones: Optional[pd.Series] = None
+) -> pd.DatetimeIndex:
+    """
+    Converts timestamps in nyiso data (MM/DD/YYYY HH:mm:ss, or without seconds)
+    into aware datetimes, in one pass. Ambiguous times are resolved with the
+    EST/EDT time zone column when there is one, and as EDT otherwise.
+    """
+    timestamps = timestamps.where(timestamps.str.len() > 16, timestamps + ":00")
+    naive = pd.DatetimeIndex(pd.to_datetime(timestamps, format="%m/%d/%Y %H:%M:%S"))
+    if time_zones is not None:
+        ambiguous = (time_zones == "EDT").to_numpy()
+    else:
+        ambiguous = np.ones(len(naive), dtype=bool)
+    return naive.tz_localize(
+        "America/New_York", ambiguous=ambiguous, nonexistent="shift_forward"
+    )
 
-    mapped_generation = []
-    for item in ordered:
-        mapped_types = [(mapping.get(k, k), v) for k, v in item.items()]
 
-        # Need to avoid multiple 'unknown' keys overwriting.
-        complete_production = defaultdict(lambda: 0.0)
-        for key, val in mapped_types:
-            try:
-                complete_production[key] += val
-            except TypeError:
-                # Datetime is a string at this point!
-                complete_production[key] = val
+def data_parser(df: pd.DataFrame) -> Tuple[pd.DatetimeIndex, List[dict]]:
+    """
+    Pivots the long-format fuel mix (one row per timestamp and fuel) into a
+    [time x fuel] frame, and sums the fuels mapped to the same mode.
 
-        dt = complete_production.pop("datetime")
-        final = (dt, dict(complete_production))
-        mapped_generation.append(final)
+    :return: the sorted datetimes, and the production of each of them.
+    """
+    df = df.drop_duplicates(subset=["Time Stamp", "Fuel Category"], keep="last")
+    datetimes = parse_timestamps(
+        df["Time Stamp"], df["Time Zone"] if "Time Zone" in df.columns else None
+    )
+    fuel_mix = (
+        df.assign(datetime=datetimes)
+        .pivot(index="datetime", columns="Fuel Category", values="Gen MW")
+        .sort_index()
+        .astype(float)
+    )
 
-    return mapped_generation
+    # Fuels missing at a timestamp don't count, but a mode is missing when all
+    # of its fuels are.
+    modes = fuel_mix.T.groupby(
+        [mapping.get(fuel, fuel) for fuel in fuel_mix.columns], sort=True
+    ).sum(min_count=1)
+    productions = [
+        {mode: value for mode, value in zip(modes.index, row) if value == value}
+        for row in modes.T.to_numpy().tolist()
+    ]
+    return fuel_mix.index, productions
 
 
 @refetch_frequency(timedelta(days=1))
@@ -118,31 +124,61 @@ def fetch_production(
             "url http://mis.nyiso.com/public/"
         )
 
-    ny_date = target_datetime.format("YYYYMMDD")
-    mix_url = "http://mis.nyiso.com/public/csv/rtfuelmix/{}rtfuelmix.csv".format(
-        ny_date
-    )
+    # the day of the file, as the date of target_datetime in its own zone
+    ny_date = target_datetime.date()
     try:
-        raw_data = read_csv_data(mix_url)
+        raw_data = read_csv_data(
+            MIX_URL.format(ny_date.strftime("%Y%m%d")),
+            session,
+            final=NYISO_FILES.is_final(ny_date),
+        )
     except HTTPError:
         # this can happen when target_datetime has no data available
         return None
 
-    clean_data = data_parser(raw_data)
+    return production_events(raw_data, zone_key)
+
 
-    production_mix = []
-    for datapoint in clean_data:
-        data = {
+def production_events(raw_data: pd.DataFrame, zone_key: str = "US-NY") -> list:
+    datetimes, productions = data_parser(raw_data)
+    return [
+        {
             "zoneKey": zone_key,
-            "datetime": timestamp_converter(datapoint[0]),
-            "production": datapoint[1],
+            "datetime": dt,
+            "production": production,
             "storage": {},
             "source": "nyiso.com",
         }
+        for dt, production in zip(datetimes.to_pydatetime(), productions)
+    ]
 
-        production_mix.append(data)
 
-    return production_mix
+def fetch_production_range(
+    start_datetime: datetime,
+    end_datetime: datetime,
+    zone_key: str = "US-NY",
+    session: Optional[Session] = None,
+    logger: Logger = getLogger(__name__),
+) -> list:
+    """
+    Requests the production mix (in MW) of every day between `start_datetime`
+    and `end_datetime` (in New York time, both included). Daily files are
+    downloaded in parallel, and files of past days are cached on disk.
+    """
+    days = day_range(
+        arrow.get(start_datetime).to("America/New_York").date(),
+        arrow.get(end_datetime).to("America/New_York").date(),
+    )
+    contents = NYISO_FILES.get_days(
+        lambda day: MIX_URL.format(day.strftime("%Y%m%d")), days, session, logger
+    )
+    if not contents:
+        return []
+    raw_data = pd.concat(
+        [NYISO_FILES.decode(content, decode_csv) for content in contents.values()],
+        ignore_index=True,
+    )
+    return production_events(raw_data, zone_key)
 
 
 def fetch_exchange(
@@ -153,10 +189,6 @@ def fetch_exchange(
     logger: Logger = getLogger(__name__),
 ) -> list:
     """Requests the last known power exchange (in MW) between two zones."""
-    url = (
-        "http://mis.nyiso.com/public/csv/ExternalLimitsFlows/{}ExternalLimitsFlows.csv"
-    )
-
     sorted_zone_keys = "->".join(sorted([zone_key1, zone_key2]))
 
     # In the source CSV, positive is flow into NY, negative is flow out of NY.
@@ -199,11 +231,14 @@ def fetch_exchange(
         target_datetime = arrow.get(target_datetime)
     else:
         target_datetime = arrow.now("America/New_York")
-    ny_date = target_datetime.format("YYYYMMDD")
-    exchange_url = url.format(ny_date)
+    ny_date = target_datetime.date()
 
     try:
-        exchange_data = read_csv_data(exchange_url)
+        exchange_data = read_csv_data(
+            EXCHANGE_URL.format(ny_date.strftime("%Y%m%d")),
+            session,
+            final=NYISO_FILES.is_final(ny_date),
+        )
     except HTTPError:
         # this can happen when target_datetime has no data available
         return None
@@ -211,15 +246,17 @@ def fetch_exchange(
     new_england_exs = exchange_data.loc[
         exchange_data["Interface Name"].isin(relevant_exchanges)
     ]
-    consolidated_flows = new_england_exs.reset_index().groupby("Timestamp").sum()
+    consolidated_flows = new_england_exs.groupby("Timestamp")["Flow (MWH)"].sum()
+    # Timestamp for exchange does not include seconds.
+    datetimes = parse_timestamps(consolidated_flows.index.to_series())
 
     now = arrow.utcnow()
 
     exchange_5min = []
-    for row in consolidated_flows.itertuples():
-        flow = float(row[3]) * direction
-        # Timestamp for exchange does not include seconds.
-        dt = timestamp_converter(row[0] + ":00")
+    for dt, flow in zip(
+        datetimes.to_pydatetime(), (direction * consolidated_flows).tolist()
+    ):
+        flow = float(flow)
 
         if (dt > now) and ((dt - now) < timedelta(seconds=300)):
             # NYISO exchanges CSV (and only the exchanges CSV) includes data
@@ -5,15 +5,16 @@
 import json
 import re
 from datetime import datetime
+from html import unescape
 from logging import Logger, getLogger
 from typing import List, Optional, Union
 
 import arrow
-import demjson3 as demjson
 from bs4 import BeautifulSoup
 from dateutil import parser, tz
 from requests import Session, get
 
+from .lib import js_literal
 from .lib.utils import get_token
 
 # Used for consumption forecast data.
@@ -49,6 +50,37 @@ exchange_mapping = {
 }
 
 
+ELEMENT_START = r"<(?P<tag>\w+)[^>]*\bid\s*=\s*[\"']?{id}\b[^>]*>"
+SCRIPT_PATTERN = re.compile(r"<script\b[^>]*>(.*?)</script\s*>", re.S | re.I)
+SERIES_PATTERN = re.compile(r"series\s*:\s*\[")
+
+
+def find_element_text(page: str, element_id: str) -> Optional[str]:
+    """
+    Returns the text of the element with id `element_id` in `page`, without
+    parsing the whole page. The element can't contain elements of its own tag.
+    """
+    start = re.search(ELEMENT_START.format(id=re.escape(element_id)), page)
+    if start is None:
+        return None
+    end = re.compile(rf"</{start.group('tag')}\s*>", re.I).search(page, start.end())
+    if end is None:
+        return None
+    return unescape(re.sub(r"<[^>]*>", "", page[start.end() : end.start()]))
+
+
+def find_script_after(page: str, element_id: str) -> Optional[str]:
+    """
+    Returns the content of the first script that follows the element with id
+    `element_id` in `page`, without parsing the whole page.
+    """
+    start = re.search(ELEMENT_START.format(id=re.escape(element_id)), page)
+    if start is None:
+        return None
+    script = SCRIPT_PATTERN.search(page, start.end())
+    return script.group(1) if script else None
+
+
 def extract_data(session: Optional[Session] = None) -> tuple:
     """
     Makes a request to the PJM data url.
@@ -60,11 +92,10 @@ def extract_data(session: Optional[Session] = None) -> tuple:
 
     s = session or Session()
     req = s.get(url)
-    soup = BeautifulSoup(req.content, "html.parser")
+    page = req.text
 
-    try:
-        time_div = soup.find("div", id="asOfDate").text
-    except AttributeError:
+    time_div = find_element_text(page, "asOfDate")
+    if time_div is None:
         raise LookupError("No data is available for US-PJM.")
 
     time_pattern = re.compile(
@@ -100,15 +131,17 @@ def extract_data(session: Optional[Session] = None) -> tuple:
 
     dt = arr_dt.floor("minute").datetime
 
-    generation_mix_div = soup.find("div", id="rtschartallfuelspjmGenFuelM_container")
-    generation_mix_script = generation_mix_div.next_sibling
-
-    pattern = r"series: \[(.*)\]"
-    script_data = re.search(pattern, str(generation_mix_script)).group(1)
+    generation_mix_script = find_script_after(
+        page, "rtschartallfuelspjmGenFuelM_container"
+    )
+    if generation_mix_script is None:
+        raise LookupError("No generation mix is available for US-PJM.")
 
-    # demjson is required because script data is javascript not valid json.
-    raw_data = demjson.decode(script_data)
-    data = raw_data["data"]
+    # The chart options are a javascript object literal, not valid json.
+    series = SERIES_PATTERN.search(generation_mix_script)
+    if series is None:
+        raise LookupError("No generation mix is available for US-PJM.")
+    data = js_literal.raw_decode(generation_mix_script, series.end() - 1)[0][0]["data"]
 
     return data, dt
 
@@ -173,7 +206,7 @@ def fetch_production(
     if target_datetime is not None:
         raise NotImplementedError("This parser is not yet able to parse past dates")
 
-    extracted = extract_data(session=None)
+    extracted = extract_data(session=session)
     production = data_processer(extracted[0])
 
     datapoint = {
@@ -258,14 +291,14 @@ def get_exchange_data(interface, session: Optional[Session] = None) -> list:
 
     load_pattern = r"var load = (\[(.*)\])"
     load = re.search(load_pattern, str(exchange_script)).group(1)
-    load_vals = demjson.decode(load)[0]
+    load_vals = js_literal.decode(load)[0]
 
     # Occasionally load_vals contains a null at the end of the list which must be caught.
     actual_load = [float(val) for val in load_vals if val is not None]
 
     time_pattern = r"var timeArray = (\[(.*)\])"
     time_array = re.search(time_pattern, str(exchange_script)).group(1)
-    time_vals = demjson.decode(time_array)
+    time_vals = js_literal.decode(time_array)
 
     flows = zip(actual_load, time_vals)
 
@@ -281,16 +314,16 @@ def get_exchange_data(interface, session: Optional[Session] = None) -> list:
     return converted_flows
 
 
-def combine_NY_exchanges() -> list:
+def combine_NY_exchanges(session: Optional[Session] = None) -> list:
     """
     Combination function for the 4 New York interfaces.
     Timestamps are checked to ensure correct combination.
     """
 
-    nyiso = get_exchange_data("nyiso", session=None)
-    neptune = get_exchange_data("neptune", session=None)
-    linden = get_exchange_data("linden", session=None)
-    hudson = get_exchange_data("hudson", session=None)
+    nyiso = get_exchange_data("nyiso", session=session)
+    neptune = get_exchange_data("neptune", session=session)
+    linden = get_exchange_data("linden", session=session)
+    hudson = get_exchange_data("hudson", session=session)
 
     combined_flows = zip(nyiso, neptune, linden, hudson)
 
@@ -326,9 +359,9 @@ def fetch_exchange(
     sortedcodes = "->".join(sorted([zone_key1, zone_key2]))
 
     if sortedcodes == "US-NY->US-PJM":
-        flows = combine_NY_exchanges()
+        flows = combine_NY_exchanges(session)
     elif sortedcodes == "US-MIDA-PJM->US-NY-NYIS":
-        flows = combine_NY_exchanges()
+        flows = combine_NY_exchanges(session)
         flows = [(-total, dt) for total, dt in flows]
     elif sortedcodes == "US-MISO->US-PJM":
         flow = get_miso_exchange()
@@ -4,16 +4,19 @@
 
 
 from datetime import datetime, timedelta
-from io import StringIO
+from functools import lru_cache
+from io import BytesIO
 from logging import Logger, getLogger
-from typing import Optional
+from typing import NamedTuple, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 from dateutil import parser
 from pytz import utc
-from requests import Session
+from requests import HTTPError, Session
 
 from parsers.lib.config import refetch_frequency
+from parsers.lib.iso_files import ISOFileFetcher
 
 US_PROXY = "https://us-ca-proxy-jfnx5klx2a-uw.a.run.app"
 HOST_PARAMETER = "host=https://marketplace.spp.org"
@@ -35,6 +38,10 @@ MAPPING = {
     "Coal": "coal",
 }
 
+DATETIME_COLUMN = "GMT MKT Interval"
+KEYS_TO_REMOVE = {DATETIME_COLUMN, "Average Actual Load", "Load"}
+EXPECTED_UNKNOWN_KEYS = {"Other", "Waste Heat"}
+
 TIE_MAPPING = {"US-MISO->US-SPP": ["AMRN", "DPC", "GRE", "MDU", "MEC", "NSP", "OTP"]}
 
 # NOTE
@@ -42,79 +49,127 @@ TIE_MAPPING = {"US-MISO->US-SPP": ["AMRN", "DPC", "GRE", "MDU", "MEC", "NSP", "O
 # Energy storage situation unclear as of 16/03/2018, likely to change quickly in future.
 
 
-def get_data(url, session: Optional[Session] = None):
-    """Returns a pandas dataframe."""
+SPP_FILES = ISOFileFetcher("US_SPP", "UTC")
 
-    s = session or Session()
-    req = s.get(url, verify=False)
-    df = pd.read_csv(StringIO(req.text))
 
-    return df
+def decode_csv(content: bytes) -> pd.DataFrame:
+    return pd.read_csv(BytesIO(content))
 
 
-def data_processor(df, logger: Logger) -> list:
+def get_data(url, session: Optional[Session] = None, final: bool = False):
+    """
+    Returns a pandas dataframe. Files are decoded once and callers get their
+    own copy, `final` files are cached on disk.
     """
-    Takes a dataframe and logging instance as input.
-    Checks for new generation types and logs a warning if any are found.
-    Parses the dataframe row by row removing unneeded keys.
 
-    :return: list of tuples containing a datetime object and production dictionary.
+    content = SPP_FILES.get(url, session, final=final, verify=False)
+    return SPP_FILES.decode(content, decode_csv).copy()
+
+
+class ColumnPlan(NamedTuple):
+    """
+    How the columns of a generation mix file add up to production modes.
+    `sources` are the indices of the columns to sum, gathered by mode: the
+    columns of `modes[j]` start at `starts[j]`. Other columns are ignored.
+    """
+
+    sources: Tuple[int, ...]
+    starts: Tuple[int, ...]
+    modes: Tuple[str, ...]
+    warnings: Tuple[str, ...]
+
+
+@lru_cache(maxsize=32)
+def compile_column_plan(header: Tuple[str, ...]) -> ColumnPlan:
+    """
+    Resolves, once per file schema, which columns make up each production mode:
+    Market and Self columns of historical files are combined, known fuels are
+    mapped and all other generation columns are grouped as unknown.
     """
+    warnings = []
+    # combined columns, by name, as the indices of the columns they add up
+    columns = {}
+    for index, column in enumerate(header):
+        column = column.strip()
+        # Fix naming error which otherwise misclassifies Gas Self as Unknown
+        columns[column.replace("Gas Self", "Natural Gas Self")] = [index]
 
-    # Remove leading whitespace in column headers.
-    df.columns = df.columns.str.strip()
-    df = df.rename(
-        columns={"Gas Self": "Natural Gas Self"}
-    )  # Fix naming error which otherwise misclassifies Gas Self as Unknown
     # Some historical csvs split the production into 'Market' and 'Self',
     # So first we need to combine those.
-    for col in df.columns:
-        if "Market" in col:
-            combined_col = col.replace("Market", "").strip()
-            self_col = col.replace("Market", "Self")
-            if self_col in df.columns:
-                df[combined_col] = df[col] + df[self_col]
-                df.drop(self_col, inplace=True, axis=1)
-            else:
-                logger.warning(
-                    f'Corresponding column "{self_col}" to "{col}" not found in file',
-                    extra={"key": "US-SPP"},
-                )
-                df[combined_col] = df[col]
-
-            df.drop(col, inplace=True, axis=1)
-
-    keys_to_remove = {"GMT MKT Interval", "Average Actual Load", "Load"}
-
-    # Check for new generation columns.
-    known_keys = MAPPING.keys() | keys_to_remove
-    column_headers = set(df.columns)
-
-    unknown_keys = column_headers - known_keys
-
-    for heading in unknown_keys:
-        if heading not in ["Other", "Waste Heat"]:
-            logger.warning(
-                "New column '{}' present in US-SPP data source.".format(heading),
-                extra={"key": "US-SPP"},
+    for column in list(columns):
+        if "Market" not in column:
+            continue
+        sources = columns.pop(column)
+        self_column = column.replace("Market", "Self")
+        if self_column in columns:
+            sources = sources + columns.pop(self_column)
+        else:
+            warnings.append(
+                f'Corresponding column "{self_column}" to "{column}" not found in file'
             )
+        columns[column.replace("Market", "").strip()] = sources
+
+    unknown_keys = [
+        column
+        for column in columns
+        if column not in MAPPING and column not in KEYS_TO_REMOVE
+    ]
+    warnings.extend(
+        f"New column '{column}' present in US-SPP data source."
+        for column in unknown_keys
+        if column not in EXPECTED_UNKNOWN_KEYS
+    )
 
-    keys_to_remove = keys_to_remove | unknown_keys
+    modes = [column for column in columns if column in MAPPING]
+    sources, starts = [], []
+    for column in modes:
+        starts.append(len(sources))
+        sources.extend(columns[column])
+    starts.append(len(sources))
+    for column in unknown_keys:
+        sources.extend(columns[column])
+    return ColumnPlan(
+        sources=tuple(sources),
+        starts=tuple(starts),
+        modes=tuple(MAPPING[column] for column in modes) + ("unknown",),
+        warnings=tuple(warnings),
+    )
 
-    processed_data = []
-    for index in range(len(df)):
-        production = df.loc[index].to_dict()
-        production["unknown"] = sum([production[k] for k in unknown_keys])
 
-        dt_aware = production["GMT MKT Interval"].to_pydatetime()
-        for k in keys_to_remove:
-            production.pop(k, None)
+def data_processor(df, logger: Logger) -> list:
+    """
+    Takes a dataframe and logging instance as input.
+    Checks for new generation types and logs a warning if any are found.
+    Sums the columns of each production mode with the plan of the file schema.
+
+    :return: list of tuples containing a datetime object and production dictionary.
+    """
 
-        production = {k: float(v) for k, v in production.items()}
-        mapped_production = {MAPPING.get(k, k): v for k, v in production.items()}
+    plan = compile_column_plan(tuple(df.columns))
+    for warning in plan.warnings:
+        logger.warning(warning, extra={"key": "US-SPP"})
+
+    columns = {column.strip(): i for i, column in enumerate(df.columns)}
+    datetimes = pd.to_datetime(df.iloc[:, columns[DATETIME_COLUMN]])
+    if datetimes.dt.tz is None:
+        datetimes = datetimes.dt.tz_localize("UTC")
+
+    # The columns of each mode are next to each other and summed at once,
+    # rather than multiplied by a 0/1 matrix, through which a missing value
+    # would spread to every mode. A trailing column of zeros is summed with the
+    # unknown columns, so that files without any still have an unknown of 0.
+    values = np.hstack(
+        [
+            df.iloc[:, list(plan.sources)].to_numpy(dtype=float),
+            np.zeros((len(df), 1)),
+        ]
+    )
+    production = np.add.reduceat(values, plan.starts, axis=1)
 
-        processed_data.append((dt_aware, mapped_production))
-    return processed_data
+    return [
+        (dt.to_pydatetime(), dict(zip(plan.modes, row)))
+        for dt, row in zip(datetimes.dt.tz_convert("UTC"), production.tolist())
+    ]
 
 
 @refetch_frequency(timedelta(days=1))
@@ -141,7 +196,12 @@ def fetch_production(
             filename = f"GenMix_{target_year}.csv"
 
         historic_generation_url = HISTORIC_GENERATION_BASE_URL + filename
-        raw_data = get_data(historic_generation_url, session=session)
+        # Files of past years are not updated anymore
+        raw_data = get_data(
+            historic_generation_url,
+            session=session,
+            final=target_year < current_year,
+        )
         # In some cases the timeseries column is named differently, so we standardize it
         raw_data.rename(columns={"GMTTime": "GMT MKT Interval"}, inplace=True)
 
@@ -254,7 +314,7 @@ def fetch_wind_solar_forecasts(
 
     try:
         raw_data = get_data(FORECAST_URL)
-    except pd.errors.ParserError:
+    except (pd.errors.ParserError, HTTPError):
         logger.error(
             f"fetch_wind_solar_forecasts: {dt} has no forecast for url: {FORECAST_URL}"
         )
@@ -10,8 +10,12 @@ To get the very exact data, we would need to have a parser running constanty to
 """
 
 import json
+import time
+from datetime import timedelta
+from functools import partial
 from logging import Logger, getLogger
-from typing import Optional
+from threading import Condition, Event, Lock, Thread, main_thread
+from typing import Dict, Optional, Set, Tuple
 
 import arrow
 from requests import Session
@@ -45,25 +49,163 @@ ZONE_PARAMS = {
 }
 
 
-class SignalR:
-    def __init__(self, url):
+SIGNALR_URL = "https://data.ajenti.com.au/live/signalr"
+# Dashboards are pushed every few seconds, older payloads aren't returned
+MAX_PAYLOAD_AGE = timedelta(minutes=1)
+# How long a fetch waits for the first payload of a new subscription
+FIRST_PAYLOAD_TIMEOUT = timedelta(seconds=10)
+# How often a subscriber checks that its connection is still open
+CONNECTION_CHECK_INTERVAL = timedelta(seconds=1)
+
+
+class HubSubscriber:
+    """
+    Keeps a connection to a SignalR hub open in a background thread and
+    remembers the latest payload pushed for each subscribed method, so that
+    fetches don't have to connect and wait for the next push. Lost connections
+    are reopened after `min_backoff`, doubled after each connection that
+    received nothing, up to `max_backoff`.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        hub: str,
+        min_backoff: timedelta = timedelta(seconds=1),
+        max_backoff: timedelta = timedelta(minutes=2),
+        logger: Logger = getLogger(__name__),
+    ):
         self.url = url
+        self.hub = hub
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.logger = logger
+        self.connections = 0
+        self._methods: Set[str] = set()
+        self._client = None
+        # method -> (monotonic time of receipt, payload)
+        self._payloads: Dict[str, Tuple[float, dict]] = {}
+        self._messages = 0
+        self._received = Condition()
+        self._stopped = Event()
+        self._thread = Thread(target=self._run, name=f"ajenti-{hub}", daemon=True)
 
-    def update_res(self, msg):
-        if msg != {}:
-            self.res = msg
+    def start(self) -> "HubSubscriber":
+        self._thread.start()
+        return self
 
-    def get_value(self, hub, method):
-        self.res = {}
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stopped.set()
+        self._thread.join(timeout)
+
+    def is_alive(self) -> bool:
+        return self._thread.is_alive()
+
+    def subscribe(self, method: str) -> None:
+        with self._received:
+            if method in self._methods:
+                return
+            self._methods.add(method)
+            # handlers can be added to a started connection
+            if self._client is not None:
+                self._client.on(method, partial(self._update, method))
+
+    def get(
+        self,
+        method: str,
+        max_age: timedelta = MAX_PAYLOAD_AGE,
+        timeout: timedelta = FIRST_PAYLOAD_TIMEOUT,
+    ) -> dict:
+        """
+        Returns the latest payload of `method`, waiting up to `timeout` for one
+        if there is none younger than `max_age`. Returns an empty payload if
+        none was received in time.
+        """
+        self.subscribe(method)
+        deadline = time.monotonic() + timeout.total_seconds()
+        with self._received:
+            while True:
+                received_at, payload = self._payloads.get(method, (None, {}))
+                now = time.monotonic()
+                if (
+                    received_at is not None
+                    and now - received_at <= max_age.total_seconds()
+                ):
+                    return payload
+                if now >= deadline:
+                    return {}
+                self._received.wait(deadline - now)
+
+    def _update(self, method: str, payload: dict) -> None:
+        if payload:
+            with self._received:
+                self._payloads[method] = (time.monotonic(), payload)
+                self._messages += 1
+                self._received.notify_all()
+
+    def _running(self) -> bool:
+        # The listener threads of connections aren't daemons, connections
+        # must be closed for the interpreter to exit
+        return not self._stopped.is_set() and main_thread().is_alive()
+
+    def _listen(self) -> None:
+        """Listens to the hub until the connection is lost."""
         with Session() as session:
-            # create a connection
             connection = Connection(self.url, session)
-            chat = connection.register_hub(hub)
-            chat.client.on(method, self.update_res)
-            connection.start()
-            connection.wait(3)
-            connection.close()
-            return self.res
+            client = connection.register_hub(self.hub).client
+            with self._received:
+                for method in self._methods:
+                    client.on(method, partial(self._update, method))
+                self._client = client
+            self.connections += 1
+            try:
+                connection.start()
+                while connection.is_open and self._running():
+                    self._stopped.wait(CONNECTION_CHECK_INTERVAL.total_seconds())
+            finally:
+                with self._received:
+                    self._client = None
+                if connection.started:
+                    connection.close()
+
+    def _run(self) -> None:
+        backoff = self.min_backoff
+        while self._running():
+            messages = self._messages
+            try:
+                self._listen()
+            except Exception as e:
+                self.logger.warning(f"ajenti: connection to {self.hub} failed: {e}")
+            if self._messages > messages:
+                backoff = self.min_backoff
+            if not self._running():
+                break
+            self.logger.info(
+                f"ajenti: reconnecting to {self.hub} in {backoff.total_seconds()}s"
+            )
+            self._stopped.wait(backoff.total_seconds())
+            backoff = min(backoff * 2, self.max_backoff)
+
+
+SUBSCRIBERS: Dict[Tuple[str, str], HubSubscriber] = {}
+SUBSCRIBERS_LOCK = Lock()
+
+
+def get_subscriber(url: str, hub: str) -> HubSubscriber:
+    """Returns the running subscriber of `hub`, starting it if needed."""
+    with SUBSCRIBERS_LOCK:
+        subscriber = SUBSCRIBERS.get((url, hub))
+        if subscriber is None or not subscriber.is_alive():
+            subscriber = SUBSCRIBERS[(url, hub)] = HubSubscriber(url, hub).start()
+        return subscriber
+
+
+class SignalR:
+    def __init__(self, url):
+        self.url = url
+
+    def get_value(self, hub, method):
+        return get_subscriber(self.url, hub).get(method)
 
 class extract_data(paeras_example):
     def parse_payload(self,logger: Logger, payload) -> dict:
@@ -152,9 +294,7 @@ class extract_data(paeras_example):
         except KeyError:
             raise KeyError("The zone " + zone_key + " isn't implemented")
 
-        payload = SignalR("https://data.ajenti.com.au/live/signalr").get_value(
-            hub, dashboard
-        )
+        payload = SignalR(SIGNALR_URL).get_value(hub, dashboard)
         technologies_parsed = self.parse_payload(logger, payload)
         storage_techs = self.sum_storage_techs(technologies_parsed)
 
@@ -1,14 +1,20 @@
 from requests import Session
+
+from parsers.lib.tracing import span
+
+
 class get_data():
     def get_data(self,session=None,url:str=" ",Format = None):
         r= session or Session()
-        r = r.get(url)
+        with span("network"):
+            r = r.get(url)
         if Format !=None:
-            if Format =='json':
-                r = r.json()
+            with span("decode"):
+                if Format =='json':
+                    r = r.json()
 
-            if Format=='raw':
-                r = r.raw()
+                if Format=='raw':
+                    r = r.raw()
         return r
     def get_data_warn(self,session=None,url:str=" ",Format:str = None,target_datetime=None):
         if target_datetime is not None:
@@ -5,7 +5,11 @@ TZ = "Asia/Kolkata"
 
 def read_datetime_from_span_id(html, span_id, format):
     date_time_span = html.find("span", {"id": span_id})
-    india_date_time = date_time_span.text + " Asia/Kolkata"
+    return read_datetime(date_time_span.text, format)
+
+
+def read_datetime(text, format):
+    india_date_time = text + " Asia/Kolkata"
     return get(india_date_time, format + " ZZZ")
 
 
@@ -0,0 +1,31 @@
+"""
+On-disk cache for source files that never change once published, such as
+daily reports, so that backfills only download each of them once.
+
+Files are stored under `$PARSER_CACHE_DIR`, or `~/.cache/electricitymap/parsers`
+when it is not set.
+"""
+
+import os
+import uuid
+from pathlib import Path
+
+CACHE_DIR_ENV = "PARSER_CACHE_DIR"
+DEFAULT_CACHE_DIR = Path("~/.cache/electricitymap/parsers")
+
+
+def get_cache_dir(*parts: str) -> Path:
+    """Returns the cache directory for `parts`, e.g. `get_cache_dir("US_CA")`."""
+    root = Path(os.environ.get(CACHE_DIR_ENV) or DEFAULT_CACHE_DIR).expanduser()
+    return root.joinpath(*parts)
+
+
+def write_atomic(path: Path, data: bytes) -> None:
+    """
+    Writes `data` to `path` through a temporary file, so that concurrent readers
+    never see a partially written file.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex[:8]}.tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
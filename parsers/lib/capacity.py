@@ -0,0 +1,123 @@
+"""
+Local store of yearly installed capacities, for parsers that report capacities
+next to production.
+
+Capacities are published once a year by slow statistical sources, so they are
+persisted per zone and mode as JSON under the parser cache directory and only
+refetched every `refresh_interval`. Lookups are as-of: a datetime gets the
+capacity of the latest stored year that is not after its own year. Zones or
+modes without a stored series fall back to `ZONES_CONFIG[zone_key]["capacity"]`.
+"""
+
+import json
+import time
+from datetime import timedelta
+from logging import Logger, getLogger
+from pathlib import Path
+from threading import Lock
+from typing import Callable, Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from electricitymap.contrib.config import ZONES_CONFIG
+from parsers.lib.cache import get_cache_dir, write_atomic
+
+# Yearly capacities, keyed by year
+YearlyCapacities = Dict[int, float]
+
+
+class CapacityStore:
+    def __init__(
+        self,
+        root: Optional[Path] = None,
+        refresh_interval: timedelta = timedelta(days=7),
+    ):
+        self._root = root
+        self.refresh_interval = refresh_interval
+        self._series: Dict[str, dict] = {}
+        self._lock = Lock()
+
+    @property
+    def root(self) -> Path:
+        return self._root or get_cache_dir("capacities")
+
+    def _path(self, zone_key: str, mode: str) -> Path:
+        return self.root.joinpath(zone_key, f"{mode}.json")
+
+    def _load(self, zone_key: str, mode: str) -> Optional[dict]:
+        key = f"{zone_key}/{mode}"
+        if key not in self._series:
+            path = self._path(zone_key, mode)
+            if not path.exists():
+                return None
+            self._series[key] = json.loads(path.read_text())
+        return self._series[key]
+
+    def _save(self, zone_key: str, mode: str, capacities: YearlyCapacities) -> dict:
+        stored = {
+            "fetched_at": time.time(),
+            "capacities": {str(year): value for year, value in capacities.items()},
+        }
+        write_atomic(self._path(zone_key, mode), json.dumps(stored).encode())
+        self._series[f"{zone_key}/{mode}"] = stored
+        return stored
+
+    def get(
+        self,
+        zone_key: str,
+        mode: str,
+        fetch: Optional[Callable[[], YearlyCapacities]] = None,
+        logger: Logger = getLogger(__name__),
+    ) -> YearlyCapacities:
+        """
+        Returns the stored yearly capacities of a zone and mode, refreshed with
+        `fetch` when they are older than the refresh interval. Stale capacities
+        are kept when the refresh fails.
+        """
+        with self._lock:
+            stored = self._load(zone_key, mode)
+            is_stale = (
+                stored is None
+                or time.time() - stored["fetched_at"]
+                > self.refresh_interval.total_seconds()
+            )
+            if fetch is not None and is_stale:
+                try:
+                    capacities = fetch()
+                except Exception as e:
+                    logger.warning(
+                        f"{zone_key}: could not refresh {mode} capacities: {e}"
+                    )
+                    capacities = {}
+                if capacities:
+                    stored = self._save(zone_key, mode, capacities)
+        if stored is None:
+            return {}
+        return {int(year): value for year, value in stored["capacities"].items()}
+
+    def capacity_at(
+        self,
+        zone_key: str,
+        mode: str,
+        datetimes: Sequence,
+        fetch: Optional[Callable[[], YearlyCapacities]] = None,
+        min_year: Optional[int] = None,
+        logger: Logger = getLogger(__name__),
+    ) -> np.ndarray:
+        """
+        Returns the capacity of a zone and mode at each of `datetimes`, ignoring
+        stored years before `min_year`.
+        """
+        default = ZONES_CONFIG.get(zone_key, {}).get("capacity", {}).get(mode, np.nan)
+        capacities = self.get(zone_key, mode, fetch, logger)
+        years = np.array(sorted(capacities), dtype=int)
+        if min_year is not None:
+            years = years[years >= min_year]
+        values = np.array([capacities[year] for year in years], dtype=float)
+
+        target_years = pd.DatetimeIndex(pd.to_datetime(list(datetimes), utc=True)).year
+        if not len(years):
+            return np.full(len(target_years), default, dtype=float)
+        positions = np.searchsorted(years, target_years, side="right") - 1
+        return np.where(positions >= 0, values[np.maximum(positions, 0)], default)
@@ -0,0 +1,106 @@
+"""
+Excel ingestion for parsers that read sheets from published workbooks.
+
+A workbook is downloaded once and opened with a read-only reader: openpyxl in
+read-only mode for xlsx/xlsm files, xlrd loading sheets on demand for xls
+files. Only the requested sheets are parsed, all from the same open workbook,
+and parsed sheets are cached by the SHA-256 of the workbook, so that a parser
+asking for the same workbook twice (e.g. production then exchanges) neither
+downloads nor parses it again. Final workbooks, that won't change anymore, are
+also remembered by url so that they aren't downloaded again.
+"""
+
+import hashlib
+import json
+from collections import OrderedDict
+from io import BytesIO
+from threading import Lock
+from typing import Dict, Optional, Tuple, Union
+
+import pandas as pd
+import xlrd
+from requests import Session
+
+# Sheets are referred to by name or position
+SheetKey = Union[str, int]
+OLE2_SIGNATURE = b"\xd0\xcf\x11\xe0"
+
+
+class ExcelReader:
+    def __init__(self, max_sheets: int = 32, max_workbooks: int = 32):
+        self.max_sheets = max_sheets
+        self.max_workbooks = max_workbooks
+        self._sheets: "OrderedDict[Tuple[str, SheetKey, str], pd.DataFrame]" = (
+            OrderedDict()
+        )
+        self._workbooks: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = Lock()
+
+    def read(
+        self, content: bytes, sheets: Dict[SheetKey, dict]
+    ) -> Dict[SheetKey, pd.DataFrame]:
+        """
+        Parses `sheets` of a workbook, a mapping of sheet names (or positions)
+        to keyword arguments of `pandas.ExcelFile.parse` (e.g. `skiprows`,
+        `header`, `usecols` or `nrows` to read only a range). Returns copies, so
+        the frames can be modified.
+        """
+        digest = hashlib.sha256(content).hexdigest()
+        keys = {
+            sheet: (digest, sheet, json.dumps(options, sort_keys=True))
+            for sheet, options in sheets.items()
+        }
+        with self._lock:
+            parsed = {
+                sheet: self._sheets[key]
+                for sheet, key in keys.items()
+                if key in self._sheets
+            }
+            for key in keys.values():
+                if key in self._sheets:
+                    self._sheets.move_to_end(key)
+
+        missing = [sheet for sheet in sheets if sheet not in parsed]
+        if missing:
+            # Legacy xls files are OLE2 compound documents, others are zip
+            # archives that pandas already opens with openpyxl in read-only mode
+            if content.startswith(OLE2_SIGNATURE):
+                book = xlrd.open_workbook(file_contents=content, on_demand=True)
+            else:
+                book = BytesIO(content)
+            with pd.ExcelFile(book) as workbook:
+                for sheet in missing:
+                    parsed[sheet] = workbook.parse(sheet, **sheets[sheet])
+            with self._lock:
+                for sheet in missing:
+                    self._sheets[keys[sheet]] = parsed[sheet]
+                while len(self._sheets) > self.max_sheets:
+                    self._sheets.popitem(last=False)
+
+        return {sheet: parsed[sheet].copy() for sheet in sheets}
+
+    def fetch(
+        self,
+        url: str,
+        sheets: Dict[SheetKey, dict],
+        session: Optional[Session] = None,
+        final: bool = False,
+        **request_kwargs,
+    ) -> Dict[SheetKey, pd.DataFrame]:
+        """
+        Downloads the workbook at `url` and parses `sheets` of it, see `read`.
+        `final` workbooks are only downloaded once.
+        """
+        cache_key = url + json.dumps(request_kwargs.get("params"), sort_keys=True)
+        with self._lock:
+            content = self._workbooks.get(cache_key) if final else None
+        if content is None:
+            r = (session or Session()).get(url, **request_kwargs)
+            r.raise_for_status()
+            content = r.content
+            if final:
+                with self._lock:
+                    self._workbooks[cache_key] = content
+                    while len(self._workbooks) > self.max_workbooks:
+                        self._workbooks.popitem(last=False)
+        return self.read(content, sheets)
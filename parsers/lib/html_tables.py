@@ -0,0 +1,113 @@
+"""
+Extraction of HTML tables into columns, for parsers that scrape tables.
+
+A page is parsed once with lxml, a C parser several times faster than
+BeautifulSoup's html.parser, and the rows of each table are selected with an
+XPath expression. The cells of the selected rows are gathered into columns,
+which are converted to numbers or datetimes all at once with pandas. Parsers
+declare what they read from a page once, as `TableSpec`s, instead of walking
+the rows and converting each cell.
+"""
+
+from typing import Dict, NamedTuple, Optional, Sequence, Union
+
+import lxml.html
+import pandas as pd
+from lxml.html import HtmlElement
+
+
+class Column(NamedTuple):
+    name: str
+    # index of the cell in the row, or XPath of the value relative to the row
+    cell: Union[int, str]
+    # "text", "number" (with thousands separators) or "datetime"
+    type: str = "text"
+    # strptime format of datetimes
+    format: Optional[str] = None
+
+
+class TableSpec(NamedTuple):
+    # XPath of the rows of the table
+    rows: str
+    columns: Sequence[Column]
+    # XPath of the cells of a row, relative to it
+    cells: str = "td"
+    # number of rows to leave out at the start and at the end, e.g. headers
+    # and totals
+    skip_head: int = 0
+    skip_tail: int = 0
+    # time zone of naive datetimes
+    tz: Optional[str] = None
+
+
+def parse_html(content: Union[str, bytes]) -> HtmlElement:
+    """Parses a page, preferably from its bytes so that lxml detects the encoding."""
+    return lxml.html.document_fromstring(content)
+
+
+def _value(result) -> Optional[str]:
+    if isinstance(result, list):
+        result = result[0] if result else None
+    if result is None:
+        return None
+    if isinstance(result, HtmlElement):
+        return result.text_content()
+    return str(result)
+
+
+def _convert(values: list, column: Column, tz: Optional[str]) -> pd.Series:
+    series = pd.Series(values, dtype=object)
+    if column.type == "text":
+        return series
+    if column.type == "number":
+        return pd.to_numeric(
+            series.str.strip().str.replace(",", "", regex=False), errors="coerce"
+        )
+    if column.type == "datetime":
+        datetimes = pd.to_datetime(
+            series.str.strip(), format=column.format, errors="coerce"
+        )
+        return datetimes.dt.tz_localize(tz) if tz else datetimes
+    raise ValueError(f"Unknown column type: {column.type}")
+
+
+def read_table(document: HtmlElement, spec: TableSpec) -> pd.DataFrame:
+    """
+    Reads the rows selected by `spec` into a frame with one column per
+    `spec.columns`. Missing cells and values that aren't numbers or datetimes
+    are left missing.
+    """
+    rows = document.xpath(spec.rows)
+    rows = rows[spec.skip_head : len(rows) - spec.skip_tail]
+    values = {column.name: [] for column in spec.columns}
+    for row in rows:
+        cells = row.xpath(spec.cells)
+        for column in spec.columns:
+            if isinstance(column.cell, int):
+                cell = cells[column.cell] if column.cell < len(cells) else None
+                values[column.name].append(_value(cell))
+            else:
+                values[column.name].append(_value(row.xpath(column.cell)))
+    return pd.DataFrame(
+        {
+            column.name: _convert(values[column.name], column, spec.tz)
+            for column in spec.columns
+        }
+    )
+
+
+def read_tables(
+    content: Union[str, bytes, HtmlElement], specs: Dict[str, TableSpec]
+) -> Dict[str, pd.DataFrame]:
+    """Reads the tables of `specs` from a page, parsed once."""
+    document = content if isinstance(content, HtmlElement) else parse_html(content)
+    return {name: read_table(document, spec) for name, spec in specs.items()}
+
+
+def element_texts(document: HtmlElement, tag: str = "*") -> Dict[str, str]:
+    """Returns the text of all `tag` elements of a page that have an id, by id."""
+    return {
+        element.get("id"): element.text_content()
+        for element in document.iter(tag)
+        if element.get("id") is not None
+    }
@@ -0,0 +1,160 @@
+"""
+Image helpers for parsers that read values from screenshots and charts.
+
+An image is decoded once into a writable (height, width, channels) uint8 NumPy
+array. Regions of interest are views into that array, and colour masking and
+thresholding write into them in place, so a parser run doesn't copy pixels
+back and forth between PIL images and arrays.
+
+Sources are polled more often than their images change, so `ScreenshotCache`
+remembers what was read from the last image of a source: an identical file is
+not decoded again, and a region whose binarized pixels didn't change is not
+recognized again.
+"""
+
+import hashlib
+from io import BytesIO
+from threading import Lock
+from typing import Callable, Dict, Sequence, Tuple, TypeVar
+
+import cv2
+import numpy as np
+from PIL import Image
+
+# (left, top, right, bottom), as in PIL
+Box = Tuple[int, int, int, int]
+T = TypeVar("T")
+GRAY_WEIGHTS = np.array([19595, 38470, 7471], dtype=np.uint32)
+
+
+def decode_image(content: bytes, mode: str = "RGB") -> np.ndarray:
+    """Decodes an image file into a writable array, converting it to `mode`."""
+    # pylint: disable=no-member
+    if mode == "RGB":
+        # OpenCV decodes straight into an array, PIL would need another copy
+        image = cv2.imdecode(
+            np.frombuffer(content, dtype=np.uint8),
+            cv2.IMREAD_COLOR | cv2.IMREAD_IGNORE_ORIENTATION,
+        )
+        if image is not None:
+            return cv2.cvtColor(image, cv2.COLOR_BGR2RGB, dst=image)
+    image = Image.open(BytesIO(content))
+    if image.mode != mode:
+        image = image.convert(mode)
+    return np.array(image)
+
+
+def relative_box(
+    image: np.ndarray, left: float, top: float, right: float, bottom: float
+) -> Box:
+    """Converts fractions of the image size to a box in pixels."""
+    height, width = image.shape[:2]
+    return (
+        int(width * left),
+        int(height * top),
+        int(width * right),
+        int(height * bottom),
+    )
+
+
+def region(image: np.ndarray, box: Box) -> np.ndarray:
+    """Returns the region of `image` inside `box`, as a view."""
+    left, top, right, bottom = box
+    return image[top:bottom, left:right]
+
+
+def colour_mask(image: np.ndarray, colour: Sequence[int]) -> np.ndarray:
+    """Returns the mask of the pixels of `image` that have exactly `colour`."""
+    return np.all(image == np.asarray(colour, dtype=image.dtype), axis=-1)
+
+
+def invert(image: np.ndarray) -> np.ndarray:
+    """Inverts `image` in place."""
+    return np.subtract(255, image, out=image)
+
+
+def to_gray(image: np.ndarray) -> np.ndarray:
+    """Converts an RGB image to grayscale, with the same weights as PIL."""
+    # ITU-R 601-2 luma weights scaled by 2**16, as in PIL's convert("L")
+    return ((image @ GRAY_WEIGHTS + 0x8000) >> 16).astype(np.uint8)
+
+
+def otsu_threshold(gray: np.ndarray, inverted: bool = False) -> np.ndarray:
+    """
+    Binarizes a grayscale image with Otsu's threshold, in place when `gray` is
+    contiguous. With `inverted`, dark pixels become white.
+    """
+    # pylint: disable=no-member
+    flags = (cv2.THRESH_BINARY_INV if inverted else cv2.THRESH_BINARY) | (
+        cv2.THRESH_OTSU
+    )
+    return cv2.threshold(gray, 0, 255, flags, dst=gray)[1]
+
+
+def match_glyphs(binary: np.ndarray, glyphs: np.ndarray, symbols: Sequence[str]) -> str:
+    """
+    Reads a line of text from a binary (boolean) region of the height of
+    `glyphs`, a (n_symbols, height, width) stack of boolean masks. Every
+    horizontal position is compared to every glyph at once, through a sliding
+    window view of the region.
+    """
+    height, width = glyphs.shape[1:]
+    if binary.shape[1] < width:
+        return ""
+    windows = np.lib.stride_tricks.sliding_window_view(binary, (height, width))[0]
+    matches = (windows[:, None] == glyphs[None]).all(axis=(2, 3))
+    _, symbol_indices = np.nonzero(matches)
+    return "".join(symbols[i] for i in symbol_indices)
+
+
+def region_hash(image: np.ndarray) -> bytes:
+    """
+    Hashes the pixels of `image` binarized at mid-gray. Noise that doesn't
+    push a pixel across mid-gray, like JPEG re-encoding artifacts, leaves the
+    hash unchanged, while any change to the text drawn in the region changes it.
+    """
+    if image.dtype != bool:
+        if image.ndim == 3:
+            image = to_gray(image)
+        image = image >= 128
+    hasher = hashlib.sha1(np.asarray(image.shape, dtype=np.int64).tobytes())
+    hasher.update(np.packbits(image).tobytes())
+    return hasher.digest()
+
+
+class ScreenshotCache:
+    """Remembers the values read from the last image of a source."""
+
+    def __init__(self):
+        self._files: Dict[str, Tuple[bytes, object]] = {}
+        self._regions: Dict[str, Tuple[bytes, object]] = {}
+        self._lock = Lock()
+
+    def _get(
+        self, entries: Dict[str, Tuple[bytes, object]], key: str, digest: bytes, read
+    ):
+        with self._lock:
+            cached_digest, value = entries.get(key, (None, None))
+        if cached_digest == digest:
+            return value
+        value = read()
+        with self._lock:
+            entries[key] = (digest, value)
+        return value
+
+    def read(self, key: str, content: bytes, read: Callable[[bytes], T]) -> T:
+        """
+        Returns `read(content)`, or what it returned for the last image of
+        `key` if `content` is the same file.
+        """
+        digest = hashlib.sha256(content).digest()
+        return self._get(self._files, key, digest, lambda: read(content))
+
+    def read_region(
+        self, key: str, image: np.ndarray, read: Callable[[np.ndarray], T]
+    ) -> T:
+        """
+        Returns `read(image)`, or what it returned for the last region of `key`
+        if `image` has the same `region_hash`.
+        """
+        return self._get(self._regions, key, region_hash(image), lambda: read(image))
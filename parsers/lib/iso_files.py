@@ -0,0 +1,178 @@
+"""
+Shared fetcher for the daily (or yearly) files published by the US ISOs.
+
+Files of days that are over never change, so they are stored in a
+content-addressed cache on disk: contents live under `objects/` named by their
+SHA-256, and `refs/` maps each request to the digest of its response. Files
+still being updated (e.g. today's) are only kept in memory for `live_ttl`, so
+that all the fetches of a cycle share one download. Decoded files are memoized
+by content digest and decoder, so a file needed by several data types is only
+decoded once. Decoded values are shared and must not be modified in place.
+"""
+
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from logging import Logger, getLogger
+from pathlib import Path
+from threading import Lock
+from typing import Callable, Dict, Optional, Sequence, Tuple, TypeVar
+
+import arrow
+from requests import Session
+
+from parsers.lib.cache import get_cache_dir, write_atomic
+
+T = TypeVar("T")
+
+
+class ISOFileFetcher:
+    def __init__(
+        self,
+        name: str,
+        tz: str,
+        live_ttl: timedelta = timedelta(minutes=1),
+        max_workers: int = 8,
+        max_decoded: int = 32,
+        root: Optional[Path] = None,
+    ):
+        self.name = name
+        self.tz = tz
+        self.live_ttl = live_ttl
+        self.max_workers = max_workers
+        self.max_decoded = max_decoded
+        self._root = root
+        self._live: Dict[str, Tuple[float, bytes]] = {}
+        self._decoded: "OrderedDict[Tuple[str, str], object]" = OrderedDict()
+        self._lock = Lock()
+
+    @property
+    def root(self) -> Path:
+        return self._root or get_cache_dir("iso_files")
+
+    def is_final(self, day: date) -> bool:
+        """Files of a day are final once the day is over in the ISO's time zone."""
+        return day < arrow.utcnow().to(self.tz).date()
+
+    def _ref_path(self, cache_key: str) -> Path:
+        ref = hashlib.sha1(cache_key.encode()).hexdigest()
+        return self.root.joinpath("refs", self.name, ref)
+
+    def _object_path(self, digest: str) -> Path:
+        return self.root.joinpath("objects", digest[:2], digest)
+
+    def _read_cached(self, cache_key: str) -> Optional[bytes]:
+        ref_path = self._ref_path(cache_key)
+        if not ref_path.exists():
+            return None
+        object_path = self._object_path(ref_path.read_text().strip())
+        return object_path.read_bytes() if object_path.exists() else None
+
+    def _write_cached(self, cache_key: str, content: bytes) -> None:
+        digest = hashlib.sha256(content).hexdigest()
+        object_path = self._object_path(digest)
+        if not object_path.exists():
+            write_atomic(object_path, content)
+        write_atomic(self._ref_path(cache_key), digest.encode())
+
+    def get(
+        self,
+        url: str,
+        session: Optional[Session] = None,
+        final: bool = False,
+        data: Optional[dict] = None,
+        cache_key: Optional[str] = None,
+        **request_kwargs,
+    ) -> bytes:
+        """
+        Returns the content of `url`, POSTing `data` when given. `final` files
+        are read from and written to the disk cache. `cache_key` identifies the
+        request in the caches, and defaults to the url and data.
+        """
+        if cache_key is None:
+            cache_key = url + (json.dumps(data, sort_keys=True) if data else "")
+        if final:
+            content = self._read_cached(cache_key)
+            if content is not None:
+                return content
+        else:
+            with self._lock:
+                fetched_at, content = self._live.get(cache_key, (0.0, None))
+            if (
+                content is not None
+                and time.monotonic() - fetched_at < self.live_ttl.total_seconds()
+            ):
+                return content
+
+        s = session or Session()
+        if data is not None:
+            r = s.post(url, data=data, **request_kwargs)
+        else:
+            r = s.get(url, **request_kwargs)
+        r.raise_for_status()
+        content = r.content
+
+        if final:
+            self._write_cached(cache_key, content)
+        else:
+            now = time.monotonic()
+            with self._lock:
+                for stale_key in [
+                    key
+                    for key, (fetched_at, _) in self._live.items()
+                    if now - fetched_at >= self.live_ttl.total_seconds()
+                ]:
+                    del self._live[stale_key]
+                self._live[cache_key] = (now, content)
+        return content
+
+    def get_days(
+        self,
+        url_for_day: Callable[[date], str],
+        days: Sequence[date],
+        session: Optional[Session] = None,
+        logger: Logger = getLogger(__name__),
+    ) -> Dict[date, bytes]:
+        """
+        Downloads the files of `days` in parallel. Days whose file can't be
+        fetched are logged and left out.
+        """
+        session = session or Session()
+
+        def get_day(day: date) -> Optional[bytes]:
+            try:
+                return self.get(url_for_day(day), session, final=self.is_final(day))
+            except Exception as e:
+                logger.warning(f"{self.name}: file of {day} could not be fetched: {e}")
+                return None
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            contents = list(executor.map(get_day, days))
+        return {
+            day: content for day, content in zip(days, contents) if content is not None
+        }
+
+    def decode(self, content: bytes, decoder: Callable[[bytes], T]) -> T:
+        """Decodes `content` with `decoder`, once per content and decoder."""
+        key = (
+            hashlib.sha256(content).hexdigest(),
+            f"{decoder.__module__}.{decoder.__qualname__}",
+        )
+        with self._lock:
+            if key in self._decoded:
+                self._decoded.move_to_end(key)
+                return self._decoded[key]
+        value = decoder(content)
+        with self._lock:
+            self._decoded[key] = value
+            while len(self._decoded) > self.max_decoded:
+                self._decoded.popitem(last=False)
+        return value
+
+
+def day_range(start: date, end: date) -> list:
+    """Returns the days from `start` to `end`, both included."""
+    return [start + timedelta(days=i) for i in range((end - start).days + 1)]
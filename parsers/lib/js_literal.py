@@ -0,0 +1,218 @@
+"""
+Decoder for the JavaScript object literals that some sources embed in their
+pages instead of JSON, e.g. Highcharts options.
+
+Unlike JSON, these literals may have unquoted keys, single-quoted strings,
+trailing commas, comments, hexadecimal numbers and `undefined`, `NaN` or
+`Infinity` values. The text is split into tokens by a single compiled regular
+expression and the tokens are assembled into Python objects directly, which is
+much faster than a general-purpose decoder written in pure Python.
+"""
+
+import re
+from typing import Any, List, Tuple
+
+TOKEN = re.compile(
+    r"""
+    (?:\s|//[^\n]*|/\*.*?\*/)*
+    (?:
+        (?P<punctuation>[{}\[\]:,])
+      | (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+      | (?P<number>
+            [-+]?(?:
+                0[xX][0-9a-fA-F]+
+              | (?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?
+              | Infinity
+            )
+        )
+      | (?P<name>[A-Za-z_$][\w$]*)
+      | (?P<end>\Z)
+    )
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+ESCAPE = re.compile(
+    r"\\(?:u([0-9a-fA-F]{4})|x([0-9a-fA-F]{2})|(\r\n|[\s\S]))", re.DOTALL
+)
+ESCAPED_CHARACTERS = {
+    "b": "\b",
+    "f": "\f",
+    "n": "\n",
+    "r": "\r",
+    "t": "\t",
+    "v": "\v",
+    "0": "\0",
+    # line continuations
+    "\n": "",
+    "\r": "",
+    "\r\n": "",
+    "\u2028": "",
+    "\u2029": "",
+}
+CONSTANTS = {
+    "true": True,
+    "false": False,
+    "null": None,
+    "undefined": None,
+    "NaN": float("nan"),
+    "Infinity": float("inf"),
+}
+
+# (kind, value, position), kind being the punctuation itself for punctuation
+Token = Tuple[str, Any, int]
+
+
+class JSLiteralError(ValueError):
+    def __init__(self, message: str, text: str, position: int):
+        super().__init__(
+            f"{message} at position {position}: {text[position:position + 20]!r}"
+        )
+        self.position = position
+
+
+def _unescape(match: "re.Match") -> str:
+    code_unit, byte, character = match.groups()
+    if code_unit is not None:
+        return chr(int(code_unit, 16))
+    if byte is not None:
+        return chr(int(byte, 16))
+    return ESCAPED_CHARACTERS.get(character, character)
+
+
+def _decode_string(literal: str) -> str:
+    value = literal[1:-1]
+    if "\\" not in value:
+        return value
+    value = ESCAPE.sub(_unescape, value)
+    # \uXXXX escapes of surrogate pairs decode to two lone surrogates
+    return value.encode("utf-16", "surrogatepass").decode("utf-16")
+
+
+def _decode_number(literal: str):
+    unsigned = literal.lstrip("+-")
+    sign = -1 if literal.startswith("-") else 1
+    if unsigned[:2] in ("0x", "0X"):
+        return sign * int(unsigned, 16)
+    if unsigned == "Infinity":
+        return sign * float("inf")
+    if "." in unsigned or "e" in unsigned or "E" in unsigned:
+        return float(literal)
+    return int(literal)
+
+
+def _tokenize(text: str, position: int, single_value: bool) -> List[Token]:
+    """
+    Splits `text` into tokens from `position`. With `single_value`, stops at
+    the end of the first complete value.
+    """
+    tokens: List[Token] = []
+    depth = 0
+    match = TOKEN.match
+    while True:
+        m = match(text, position)
+        if m is None:
+            raise JSLiteralError("Unexpected character", text, position)
+        kind = m.lastgroup
+        start = m.start(kind)
+        position = m.end()
+        if kind == "punctuation":
+            value = m.group(kind)
+            tokens.append((value, None, start))
+            if value in "{[":
+                depth += 1
+            elif value in "}]":
+                depth -= 1
+            else:
+                continue
+        elif kind == "string":
+            tokens.append((kind, _decode_string(m.group(kind)), start))
+        elif kind == "number":
+            tokens.append((kind, _decode_number(m.group(kind)), start))
+        elif kind == "name":
+            tokens.append((kind, m.group(kind), start))
+        else:
+            tokens.append(("end", None, start))
+            return tokens
+        if single_value and depth <= 0:
+            tokens.append(("end", None, position))
+            return tokens
+
+
+class _Parser:
+    def __init__(self, text: str, tokens: List[Token]):
+        self.text = text
+        self.tokens = tokens
+        self.index = 0
+
+    def error(self, message: str):
+        raise JSLiteralError(message, self.text, self.tokens[self.index][2])
+
+    def value(self):
+        kind, value, _ = self.tokens[self.index]
+        self.index += 1
+        if kind == "{":
+            return self.object()
+        if kind == "[":
+            return self.array()
+        if kind == "string" or kind == "number":
+            return value
+        if kind == "name" and value in CONSTANTS:
+            return CONSTANTS[value]
+        self.index -= 1
+        self.error("Expected a value")
+
+    def array(self) -> list:
+        items = []
+        tokens = self.tokens
+        while tokens[self.index][0] != "]":
+            items.append(self.value())
+            kind = tokens[self.index][0]
+            if kind == ",":
+                self.index += 1
+            elif kind != "]":
+                self.error("Expected ',' or ']'")
+        self.index += 1
+        return items
+
+    def object(self) -> dict:
+        items = {}
+        tokens = self.tokens
+        while tokens[self.index][0] != "}":
+            kind, key, _ = tokens[self.index]
+            if kind == "number":
+                key = str(key)
+            elif kind not in ("string", "name"):
+                self.error("Expected a key")
+            self.index += 1
+            if tokens[self.index][0] != ":":
+                self.error("Expected ':'")
+            self.index += 1
+            items[key] = self.value()
+            kind = tokens[self.index][0]
+            if kind == ",":
+                self.index += 1
+            elif kind != "}":
+                self.error("Expected ',' or '}'")
+        self.index += 1
+        return items
+
+
+def raw_decode(text: str, position: int = 0) -> Tuple[Any, int]:
+    """
+    Decodes the literal starting at `position` of `text`, ignoring whatever
+    follows it (e.g. the rest of a script). Returns the value and the position
+    where the literal ends.
+    """
+    tokens = _tokenize(text, position, single_value=True)
+    parser = _Parser(text, tokens)
+    value = parser.value()
+    return value, tokens[-1][2]
+
+
+def decode(text: str) -> Any:
+    """Decodes `text`, which must hold a single literal."""
+    parser = _Parser(text, _tokenize(text, 0, single_value=False))
+    value = parser.value()
+    if parser.tokens[parser.index][0] != "end":
+        parser.error("Extra data")
+    return value
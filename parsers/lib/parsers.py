@@ -1,6 +1,7 @@
 import importlib
 
 from electricitymap.contrib.config import EXCHANGES_CONFIG, ZONES_CONFIG
+from parsers.lib.tracing import traced_parser
 
 # Prepare all parsers
 CONSUMPTION_PARSERS = {}
@@ -34,7 +35,9 @@ class data_extracter():
                 mod_name, fun_name = v.split(".")
                 mod = importlib.import_module("parsers.%s" % mod_name)
                 mod = mod.extract_data()
-                PARSER_KEY_TO_DICT[parser_key][id] = getattr(mod, fun_name)
+                PARSER_KEY_TO_DICT[parser_key][id] = traced_parser(
+                    getattr(mod, fun_name), zone_key=id, data_type=parser_key
+                )
 
 
 extracter = data_extracter()
@@ -3,12 +3,12 @@ This library contains validation functions applied to all parsers by the feeder.
 This is a higher level validation than validation.py
 """
 from datetime import datetime
-from typing import Any, Dict, List
+from typing import Any, Dict
 from warnings import warn
 
 import arrow
 
-from electricitymap.contrib.config import EXCHANGES_CONFIG, ZoneKey, emission_factors
+from electricitymap.contrib.config import ZoneKey, emission_factors
 
 
 class ValidationError(ValueError):
@@ -57,31 +57,15 @@ def validate_exchange(item, k) -> None:
     validate_reasonable_time(item, k)
     if "netFlow" not in item:
         raise ValidationError("netFlow was not returned for %s" % k)
-    # Verify that the exchange flow is not greater than the interconnector
-    # capacity and has physical sense (no exchange should exceed 100GW)
+    # Verify that the exchange flow has physical sense (no exchange should
+    # exceed 100GW), interconnector capacities are checked by the validators
     # Use https://github.com/tmrowco/electricitymap-contrib/blob/master/parsers/example.py for expected format
     if item.get("sortedZoneKeys", None) and item.get("netFlow", None):
-        zone_names: List[str] = item["sortedZoneKeys"]
         if abs(item.get("netFlow", 0)) > 100000:
             raise ValidationError(
                 "netFlow %s exceeds physical plausibility (>100GW) for %s"
                 % (item["netFlow"], k)
             )
-        if len(zone_names) == 2:
-            if (zone_names in EXCHANGES_CONFIG) and (
-                "capacity" in EXCHANGES_CONFIG[zone_names]
-            ):
-                interconnector_capacities = EXCHANGES_CONFIG[zone_names]["capacity"]
-                margin = 0.1
-                if not (
-                    min(interconnector_capacities) * (1 - margin)
-                    <= item["netFlow"]
-                    <= max(interconnector_capacities) * (1 + margin)
-                ):
-                    raise ValidationError(
-                        "netFlow %s exceeds interconnector capacity for %s"
-                        % (item["netFlow"], k)
-                    )
 
 
 def validate_production(obj: Dict[str, Any], zone_key: ZoneKey) -> None:
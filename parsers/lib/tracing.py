@@ -0,0 +1,231 @@
+"""
+Lightweight tracing of the time spent in parsers.
+
+Spans are recorded per zone, data type and phase (e.g. `network`, `decode`,
+`parse`, `validation`) and nest: a span opened while another one is active is
+recorded as its child. Tracing is disabled by default, in which case `span`
+returns a shared no-op context manager and `traced` functions only pay for a
+flag check. Set the `PARSER_TRACING` environment variable or call `enable()` to
+record spans, and export them with `to_prometheus`, `to_jsonl` or `to_folded`.
+"""
+
+import json
+import os
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+from functools import wraps
+from threading import Lock
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+
+class Span(NamedTuple):
+    zone_key: Optional[str]
+    data_type: Optional[str]
+    path: Tuple[str, ...]
+    start: float
+    duration: float
+    # Time spent in this span but not in its children
+    self_duration: float
+
+    @property
+    def phase(self) -> str:
+        return self.path[-1]
+
+
+class _Frame:
+    __slots__ = ("phase", "zone_key", "data_type", "path", "start", "child_time")
+
+    def __init__(self, phase, zone_key, data_type, path):
+        self.phase = phase
+        self.zone_key = zone_key
+        self.data_type = data_type
+        self.path = path
+        self.start = 0.0
+        self.child_time = 0.0
+
+
+_current_frame: ContextVar[Optional[_Frame]] = ContextVar(
+    "parser_tracing_frame", default=None
+)
+
+
+class Tracer:
+    def __init__(self, enabled: bool = False, max_spans: int = 100000):
+        self.enabled = enabled
+        self.max_spans = max_spans
+        self.spans: List[Span] = []
+        self._lock = Lock()
+
+    def record(self, span: Span):
+        with self._lock:
+            if len(self.spans) < self.max_spans:
+                self.spans.append(span)
+
+    def clear(self) -> List[Span]:
+        """Removes and returns all recorded spans."""
+        with self._lock:
+            spans, self.spans = self.spans, []
+        return spans
+
+
+TRACER = Tracer(enabled=bool(os.environ.get("PARSER_TRACING")))
+
+
+def enable():
+    TRACER.enabled = True
+
+
+def disable():
+    TRACER.enabled = False
+
+
+class _Span:
+    __slots__ = ("frame", "token")
+
+    def __init__(self, phase: str, zone_key: Optional[str], data_type: Optional[str]):
+        parent = _current_frame.get()
+        if parent is not None:
+            zone_key = zone_key or parent.zone_key
+            data_type = data_type or parent.data_type
+            path = parent.path + (phase,)
+        else:
+            path = (phase,)
+        self.frame = _Frame(phase, zone_key, data_type, path)
+
+    def __enter__(self):
+        self.token = _current_frame.set(self.frame)
+        self.frame.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        frame = self.frame
+        duration = time.perf_counter() - frame.start
+        _current_frame.reset(self.token)
+        parent = _current_frame.get()
+        if parent is not None:
+            parent.child_time += duration
+        TRACER.record(
+            Span(
+                frame.zone_key,
+                frame.data_type,
+                frame.path,
+                frame.start,
+                duration,
+                duration - frame.child_time,
+            )
+        )
+        return False
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def span(phase: str, zone_key: Optional[str] = None, data_type: Optional[str] = None):
+    """
+    Context manager recording the time spent in `phase`.
+    The zone key and data type are inherited from the enclosing span if not given.
+    """
+    if not TRACER.enabled:
+        return _NOOP_SPAN
+    return _Span(phase, zone_key, data_type)
+
+
+def traced(phase: str) -> Callable:
+    """Decorator recording every call of the decorated function as a `phase` span."""
+
+    def wrap(f):
+        @wraps(f)
+        def wrapped_f(*args, **kwargs):
+            if not TRACER.enabled:
+                return f(*args, **kwargs)
+            with _Span(phase, None, None):
+                return f(*args, **kwargs)
+
+        return wrapped_f
+
+    return wrap
+
+
+def traced_parser(f: Callable, zone_key: str, data_type: str) -> Callable:
+    """Wraps a parser function so that its calls are recorded as `parser` spans."""
+
+    @wraps(f)
+    def wrapped_f(*args, **kwargs):
+        if not TRACER.enabled:
+            return f(*args, **kwargs)
+        with _Span("parser", zone_key, data_type):
+            return f(*args, **kwargs)
+
+    return wrapped_f
+
+
+def _escape_label(value: Optional[str]) -> str:
+    return (value or "").replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def to_prometheus(spans: Iterable[Span]) -> str:
+    """Exports the total self time and count of spans per zone, data type and phase."""
+    totals: Dict[Tuple, List[float]] = defaultdict(lambda: [0.0, 0])
+    for s in spans:
+        total = totals[(s.zone_key, s.data_type, s.phase)]
+        total[0] += s.self_duration
+        total[1] += 1
+    lines = [
+        "# HELP parser_phase_seconds Time spent per parser phase, excluding nested phases.",
+        "# TYPE parser_phase_seconds summary",
+    ]
+    for (zone_key, data_type, phase), (seconds, count) in sorted(
+        totals.items(), key=lambda item: tuple(v or "" for v in item[0])
+    ):
+        labels = (
+            f'zone="{_escape_label(zone_key)}",'
+            f'data_type="{_escape_label(data_type)}",'
+            f'phase="{_escape_label(phase)}"'
+        )
+        lines.append(f"parser_phase_seconds_sum{{{labels}}} {seconds:.6f}")
+        lines.append(f"parser_phase_seconds_count{{{labels}}} {count}")
+    return "\n".join(lines) + "\n"
+
+
+def to_jsonl(spans: Iterable[Span]) -> str:
+    """Exports one JSON object per span."""
+    return "".join(
+        json.dumps(
+            {
+                "zone_key": s.zone_key,
+                "data_type": s.data_type,
+                "phase": s.phase,
+                "path": list(s.path),
+                "start": s.start,
+                "duration": s.duration,
+                "self_duration": s.self_duration,
+            }
+        )
+        + "\n"
+        for s in spans
+    )
+
+
+def to_folded(spans: Iterable[Span]) -> str:
+    """
+    Exports spans as folded stacks (`zone;data_type;phase;... microseconds`),
+    the input format of flamegraph.pl and speedscope.
+    """
+    totals: Dict[str, float] = defaultdict(float)
+    for s in spans:
+        stack = ";".join((s.zone_key or "-", s.data_type or "-") + s.path)
+        totals[stack] += s.self_duration
+    return "".join(
+        f"{stack} {round(seconds * 1e6)}\n" for stack, seconds in sorted(totals.items())
+    )
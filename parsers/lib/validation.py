@@ -7,6 +7,8 @@ from typing import Any, Dict, List, Tuple, Union
 import numpy as np
 import pandas as pd
 
+from .tracing import traced
+
 
 def has_value_for_key(datapoint: Dict[str, Any], key: str, logger: Logger):
     """
@@ -43,6 +45,7 @@ def check_expected_range(
     return True
 
 
+@traced("validation")
 def validate_production_diffs(
     datapoints: List[Dict[str, Any]], max_diff: Dict, logger: Logger
 ):
@@ -108,6 +111,7 @@ def validate_production_diffs(
     return [datapoints[i] for i in ok_diff[ok_diff].index]
 
 
+@traced("validation")
 def validate(
     datapoint: Dict, logger: Union[Logger, None], **kwargs
 ) -> Union[Dict[str, Any], None]:
@@ -4,11 +4,14 @@ from bs4 import BeautifulSoup
 from requests import Response, Session
 
 from .exceptions import ParserException
+from .html_tables import parse_html
+from .tracing import span
 
 
 def get_response(zone_key: str, url: str, session: Optional[Session] = None):
     ses = session or Session()
-    response: Response = ses.get(url)
+    with span("network", zone_key=zone_key):
+        response: Response = ses.get(url)
     if response.status_code != 200:
         raise ParserException(
             zone_key, "Response code: {0}".format(response.status_code)
@@ -20,7 +23,8 @@ def get_response_with_params(
     zone_key: str, url, session: Optional[Session] = None, params=None
 ):
     ses = session or Session()
-    response: Response = ses.get(url, params=params)
+    with span("network", zone_key=zone_key):
+        response: Response = ses.get(url, params=params)
     if response.status_code != 200:
         raise ParserException(
             zone_key, "Response code: {0}".format(response.status_code)
@@ -30,11 +34,23 @@ def get_response_with_params(
 
 def get_response_text(zone_key: str, url, session: Optional[Session] = None):
     response = get_response(zone_key, url, session)
-    if not response.text:
+    with span("decode", zone_key=zone_key):
+        text = response.text
+    if not text:
         raise ParserException(zone_key, "Response empty")
-    return response.text
+    return text
 
 
 def get_response_soup(zone_key: str, url, session: Optional[Session] = None):
     response_text = get_response_text(zone_key, url, session)
-    return BeautifulSoup(response_text, "html.parser")
+    with span("parse", zone_key=zone_key):
+        return BeautifulSoup(response_text, "html.parser")
+
+
+def get_response_document(zone_key: str, url, session: Optional[Session] = None):
+    """Returns the page at `url` parsed with lxml, see `html_tables`."""
+    response = get_response(zone_key, url, session)
+    if not response.content:
+        raise ParserException(zone_key, "Response empty")
+    with span("parse", zone_key=zone_key):
+        return parse_html(response.content)
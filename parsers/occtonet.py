@@ -1,11 +1,17 @@
 #!/usr/bin/env python3
 # coding=utf-8
-from datetime import datetime
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 from io import StringIO
 from logging import Logger, getLogger
-from typing import Dict, List, Optional
+from threading import Lock
+from typing import Dict, List, NamedTuple, Optional
+from weakref import WeakKeyDictionary
 
 import arrow
+import numpy as np
 import pandas as pd
 from requests import Session, cookies
 
@@ -47,42 +53,196 @@ EXCHANGE_MAPPING = {
 FLOWS_TO_REVERT = ["JP-CB->JP-TK", "JP-CG->JP-KN", "JP-CG->JP-SK"]
 
 SOURCE_URL = "occtonet.occto.or.jp"
-EXCHANGE_COLUMNS = ["sortedZoneKeys", "netFlow", "source"]
-
-
-def _fetch_exchange(
-    session: Session, datetime: datetime, sorted_zone_keys: str
-) -> List[dict]:
-    exch_id = EXCHANGE_MAPPING[sorted_zone_keys]
+LOGIN_URL = "http://occtonet.occto.or.jp/public/dfw/RP11/OCCTO/SD/LOGIN_login"
+EXCHANGE_URL = "https://occtonet3.occto.or.jp/public/dfw/RP11/OCCTO/SD/CA01S070C"
+# Interconnectors ids, in the column order of daily sweeps
+INTERCONNECTOR_IDS = sorted({i for ids in EXCHANGE_MAPPING.values() for i in ids})
+FLOW_COLUMN = "潮流実績"
+FORECAST_COLUMN = "計画潮流(順方向)"
+
+# Logging in authorises all subsequent calls of a session for a while
+LOGIN_TTL = timedelta(minutes=10)
+# Daily sweeps younger than this are served without asking occtonet again
+SWEEP_TTL = timedelta(minutes=5)
+MAX_WORKERS = 4
+
+
+class OcctoSession:
+    """Logs a requests session in to occtonet at most once per LOGIN_TTL."""
+
+    def __init__(self, session: Session):
+        self.session = session
+        self.logged_in_at: Optional[float] = None
+        self.lock = Lock()
+
+    def login(self) -> Session:
+        with self.lock:
+            now = time.monotonic()
+            if (
+                self.logged_in_at is None
+                or now - self.logged_in_at > LOGIN_TTL.total_seconds()
+            ):
+                get_cookies(self.session)
+                self.logged_in_at = now
+        return self.session
+
+
+OCCTO_SESSIONS: "WeakKeyDictionary[Session, OcctoSession]" = WeakKeyDictionary()
+OCCTO_SESSIONS_LOCK = Lock()
+
+
+def get_occto_session(session: Session) -> OcctoSession:
+    with OCCTO_SESSIONS_LOCK:
+        if session not in OCCTO_SESSIONS:
+            OCCTO_SESSIONS[session] = OcctoSession(session)
+        return OCCTO_SESSIONS[session]
+
+
+class InterconnectorCSV(NamedTuple):
+    """Parsed CSV of one interconnector for one day."""
+
+    updated: str  # update time reported by occtonet
+    digest: str
+    datetimes: pd.DatetimeIndex
+    flows: np.ndarray
+    forecasts: np.ndarray
+
+
+class DailySweep(NamedTuple):
+    """
+    Flows and forecasts of all interconnectors for one day, as arrays of shape
+    (len(datetimes), len(INTERCONNECTOR_IDS)) with NaN for missing values.
+    """
+
+    fetched_at: float
+    csvs: Dict[int, InterconnectorCSV]
+    datetimes: pd.DatetimeIndex
+    flows: np.ndarray
+    forecasts: np.ndarray
+
+
+SWEEPS: Dict[str, DailySweep] = {}
+SWEEPS_LOCK = Lock()
+
+
+def parse_interconnector_csv(text: str, updated: str, digest: str) -> InterconnectorCSV:
+    df = pd.read_csv(StringIO(text), delimiter=",")
+    naive = pd.to_datetime(df["対象日付"] + " " + df["対象時刻"])
+    return InterconnectorCSV(
+        updated=updated,
+        digest=digest,
+        datetimes=pd.DatetimeIndex(naive).tz_localize("Asia/Tokyo"),
+        flows=pd.to_numeric(df[FLOW_COLUMN], errors="coerce").to_numpy(dtype=float),
+        forecasts=pd.to_numeric(df[FORECAST_COLUMN], errors="coerce").to_numpy(
+            dtype=float
+        ),
+    )
 
-    # This authorises subsequent calls
-    cookies = get_cookies(session)
 
-    df = pd.DataFrame()
-    for i in range(len(exch_id)):
-        form_data = get_form_data(session, exch_id[i], datetime)
-        _df = get_exchange(session, form_data)
-        if df.empty:
-            df = _df
-        else:
-            df += _df
-            df.reset_index()
+def fetch_interconnector_csv(
+    session: Session,
+    exchange_id: int,
+    date: str,
+    previous: Optional[InterconnectorCSV] = None,
+) -> InterconnectorCSV:
+    """
+    Fetches the CSV of an interconnector for `date`. The CSV is neither
+    downloaded nor parsed again when it hasn't changed since `previous`.
+    """
+    form_data = get_header_form_data(session, exchange_id, date)
+    if previous is not None and form_data["updDaytime"] == previous.updated:
+        return previous
+    add_download_token(session, form_data)
 
-    if sorted_zone_keys in FLOWS_TO_REVERT:
-        df["netFlow"] = -1 * df["netFlow"]
+    form_data["fwExtention.actionSubType"] = "download"
+    r = session.post(EXCHANGE_URL, data=form_data)
+    r.encoding = "shift-jis"
+    digest = hashlib.sha1(r.content).hexdigest()
+    if previous is not None and digest == previous.digest:
+        return previous._replace(updated=form_data["updDaytime"])
+    return parse_interconnector_csv(r.text, form_data["updDaytime"], digest)
+
+
+def fetch_daily_sweep(session: Session, date: str) -> DailySweep:
+    """
+    Fetches the CSVs of all interconnectors for `date` (formatted as
+    YYYY/MM/DD) concurrently, and aligns them in a single sweep that serves
+    all exchanges and forecasts of that day.
+    """
+    with SWEEPS_LOCK:
+        previous = SWEEPS.get(date)
+    if (
+        previous is not None
+        and time.monotonic() - previous.fetched_at < SWEEP_TTL.total_seconds()
+    ):
+        return previous
+
+    occto_session = get_occto_session(session)
+    occto_session.login()
+    previous_csvs = previous.csvs if previous is not None else {}
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        csvs = dict(
+            zip(
+                INTERCONNECTOR_IDS,
+                executor.map(
+                    lambda i: fetch_interconnector_csv(
+                        session, i, date, previous_csvs.get(i)
+                    ),
+                    INTERCONNECTOR_IDS,
+                ),
+            )
+        )
 
-    df["source"] = SOURCE_URL
+    if previous is not None and all(
+        csvs[i].digest == previous.csvs[i].digest for i in INTERCONNECTOR_IDS
+    ):
+        sweep = previous._replace(fetched_at=time.monotonic())
+    else:
+        datetimes = (
+            pd.DatetimeIndex(
+                np.unique(np.concatenate([csv.datetimes.asi8 for csv in csvs.values()]))
+            )
+            .tz_localize("UTC")
+            .tz_convert("Asia/Tokyo")
+        )
+        flows = np.full((len(datetimes), len(INTERCONNECTOR_IDS)), np.nan)
+        forecasts = np.full_like(flows, np.nan)
+        for column, i in enumerate(INTERCONNECTOR_IDS):
+            rows = datetimes.get_indexer(csvs[i].datetimes)
+            flows[rows, column] = csvs[i].flows
+            forecasts[rows, column] = csvs[i].forecasts
+        sweep = DailySweep(time.monotonic(), csvs, datetimes, flows, forecasts)
+
+    with SWEEPS_LOCK:
+        SWEEPS[date] = sweep
+        # Only the most recent days are queried repeatedly
+        for stale_date in sorted(SWEEPS)[:-3]:
+            del SWEEPS[stale_date]
+    return sweep
 
-    df["sortedZoneKeys"] = sorted_zone_keys
-    df = df[EXCHANGE_COLUMNS]
-    df = df.reset_index()
 
-    results = df.to_dict("records")
-    # For some reason, to_dict converts datetimes to Timestamps
-    # See https://stackoverflow.com/questions/64171427/pandas-to-dict-converts-datetime-to-timestamp
-    for result in results:
-        result["datetime"] = result["datetime"].to_pydatetime()
-    return results
+def _fetch_exchange(
+    session: Session, date: str, sorted_zone_keys: str, forecast: bool = False
+) -> List[dict]:
+    sweep = fetch_daily_sweep(session, date)
+    columns = [INTERCONNECTOR_IDS.index(i) for i in EXCHANGE_MAPPING[sorted_zone_keys]]
+    values = sweep.forecasts if forecast else sweep.flows
+    net_flows = values[:, columns].sum(axis=1)
+    if sorted_zone_keys in FLOWS_TO_REVERT:
+        net_flows = -net_flows
+
+    is_known = ~np.isnan(net_flows)
+    return [
+        {
+            "datetime": dt,
+            "sortedZoneKeys": sorted_zone_keys,
+            "netFlow": net_flow,
+            "source": SOURCE_URL,
+        }
+        for dt, net_flow in zip(
+            sweep.datetimes[is_known].to_pydatetime(), net_flows[is_known].tolist()
+        )
+    ]
 
 
 def fetch_exchange(
@@ -121,17 +281,19 @@ def fetch_exchange_forecast(
         )
 
     sorted_zone_keys = "->".join(sorted([zone_key1, zone_key2]))
-    return _fetch_exchange(session, query_datetime, sorted_zone_keys)
+    return _fetch_exchange(session, query_datetime, sorted_zone_keys, forecast=True)
 
 
 def get_cookies(session: Optional[Session] = None) -> cookies.RequestsCookieJar:
     if not session:
         session = Session()
-    session.get("http://occtonet.occto.or.jp/public/dfw/RP11/OCCTO/SD/LOGIN_login")
+    session.get(LOGIN_URL)
     return session.cookies
 
 
-def get_form_data(session: Session, exchange_id: int, datetime: str) -> Dict[str, str]:
+def get_header_form_data(
+    session: Session, exchange_id: int, datetime: str
+) -> Dict[str, str]:
     form_data = {
         "ajaxToken": "",
         "downloadKey": "",
@@ -156,10 +318,7 @@ def get_form_data(session: Session, exchange_id: int, datetime: str) -> Dict[str
         "updDaytime": "",
     }
 
-    r = session.post(
-        "https://occtonet3.occto.or.jp/public/dfw/RP11/OCCTO/SD/CA01S070C",
-        data=form_data,
-    )
+    r = session.post(EXCHANGE_URL, data=form_data)
     response_content = r.json()
 
     if response_content["root"]["errMessage"]:
@@ -182,12 +341,12 @@ def get_form_data(session: Session, exchange_id: int, datetime: str) -> Dict[str
         form_data["updDaytime"] = response_content["root"]["bizRoot"]["header"][
             "updDaytime"
         ]["value"]
+    return form_data
+
 
+def add_download_token(session: Session, form_data: Dict[str, str]) -> None:
     form_data["fwExtention.actionSubType"] = "ok"
-    r = session.post(
-        "https://occtonet3.occto.or.jp/public/dfw/RP11/OCCTO/SD/CA01S070C",
-        data=form_data,
-    )
+    r = session.post(EXCHANGE_URL, data=form_data)
     response_content = r.json()
 
     if response_content["root"]["errFields"]:
@@ -204,35 +363,12 @@ def get_form_data(session: Session, exchange_id: int, datetime: str) -> Dict[str
         form_data["requestToken"] = response_content["root"]["bizRoot"]["header"][
             "requestToken"
         ]["value"]
-    return form_data
-
-
-def _get_exchange(session: Session, form_data: Dict[str, str], columns: List[str]):
-    def parse_dt(str_dt: str) -> datetime:
-        return arrow.get(str_dt).replace(tzinfo="Asia/Tokyo").datetime
-
-    form_data["fwExtention.actionSubType"] = "download"
-    r = session.post(
-        "https://occtonet3.occto.or.jp/public/dfw/RP11/OCCTO/SD/CA01S070C",
-        data=form_data,
-    )
-    r.encoding = "shift-jis"
-    df = pd.read_csv(StringIO(r.text), delimiter=",")
-    df = df[columns]
-    df.columns = ["date", "time", "netFlow"]
-    df.loc[:, "datetime"] = (df.date + " " + df.time).apply(lambda x: parse_dt(x))
-    df = df.set_index("datetime")
-    df = df.drop(columns=["date", "time"])
-    df = df.dropna()
-    return df
 
 
-def get_exchange(session: Session, form_data):
-    return _get_exchange(session, form_data, ["対象日付", "対象時刻", "潮流実績"])
-
-
-def get_exchange_fcst(session: Session, form_data):
-    return _get_exchange(session, form_data, ["対象日付", "対象時刻", "計画潮流(順方向)"])
+def get_form_data(session: Session, exchange_id: int, datetime: str) -> Dict[str, str]:
+    form_data = get_header_form_data(session, exchange_id, datetime)
+    add_download_token(session, form_data)
+    return form_data
 
 
 if __name__ == "__main__":
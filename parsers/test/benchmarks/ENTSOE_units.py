@@ -0,0 +1,132 @@
+"""
+Compares fetching the production per unit of a large domain, 400 units over
+a day at a quarter-hourly resolution, by parsing each response into a dict of
+point dicts with BeautifulSoup, as the parser used to, against the streaming
+unit table. Time and peak memory are reported, responses are served from
+memory.
+"""
+
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+
+import arrow
+from bs4 import BeautifulSoup
+
+from parsers import ENTSOE
+from parsers.test.benchmarks import report, report_memory
+
+UNITS_PER_TYPE = 20
+START = datetime(2022, 3, 14, 12, tzinfo=timezone.utc)
+
+
+def unit_response(psr_type: str) -> str:
+    points = "".join(
+        f"<Point><position>{i}</position><quantity>{100 + i * 0.1:.1f}</quantity></Point>"
+        for i in range(1, 97)
+    )
+    series = "".join(
+        f"""<TimeSeries><mRID>{unit}</mRID><businessType>A01</businessType>
+<inBiddingZone_Domain.mRID codingScheme="A01">10Y1001A1001A796</inBiddingZone_Domain.mRID>
+<MktPSRType><psrType>{psr_type}</psrType><PowerSystemResources>
+<mRID codingScheme="A01">{psr_type}W{unit:012}</mRID><name>Unit {psr_type} {unit}</name>
+</PowerSystemResources></MktPSRType><Period><timeInterval>
+<start>{START:%Y-%m-%dT%H:%MZ}</start><end>{START + timedelta(days=1):%Y-%m-%dT%H:%MZ}</end>
+</timeInterval><resolution>PT15M</resolution>{points}</Period></TimeSeries>"""
+        for unit in range(UNITS_PER_TYPE)
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?><GL_MarketDocument '
+        'xmlns="urn:iec62325.351:tc57wg16:451-6:generationloaddocument:3:0">'
+        f"{series}</GL_MarketDocument>"
+    )
+
+
+def legacy_parse(xml_text: str):
+    values = {}
+    soup = BeautifulSoup(xml_text, "html.parser")
+    for timeseries in soup.find_all("timeseries"):
+        if not timeseries.find_all("inBiddingZone_Domain.mRID".lower()):
+            continue
+        resolution = str(timeseries.find_all("resolution")[0].contents[0])
+        datetime_start = arrow.get(timeseries.find_all("start")[0].contents[0])
+        psr_type = str(
+            timeseries.find_all("mktpsrtype")[0].find_all("psrtype")[0].contents[0]
+        )
+        unit = timeseries.find_all("mktpsrtype")[0].find_all("powersystemresources")[0]
+        unit_key = str(unit.find_all("mrid")[0].contents[0])
+        unit_name = str(unit.find_all("name")[0].contents[0])
+        for entry in timeseries.find_all("point"):
+            quantity = float(entry.find_all("quantity")[0].contents[0])
+            position = int(entry.find_all("position")[0].contents[0])
+            dt = ENTSOE.datetime_from_position(datetime_start, position, resolution)
+            key = (unit_key, dt)
+            if key in values:
+                values[key]["production"] += quantity
+            else:
+                values[key] = {
+                    "datetime": dt,
+                    "production": quantity,
+                    "productionType": ENTSOE.ENTSOE_PARAMETER_BY_GROUP[psr_type],
+                    "unitKey": unit_key,
+                    "unitName": unit_name,
+                }
+    return values.values()
+
+
+def legacy_fetch(responses: dict, units_to_zone: dict) -> list:
+    data = []
+    for psr_type in ENTSOE.ENTSOE_PARAMETER_DESC:
+        for v in legacy_parse(responses[psr_type]):
+            v["source"] = "entsoe.eu"
+            if v["unitName"] in units_to_zone:
+                v["zoneKey"] = units_to_zone[v["unitName"]]
+                if v["zoneKey"] == "DK-DK1":
+                    data.append(v)
+    return data
+
+
+def streaming_fetch(responses: dict) -> list:
+    ENTSOE.UNIT_TABLE_CACHE.clear()
+    with patch.object(
+        ENTSOE,
+        "query_production_per_units",
+        lambda psr_type, *args: responses[psr_type],
+    ):
+        return ENTSOE.fetch_production_per_units("DK-DK1", MagicMock())
+
+
+def main():
+    responses = {
+        psr_type: unit_response(psr_type) for psr_type in ENTSOE.ENTSOE_PARAMETER_DESC
+    }
+    units_to_zone = {
+        f"Unit {psr_type} {unit}": "DK-DK1"
+        for psr_type in ENTSOE.ENTSOE_PARAMETER_DESC
+        for unit in range(UNITS_PER_TYPE)
+    }
+    with patch.dict(ENTSOE.ENTSOE_UNITS_TO_ZONE, units_to_zone):
+        # memory first, as memory freed by Python isn't handed back to the
+        # system and would be reused by the following calls
+        report_memory(
+            "DK-DK1 streaming unit table peak memory",
+            lambda: streaming_fetch(responses),
+        )
+        report_memory(
+            "DK-DK1 BeautifulSoup dict peak memory",
+            lambda: legacy_fetch(responses, units_to_zone),
+        )
+        assert legacy_fetch(responses, units_to_zone) == sorted(
+            streaming_fetch(responses), key=lambda v: v["unitKey"]
+        )
+        report(
+            "DK-DK1 BeautifulSoup dict",
+            lambda: legacy_fetch(responses, units_to_zone),
+            number=1,
+        )
+        report(
+            "DK-DK1 streaming unit table", lambda: streaming_fetch(responses), number=1
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Compares fetching every AUS zone and interconnector one by one with a single
+network-level fetch, on the recorded payload stretched to one week of data.
+"""
+
+import json
+import logging
+
+import arrow
+
+from parsers import OPENNEM
+from parsers.test.benchmarks import mock_session, report
+
+WEEK = 7 * 24 * 12  # 5 minutes steps
+
+
+def load_week_payload() -> str:
+    with open("parsers/test/mocks/OPENNEM_latest.json") as f:
+        payload = json.load(f)
+    for dataset in payload["data"]:
+        history = dataset["history"]
+        step = 6 if history["interval"] == "30m" else 1
+        data = history["data"]
+        history["data"] = (data * (WEEK // len(data) + 1))[: WEEK // step]
+        history["last"] = (
+            arrow.get(history["start"])
+            .shift(minutes=5 * step * (len(history["data"]) - 1))
+            .isoformat()
+        )
+    return json.dumps(payload)
+
+
+def fetch_per_zone(session):
+    for zone_key in OPENNEM.ZONE_KEY_TO_REGION:
+        OPENNEM.fetch_production(zone_key, session=session)
+        OPENNEM.fetch_price(zone_key, session=session)
+    for key in OPENNEM.EXCHANGE_MAPPING_DICTIONARY:
+        OPENNEM.fetch_exchange(*key.split("->"), session=session)
+
+
+def main():
+    logging.disable(logging.WARNING)
+    session = mock_session(load_week_payload())
+    per_zone = report(
+        "per zone (production, price, exchange)",
+        lambda: fetch_per_zone(session),
+        number=1,
+    )
+    network = report(
+        "network-level fetch", lambda: OPENNEM.fetch_network(session=session), number=1
+    )
+    print(f"speedup: {per_zone / network:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
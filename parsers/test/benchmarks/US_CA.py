@@ -0,0 +1,34 @@
+"""
+Times decoding the recorded CAISO fuel source CSV and DailyRenewablesWatch
+report into production and exchange events.
+"""
+
+import logging
+from datetime import datetime
+
+from parsers import US_CA
+from parsers.test.benchmarks import mock_session, report
+
+
+def main():
+    logging.disable(logging.WARNING)
+    with open("parsers/test/mocks/US_CA_fuelsource.csv") as f:
+        fuel_source = mock_session(f.read())
+    with open("parsers/test/mocks/US_CA_DailyRenewablesWatch.txt") as f:
+        renewables_watch = mock_session(f.read())
+
+    report("live production", lambda: US_CA.fetch_production(session=fuel_source))
+    report(
+        "live exchange",
+        lambda: US_CA.fetch_exchange("US", "US-CA", session=fuel_source),
+    )
+    report(
+        "historical production and exchange",
+        lambda: US_CA.fetch_historical_data(
+            datetime(2020, 3, 1, 12), session=renewables_watch
+        ),
+    )
+
+
+if __name__ == "__main__":
+    main()
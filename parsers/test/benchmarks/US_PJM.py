@@ -0,0 +1,56 @@
+"""
+Times extracting the generation mix from the recorded PJM markets and
+operations page, by parsing the whole page with BeautifulSoup and decoding the
+chart series with demjson, as the parser used to, against the pre-scan and the
+JavaScript literal decoder.
+"""
+
+import re
+
+from bs4 import BeautifulSoup
+
+from parsers import US_PJM
+from parsers.lib import js_literal
+from parsers.test.benchmarks import report
+
+
+def legacy_extract(page: str) -> list:
+    import demjson3
+
+    soup = BeautifulSoup(page, "html.parser")
+    soup.find("div", id="asOfDate").text
+    script = soup.find("div", id="rtschartallfuelspjmGenFuelM_container")
+    series = re.search(r"series: \[(.*)\]", str(script.next_sibling)).group(1)
+    return demjson3.decode(series)["data"]
+
+
+def extract(page: str) -> list:
+    US_PJM.find_element_text(page, "asOfDate")
+    script = US_PJM.find_script_after(page, "rtschartallfuelspjmGenFuelM_container")
+    start = US_PJM.SERIES_PATTERN.search(script).end() - 1
+    return js_literal.raw_decode(script, start)[0][0]["data"]
+
+
+def main():
+    with open("parsers/test/mocks/US_PJM_markets_and_operations.html") as f:
+        page = f.read()
+    with open("parsers/test/mocks/US_PJM_InterfaceChart.html") as f:
+        load = re.search(r"var load = (\[(.*)\])", f.read()).group(1)
+
+    try:
+        import demjson3
+    except ImportError:
+        demjson3 = None
+
+    if demjson3 is not None:
+        report(
+            "generation mix, BeautifulSoup and demjson", lambda: legacy_extract(page)
+        )
+    report("generation mix, pre-scan and js_literal", lambda: extract(page))
+    if demjson3 is not None:
+        report("interface load, demjson", lambda: demjson3.decode(load))
+    report("interface load, js_literal", lambda: js_literal.decode(load))
+
+
+if __name__ == "__main__":
+    main()
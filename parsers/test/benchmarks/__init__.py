@@ -0,0 +1,55 @@
+"""
+Micro-benchmarks for parser hot paths, run against recorded payloads in
+`parsers/test/mocks`. They are not collected by pytest and are run as modules,
+e.g. `poetry run python -m parsers.test.benchmarks.OPENNEM`.
+"""
+
+import ctypes
+import gc
+import json
+import timeit
+from typing import Callable
+from unittest.mock import MagicMock
+
+
+def mock_session(text: str) -> MagicMock:
+    """Returns a session whose responses decode `text` on every request."""
+    session = MagicMock()
+    session.get.return_value.text = text
+    session.get.return_value.json.side_effect = lambda: json.loads(text)
+    return session
+
+
+def report(name: str, func: Callable, number: int = 5, repeat: int = 3) -> float:
+    """Prints and returns the best time per call of `func`, in seconds."""
+    best = min(timeit.repeat(func, number=number, repeat=repeat)) / number
+    print(f"{name:<50} {best * 1000:>10.2f} ms")
+    return best
+
+
+def read_status(field: str) -> int:
+    """Returns a field of /proc/self/status, in kB."""
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1])
+    raise KeyError(field)
+
+
+def report_memory(name: str, func: Callable) -> int:
+    """
+    Prints and returns how much a call raises the resident memory of the
+    process at its peak, in kB. Unlike tracemalloc, this also sees memory
+    allocated by C libraries (PIL, OpenCV, openpyxl's XML parser). Linux
+    (glibc) only: the peak is reset through /proc.
+    """
+    gc.collect()
+    # hand the memory freed by earlier calls back to the system
+    ctypes.CDLL("libc.so.6").malloc_trim(0)
+    with open("/proc/self/clear_refs", "w") as f:
+        f.write("5")
+    before = read_status("VmRSS")
+    func()
+    peak = read_status("VmHWM") - before
+    print(f"{name:<50} {peak / 1024:>10.2f} MiB")
+    return peak
@@ -0,0 +1,59 @@
+"""
+Times reading the recorded BD daily report and GE diagram workbooks with
+`pandas.read_excel` once per data type, as the parsers used to, against the
+shared Excel reader, cold (a new workbook) and warm (the same workbook asked
+for again), and reports their peak memory.
+"""
+
+from io import BytesIO
+
+import pandas as pd
+
+from parsers.lib.excel import ExcelReader
+from parsers.test.benchmarks import report, report_memory
+
+BD_SHEETS = {"YesterdayGen": {"skiprows": [0, 1, 3]}}
+GE_SHEETS = {0: {"header": 2, "index_col": 1, "nrows": 6}}
+
+
+def legacy_bd(content: bytes) -> None:
+    # production and exchanges each read the workbook
+    for _ in range(2):
+        pd.read_excel(BytesIO(content), sheet_name="YesterdayGen", skiprows=[0, 1, 3])
+
+
+def reader_bd(content: bytes, reader: ExcelReader) -> None:
+    for _ in range(2):
+        reader.read(content, BD_SHEETS)
+
+
+def legacy_ge(content: bytes) -> None:
+    pd.read_excel(BytesIO(content), header=2, index_col=1)
+
+
+def reader_ge(content: bytes, reader: ExcelReader) -> None:
+    reader.read(content, GE_SHEETS)
+
+
+def main():
+    with open("parsers/test/mocks/BD_daily_report.xlsx", "rb") as f:
+        bd = f.read()
+    with open("parsers/test/mocks/GE_diagram.xlsx", "rb") as f:
+        ge = f.read()
+
+    for zone, content, legacy, read in [
+        ("BD", bd, legacy_bd, reader_bd),
+        ("GE", ge, legacy_ge, reader_ge),
+    ]:
+        warm_reader = ExcelReader()
+        report(f"{zone} read_excel", lambda: legacy(content))
+        report(f"{zone} reader, cold", lambda: read(content, ExcelReader()))
+        report(f"{zone} reader, warm", lambda: read(content, warm_reader))
+        report_memory(f"{zone} read_excel peak memory", lambda: legacy(content))
+        report_memory(
+            f"{zone} reader peak memory", lambda: read(content, ExcelReader())
+        )
+
+
+if __name__ == "__main__":
+    main()
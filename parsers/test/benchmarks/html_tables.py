@@ -0,0 +1,109 @@
+"""
+Times reading the tables of the recorded KR, IN_HP and PA pages and the spans
+of the IN_KA page by walking a BeautifulSoup tree and converting each cell, as
+the parsers used to, against the lxml table extraction of `html_tables`.
+"""
+
+import re
+
+import arrow
+from bs4 import BeautifulSoup
+
+from parsers import IN_HP, KR, PA
+from parsers.lib.html_tables import element_texts, parse_html, read_table
+from parsers.test.benchmarks import report
+
+
+def soup_kr(content: bytes) -> list:
+    rows = []
+    for row in BeautifulSoup(content, "html.parser").find_all("tr")[1:]:
+        cells = row.find_all("td")
+        date = [value[:-1] for value in cells[0].text.split(" ")]
+        dt = arrow.get(
+            "-".join(date[:3]) + "T" + ":".join(date[3:]) + ":00",
+            "YYYY-MM-DDTHH:mm:ss",
+            tzinfo=KR.TIMEZONE,
+        ).datetime
+        rows.append((dt, [int("".join(cell.text.split(","))) for cell in cells[1:]]))
+    return rows
+
+
+def soup_in_hp(content: bytes) -> list:
+    soup = BeautifulSoup(content, "html.parser")
+    values = []
+    for container in ["table_5", "table_4"]:
+        for row in soup.find("div", class_=container).find("tbody").find_all("tr"):
+            cells = row.find_all("td")
+            if cells and not cells[0].has_attr("class"):
+                del cells[0]
+            values.append([cell.text for cell in cells])
+    return values
+
+
+def soup_pa(content: bytes) -> list:
+    soup = BeautifulSoup(content, "html.parser")
+    thermal_h3 = soup.find("h3", string=re.compile(r"\s*Térmicas\s*"))
+    tables = thermal_h3.find_next_sibling().find_all(
+        "table", {"class": "table table-hover table-striped table-sm sitr-gen-group"}
+    )
+    return [
+        (cells[0].string, float(cells[1].string))
+        for table in tables
+        for cells in (row.find_all("td") for row in table.find_all("tr"))
+    ]
+
+
+def soup_in_ka(content: bytes) -> list:
+    soup = BeautifulSoup(content, "html.parser")
+    return [
+        float(soup.find("span", {"id": span_id}).text)
+        for span_id in ["lblrtptot", "lblbtptot", "ytptot", "lblshvytot", "lblcgs"]
+    ]
+
+
+def lxml_in_ka(content: bytes) -> list:
+    spans = element_texts(parse_html(content), "span")
+    return [
+        float(spans[span_id])
+        for span_id in ["lblrtptot", "lblbtptot", "ytptot", "lblshvytot", "lblcgs"]
+    ]
+
+
+def lxml_in_hp(content: bytes) -> list:
+    document = parse_html(content)
+    return [
+        read_table(document, IN_HP.STATE_TABLE),
+        read_table(document, IN_HP.ISGS_TABLE),
+    ]
+
+
+def main():
+    pages = {}
+    for name in ["KR_powerSource", "IN_HP", "PA_nominal_generation", "IN_KA_StateGen"]:
+        with open(f"parsers/test/mocks/{name}.html", "rb") as f:
+            pages[name] = f.read()
+
+    for zone, page, soup, tables in [
+        (
+            "KR",
+            pages["KR_powerSource"],
+            soup_kr,
+            lambda content: read_table(
+                parse_html(content), KR.LONG_TERM_PRODUCTION_TABLE
+            ),
+        ),
+        ("IN_HP", pages["IN_HP"], soup_in_hp, lxml_in_hp),
+        (
+            "PA",
+            pages["PA_nominal_generation"],
+            soup_pa,
+            lambda content: read_table(parse_html(content), PA.THERMAL_UNITS_TABLE),
+        ),
+        ("IN_KA", pages["IN_KA_StateGen"], soup_in_ka, lxml_in_ka),
+    ]:
+        report(f"{zone} BeautifulSoup walk", lambda: soup(page))
+        report(f"{zone} html_tables", lambda: tables(page))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Compares the image preprocessing of the screenshot parsers (AX, IN_MH and SG)
+through the shared NumPy pipeline with the previous PIL round trips, in latency
+and peak memory. OCR itself is left out, the images handed to tesseract are
+the same. AX and IN_MH images are synthesized, SG uses the recorded solar map.
+Also times a poll of an unchanged image through the screenshot cache.
+"""
+
+from io import BytesIO
+
+import cv2
+import numpy as np
+from PIL import Image, ImageOps
+
+from parsers import AX, IN_MH, AX_data
+from parsers.lib.images import (
+    ScreenshotCache,
+    decode_image,
+    invert,
+    region,
+    relative_box,
+    to_gray,
+)
+from parsers.test.benchmarks import report, report_memory
+
+AX_READINGS = [(80, 130, 443), (780, 825, 43), (760, 815, 328), (650, 700, 576)]
+SG_BOXES = [(0.65, 0.74, 0.93, 0.80), (0.75, 0.87, 0.93, 0.92)]
+AX_MASKS = [
+    AX_data.Minus,
+    AX_data.Dot,
+    AX_data.Zero,
+    AX_data.One,
+    AX_data.Two,
+    AX_data.Three,
+    AX_data.Four,
+    AX_data.Five,
+    AX_data.Six,
+    AX_data.Seven,
+    AX_data.Eight,
+    AX_data.Nine,
+]
+
+
+def encode_png(image: np.ndarray) -> bytes:
+    buffer = BytesIO()
+    Image.fromarray(image).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def ax_image() -> bytes:
+    image = np.full((620, 900, 3), 255, dtype=np.uint8)
+    for x_start, _, y in AX_READINGS:
+        x = x_start + 2
+        for symbol in "-12.5":
+            glyph = AX.GLYPHS[AX.SYMBOLS.index(symbol)]
+            image[y : y + 9, x : x + 6][glyph] = (0, 0, 255)
+            x += 6
+    return encode_png(image)
+
+
+def legacy_ax(content: bytes) -> list:
+    data = np.array(Image.open(BytesIO(content)))
+    red, green, blue = data.T
+    blue_areas = (red == 0) & (green == 0) & (blue == 255)
+    data[~blue_areas.T] = (255, 255, 255)
+    data[blue_areas.T] = (0, 0, 0)
+    im = Image.fromarray(data)
+    values = []
+    for x_start, x_end, y in AX_READINGS:
+        text = []
+        for x in range(x_start, x_end - 6):
+            for symbol, mask in zip(AX.SYMBOLS, AX_MASKS):
+                if im.crop((x, y, x + 6, y + 9)) == mask:
+                    text.append(symbol)
+        values.append(float("".join(text)))
+    return values
+
+
+def pipeline_ax(content: bytes) -> list:
+    data = decode_image(content)
+    parser = AX.extract_data()
+    return [parser._read_number(data, *reading) for reading in AX_READINGS]
+
+
+def legacy_in_mh(content: bytes) -> np.ndarray:
+    image = Image.open(BytesIO(content))
+    imgs = []
+    for loc in IN_MH.locations.values():
+        img = cv2.cvtColor(np.array(image.crop(loc["value"])), cv2.COLOR_RGB2GRAY)
+        img = cv2.threshold(img, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)[1]
+        imgs.append(ImageOps.invert(Image.fromarray(img)))
+    return np.asarray(Image.fromarray(np.hstack([np.asarray(i) for i in imgs])))
+
+
+def pipeline_in_mh(content: bytes) -> np.ndarray:
+    return IN_MH.read_values(decode_image(content))
+
+
+def legacy_sg(content: bytes) -> list:
+    image = Image.open(BytesIO(content))
+    w, h = image.size
+    processed = []
+    for left, top, right, bottom in SG_BOXES:
+        img = image.crop((int(w * left), int(h * top), int(w * right), int(h * bottom)))
+        img = ImageOps.expand(ImageOps.invert(img).convert("L"), border=2)
+        processed.append(np.asarray(img))
+    return processed
+
+
+def pipeline_sg(content: bytes) -> list:
+    image = decode_image(content)
+    return [
+        np.pad(to_gray(invert(region(image, relative_box(image, *box)))), 2)
+        for box in SG_BOXES
+    ]
+
+
+def main():
+    rng = np.random.default_rng(0)
+    with open("parsers/test/mocks/SG_ema_gov_sg_solar_map_nonzero.png", "rb") as f:
+        sg = f.read()
+    in_mh = encode_png(rng.integers(0, 256, (1200, 1700, 3), dtype=np.uint8))
+    ax = ax_image()
+
+    for zone, content, legacy, pipeline in [
+        ("AX", ax, legacy_ax, pipeline_ax),
+        ("IN_MH", in_mh, legacy_in_mh, pipeline_in_mh),
+        ("SG", sg, legacy_sg, pipeline_sg),
+    ]:
+        report(f"{zone} legacy", lambda: legacy(content))
+        report(f"{zone} pipeline", lambda: pipeline(content))
+        report_memory(f"{zone} legacy peak memory", lambda: legacy(content))
+        report_memory(f"{zone} pipeline peak memory", lambda: pipeline(content))
+
+    # polls of an unchanged image are served from the screenshot cache
+    screenshots = ScreenshotCache()
+    report("AX unchanged poll", lambda: screenshots.read("AX", ax, pipeline_ax))
+
+
+if __name__ == "__main__":
+    main()
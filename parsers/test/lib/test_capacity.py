@@ -0,0 +1,58 @@
+import unittest
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest.mock import MagicMock
+
+from parsers.lib.capacity import CapacityStore
+
+
+class TestCapacityStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = TemporaryDirectory()
+        self.root = Path(self.tmp_dir.name)
+        self.fetch = MagicMock(return_value={2018: 100.0, 2020: 200.0})
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_capacity_at_is_as_of(self):
+        store = CapacityStore(self.root)
+        datetimes = [
+            datetime(2017, 6, 1, tzinfo=timezone.utc),
+            datetime(2018, 1, 1, tzinfo=timezone.utc),
+            datetime(2019, 12, 31, tzinfo=timezone.utc),
+            datetime(2022, 6, 1, tzinfo=timezone.utc),
+        ]
+        capacities = store.capacity_at("NL", "solar", datetimes, self.fetch)
+        # Years before the first stored one fall back to the zone config
+        self.assertEqual(capacities.tolist(), [14300, 100.0, 100.0, 200.0])
+
+    def test_min_year(self):
+        store = CapacityStore(self.root)
+        capacities = store.capacity_at(
+            "NL", "wind", [datetime(2019, 1, 1)], self.fetch, min_year=2019
+        )
+        self.assertEqual(capacities.tolist(), [7801])
+
+    def test_capacities_are_persisted(self):
+        CapacityStore(self.root).get("NL", "solar", self.fetch)
+        self.assertEqual(self.fetch.call_count, 1)
+
+        # A new store reads the persisted capacities instead of fetching them
+        capacities = CapacityStore(self.root).get("NL", "solar", self.fetch)
+        self.assertEqual(self.fetch.call_count, 1)
+        self.assertEqual(capacities, {2018: 100.0, 2020: 200.0})
+
+    def test_stale_capacities_are_kept_when_refresh_fails(self):
+        CapacityStore(self.root).get("NL", "solar", self.fetch)
+        store = CapacityStore(self.root, refresh_interval=timedelta(0))
+        self.fetch.side_effect = ValueError("unavailable")
+        capacities = store.get("NL", "solar", self.fetch)
+        self.assertEqual(self.fetch.call_count, 2)
+        self.assertEqual(capacities, {2018: 100.0, 2020: 200.0})
+
+    def test_no_series(self):
+        store = CapacityStore(self.root)
+        capacities = store.capacity_at("NL", "solar", [datetime(2022, 1, 1)])
+        self.assertEqual(capacities.tolist(), [14300])
@@ -0,0 +1,61 @@
+import unittest
+
+from pkg_resources import resource_string
+from requests import Session
+from requests_mock import ANY, Adapter
+
+from parsers.lib.excel import ExcelReader
+
+URL = "https://example.com/report.xlsx"
+
+
+class TestExcelReader(unittest.TestCase):
+    def setUp(self):
+        self.content = resource_string("parsers.test.mocks", "BD_daily_report.xlsx")
+        self.session = Session()
+        self.adapter = Adapter()
+        self.session.mount("https://", self.adapter)
+        self.adapter.register_uri(ANY, ANY, content=self.content)
+
+    def test_reads_requested_sheets(self):
+        sheets = ExcelReader().read(
+            self.content,
+            {"YesterdayGen": {"skiprows": [0, 1, 3]}, 0: {"usecols": "A:C"}},
+        )
+        self.assertEqual(list(sheets), ["YesterdayGen", 0])
+        self.assertEqual(sheets["YesterdayGen"].shape, (26, 14))
+        self.assertEqual(sheets["YesterdayGen"].iloc[23, 0], "24:00")
+        self.assertEqual(sheets[0].shape[1], 3)
+
+    def test_sheets_are_parsed_once(self):
+        reader = ExcelReader()
+        sheets = {"YesterdayGen": {"skiprows": [0, 1, 3]}}
+        first = reader.read(self.content, sheets)["YesterdayGen"]
+        first.iloc[0, 1] = -1
+        second = reader.read(self.content, sheets)["YesterdayGen"]
+        # cached frames are handed out as copies
+        self.assertEqual(second.iloc[0, 1], 15000)
+        self.assertEqual(len(reader._sheets), 1)
+        # other options are another entry
+        reader.read(self.content, {"YesterdayGen": {"skiprows": [0, 1]}})
+        self.assertEqual(len(reader._sheets), 2)
+
+    def test_final_workbooks_are_downloaded_once(self):
+        reader = ExcelReader()
+        sheets = {"YesterdayGen": {"skiprows": [0, 1, 3]}}
+        reader.fetch(URL, sheets, self.session, final=True)
+        reader.fetch(URL, {"Summary": {}}, self.session, final=True)
+        self.assertEqual(len(self.adapter.request_history), 1)
+        reader.fetch(URL, sheets, self.session, params={"day": 2}, final=True)
+        reader.fetch(URL, sheets, self.session)
+        self.assertEqual(len(self.adapter.request_history), 3)
+
+    def test_reads_xls_workbooks(self):
+        content = resource_string("parsers.test.mocks", "excel_report.xls")
+        sheets = ExcelReader().read(content, {"Exchanges": {}, 0: {"nrows": 1}})
+        self.assertEqual(sheets["Exchanges"]["net"].tolist(), [-50, 40])
+        self.assertEqual(sheets[0].values.tolist(), [[1, 1200, 300]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+
+import numpy as np
+from pkg_resources import resource_string
+
+from parsers.lib.html_tables import (
+    Column,
+    TableSpec,
+    element_texts,
+    parse_html,
+    read_table,
+    read_tables,
+)
+
+PAGE = """
+<html><body>
+<p>As of <span id="updated">2022-03-14 10:05</span></p>
+<table id="units">
+  <tr><th>Unit</th><th>Output</th><th>Since</th></tr>
+  <tr><td>A 1</td><td><span style="color:red">1,234.5</span></td><td>14/03/2022 09:00</td></tr>
+  <tr><td>B 2</td><td>n/a</td><td>not a date</td></tr>
+  <tr><td>C 3</td></tr>
+  <tr><td>Total</td><td>1,234.5</td><td></td></tr>
+</table>
+</body></html>
+"""
+
+UNITS = TableSpec(
+    rows="//table[@id='units']//tr",
+    columns=[
+        Column("unit", 0),
+        Column("output", 1, "number"),
+        Column("since", 2, "datetime", "%d/%m/%Y %H:%M"),
+        Column("colour", "td[2]/span/@style"),
+    ],
+    skip_head=1,
+    skip_tail=1,
+    tz="Asia/Seoul",
+)
+
+
+class TestReadTable(unittest.TestCase):
+    def test_columns(self):
+        table = read_table(parse_html(PAGE), UNITS)
+        self.assertEqual(table["unit"].tolist(), ["A 1", "B 2", "C 3"])
+        # thousands separators are removed, invalid and missing cells are NaN
+        np.testing.assert_array_equal(table["output"], [1234.5, np.nan, np.nan])
+        self.assertEqual(table["since"][0].isoformat(), "2022-03-14T09:00:00+09:00")
+        self.assertTrue(table["since"][1:].isna().all())
+        self.assertEqual(table["colour"].tolist(), ["color:red", None, None])
+
+    def test_read_tables(self):
+        tables = read_tables(
+            PAGE.encode(),
+            {
+                "units": UNITS,
+                "none": TableSpec(
+                    rows="//table[@id='missing']//tr", columns=UNITS.columns
+                ),
+            },
+        )
+        self.assertEqual(len(tables["units"]), 3)
+        self.assertTrue(tables["none"].empty)
+        self.assertEqual(
+            list(tables["none"].columns), ["unit", "output", "since", "colour"]
+        )
+
+    def test_element_texts(self):
+        document = parse_html(PAGE)
+        self.assertEqual(
+            element_texts(document, "span"), {"updated": "2022-03-14 10:05"}
+        )
+        self.assertEqual(set(element_texts(document)), {"updated", "units"})
+
+    def test_recorded_page(self):
+        document = parse_html(resource_string("parsers.test.mocks", "IN_HP.html"))
+        table = read_table(
+            document,
+            TableSpec(
+                rows="//div[contains(@class, 'table_5')]/descendant::tbody[1]//tr",
+                columns=[Column("plant", 0), Column("generation", 1, "number")],
+            ),
+        )
+        self.assertEqual(table["plant"][0], "BASPA(3X100MW)")
+        self.assertEqual(table["generation"][0], 109.35)
+        self.assertEqual(table["plant"].iloc[-1], "Total")
+
+
+if __name__ == "__main__":
+    unittest.main()
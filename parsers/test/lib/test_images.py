@@ -0,0 +1,117 @@
+import unittest
+from io import BytesIO
+
+import numpy as np
+from PIL import Image
+
+from parsers.lib.images import (
+    ScreenshotCache,
+    colour_mask,
+    decode_image,
+    invert,
+    match_glyphs,
+    otsu_threshold,
+    region,
+    region_hash,
+    relative_box,
+    to_gray,
+)
+
+
+def encode_png(image: np.ndarray) -> bytes:
+    buffer = BytesIO()
+    Image.fromarray(image).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class TestImages(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.image = rng.integers(0, 256, (40, 60, 3), dtype=np.uint8)
+
+    def test_decode_image(self):
+        image = decode_image(encode_png(self.image))
+        np.testing.assert_array_equal(image, self.image)
+        self.assertTrue(image.flags.writeable)
+
+    def test_regions_are_views(self):
+        box = relative_box(self.image, 0.5, 0.25, 1, 0.5)
+        self.assertEqual(box, (30, 10, 60, 20))
+        roi = region(self.image, box)
+        self.assertEqual(roi.shape, (10, 30, 3))
+        self.assertTrue(np.shares_memory(roi, self.image))
+
+    def test_invert_in_place(self):
+        expected = np.asarray(Image.fromarray(self.image[:10]).point(lambda v: 255 - v))
+        roi = region(self.image, (0, 0, 60, 10))
+        invert(roi)
+        np.testing.assert_array_equal(self.image[:10], expected)
+
+    def test_to_gray_matches_pil(self):
+        expected = np.asarray(Image.fromarray(self.image).convert("L"))
+        np.testing.assert_array_equal(to_gray(self.image), expected)
+
+    def test_otsu_threshold(self):
+        gray = np.array([[10, 20, 200, 220]], dtype=np.uint8)
+        np.testing.assert_array_equal(otsu_threshold(gray.copy()), [[0, 0, 255, 255]])
+        np.testing.assert_array_equal(
+            otsu_threshold(gray, inverted=True), [[255, 255, 0, 0]]
+        )
+        # contiguous images are thresholded in place
+        np.testing.assert_array_equal(gray, [[255, 255, 0, 0]])
+
+    def test_match_glyphs(self):
+        one = np.array([[0, 1], [0, 1], [0, 1]], dtype=bool)
+        dash = np.array([[0, 0], [1, 1], [0, 0]], dtype=bool)
+        image = np.full((3, 8, 3), 255, dtype=np.uint8)
+        image[:, 1:3][dash] = (0, 0, 255)
+        image[:, 4:6][one] = (0, 0, 255)
+        # other colours are ignored
+        image[:, 6:8][one] = (0, 255, 0)
+        mask = colour_mask(image, (0, 0, 255))
+        self.assertEqual(match_glyphs(mask, np.stack([dash, one]), ["-", "1"]), "-1")
+        self.assertEqual(match_glyphs(mask[:, :1], np.stack([dash, one]), "-1"), "")
+
+
+class TestScreenshotCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = ScreenshotCache()
+        self.image = np.full((10, 20), 255, dtype=np.uint8)
+        self.image[2:8, 5:7] = 0
+        self.calls = []
+
+    def read(self, value):
+        self.calls.append(value)
+        return len(self.calls)
+
+    def test_same_file_is_read_once(self):
+        self.assertEqual(self.cache.read("map", b"a", self.read), 1)
+        self.assertEqual(self.cache.read("map", b"a", self.read), 1)
+        self.assertEqual(self.cache.read("map", b"b", self.read), 2)
+        # files are remembered per key
+        self.assertEqual(self.cache.read("other", b"b", self.read), 3)
+        self.assertEqual(self.calls, [b"a", b"b", b"b"])
+
+    def test_region_hash_ignores_noise(self):
+        noisy = self.image.copy()
+        noisy[noisy == 255] = 200
+        noisy[noisy == 0] = 40
+        self.assertEqual(region_hash(noisy), region_hash(self.image))
+        self.assertEqual(region_hash(self.image == 255), region_hash(self.image))
+        changed = self.image.copy()
+        changed[2, 8] = 0
+        self.assertNotEqual(region_hash(changed), region_hash(self.image))
+        self.assertNotEqual(region_hash(self.image.T), region_hash(self.image))
+
+    def test_unchanged_region_is_read_once(self):
+        self.assertEqual(self.cache.read_region("value", self.image, self.read), 1)
+        self.assertEqual(
+            self.cache.read_region("value", self.image // 2 + 100, self.read), 1
+        )
+        self.image[0, 0] = 0
+        self.assertEqual(self.cache.read_region("value", self.image, self.read), 2)
+        self.assertEqual(len(self.calls), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
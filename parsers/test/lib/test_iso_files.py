@@ -0,0 +1,72 @@
+import unittest
+from datetime import date
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest.mock import MagicMock
+
+from freezegun import freeze_time
+from requests import Session
+from requests_mock import ANY, Adapter
+
+from parsers.lib.iso_files import ISOFileFetcher, day_range
+
+URL = "http://iso.example.com/{}.csv"
+
+
+class TestISOFileFetcher(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = TemporaryDirectory()
+        self.root = Path(self.tmp_dir.name)
+        self.session = Session()
+        self.adapter = Adapter()
+        self.session.mount("http://", self.adapter)
+        self.adapter.register_uri(ANY, ANY, text="a,b\n1,2\n")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_final_files_are_cached_on_disk(self):
+        ISOFileFetcher("ISO", "UTC", root=self.root).get(
+            URL.format(1), self.session, final=True
+        )
+        content = ISOFileFetcher("ISO", "UTC", root=self.root).get(
+            URL.format(1), self.session, final=True
+        )
+        self.assertEqual(content, b"a,b\n1,2\n")
+        self.assertEqual(len(self.adapter.request_history), 1)
+
+    def test_cache_is_content_addressed(self):
+        fetcher = ISOFileFetcher("ISO", "UTC", root=self.root)
+        fetcher.get(URL.format(1), self.session, final=True)
+        fetcher.get(URL.format(2), self.session, final=True)
+        self.assertEqual(len(list(self.root.joinpath("objects").rglob("*"))), 2)
+        self.assertEqual(len(list(self.root.joinpath("refs", "ISO").iterdir())), 2)
+
+    def test_live_files_are_reused_within_ttl(self):
+        fetcher = ISOFileFetcher("ISO", "UTC", root=self.root)
+        fetcher.get(URL.format(1), self.session)
+        fetcher.get(URL.format(1), self.session)
+        self.assertEqual(len(self.adapter.request_history), 1)
+        self.assertFalse(self.root.joinpath("objects").exists())
+
+    def test_decode_once(self):
+        fetcher = ISOFileFetcher("ISO", "UTC", root=self.root)
+        decoder = MagicMock(return_value="decoded")
+        decoder.__qualname__ = "decoder"
+        self.assertEqual(fetcher.decode(b"content", decoder), "decoded")
+        self.assertEqual(fetcher.decode(b"content", decoder), "decoded")
+        decoder.assert_called_once_with(b"content")
+
+    @freeze_time("2022-03-05 12:00:00")
+    def test_get_days(self):
+        self.adapter.register_uri(ANY, URL.format("2022-03-02"), status_code=404)
+        fetcher = ISOFileFetcher("ISO", "UTC", root=self.root)
+        contents = fetcher.get_days(
+            URL.format, day_range(date(2022, 3, 1), date(2022, 3, 5)), self.session
+        )
+        self.assertEqual(
+            sorted(contents),
+            [date(2022, 3, 1), date(2022, 3, 3), date(2022, 3, 4), date(2022, 3, 5)],
+        )
+        # Today's file is still being updated, so it isn't cached on disk
+        self.assertEqual(len(list(self.root.joinpath("refs", "ISO").iterdir())), 3)
@@ -0,0 +1,97 @@
+import math
+import unittest
+
+from pkg_resources import resource_string
+
+from parsers import US_PJM
+from parsers.lib.js_literal import JSLiteralError, decode, raw_decode
+
+
+class TestDecode(unittest.TestCase):
+    def test_json(self):
+        self.assertEqual(
+            decode('{"a": [1, -2.5, 3e2, "x"], "b": {"c": null}, "d": true}'),
+            {"a": [1, -2.5, 300.0, "x"], "b": {"c": None}, "d": True},
+        )
+
+    def test_javascript_extensions(self):
+        value = decode(
+            """
+            // a comment
+            {name: 'Coal', $y: 0x1F, 'z': +.5, /* another */ 2: undefined,
+             list: [1, 2, 3,],}
+            """
+        )
+        self.assertEqual(
+            value, {"name": "Coal", "$y": 31, "z": 0.5, "2": None, "list": [1, 2, 3]}
+        )
+
+    def test_special_numbers(self):
+        value = decode("[NaN, Infinity, -Infinity]")
+        self.assertTrue(math.isnan(value[0]))
+        self.assertEqual(value[1:], [math.inf, -math.inf])
+
+    def test_escapes(self):
+        self.assertEqual(
+            decode(
+                r"""['it\'s', "a \"b\"\n", '\x41é😀', 'a\
+b', '\q']"""
+            ),
+            ["it's", 'a "b"\n', "Aé😀", "ab", "q"],
+        )
+
+    def test_errors(self):
+        for text in ["[1, 2", "{a 1}", "[1 2]", "[foo]", "[1] 2", "{'a': #}"]:
+            with self.subTest(text=text), self.assertRaises(JSLiteralError):
+                decode(text)
+
+    def test_errors_after_whitespace(self):
+        # skipping whitespace mustn't backtrack exponentially on errors
+        text = "[1,\n" + " " * 10000 + "// comment\n" + "\t" * 10000 + "@]"
+        with self.assertRaises(JSLiteralError):
+            decode(text)
+
+    def test_raw_decode(self):
+        text = "var load = [[1, 2], [3]]; var other = {a: 1};"
+        value, end = raw_decode(text, text.index("["))
+        self.assertEqual(value, [[1, 2], [3]])
+        self.assertEqual(text[end:], "; var other = {a: 1};")
+        self.assertEqual(raw_decode("'a' + 'b'"), ("a", 3))
+
+
+class TestRecordedPages(unittest.TestCase):
+    def test_generation_mix(self):
+        page = resource_string(
+            "parsers.test.mocks", "US_PJM_markets_and_operations.html"
+        ).decode()
+        script = US_PJM.find_script_after(page, "rtschartallfuelspjmGenFuelM_container")
+        start = US_PJM.SERIES_PATTERN.search(script).end() - 1
+        series, _ = raw_decode(script, start)
+        self.assertEqual(len(series), 1)
+        self.assertEqual(series[0]["type"], "pie")
+        self.assertEqual(
+            series[0]["data"][0],
+            {
+                "name": "Coal",
+                "y": 29011.4,
+                "color": "#5f5f5f",
+                "dataLabels": {"enabled": True},
+            },
+        )
+        self.assertEqual(
+            [point["name"] for point in series[0]["data"]], list(US_PJM.mapping)
+        )
+
+    def test_element_text(self):
+        page = resource_string(
+            "parsers.test.mocks", "US_PJM_markets_and_operations.html"
+        ).decode()
+        self.assertEqual(
+            US_PJM.find_element_text(page, "asOfDate"), "Data as of 3:05 p.m. EPT"
+        )
+        self.assertIsNone(US_PJM.find_element_text(page, "missing"))
+        self.assertIsNone(US_PJM.find_script_after(page, "missing"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import json
+import unittest
+from unittest.mock import MagicMock
+
+from parsers.lib import tracing, web
+
+
+class TestTracing(unittest.TestCase):
+    def setUp(self):
+        tracing.enable()
+        tracing.TRACER.clear()
+
+    def tearDown(self):
+        tracing.disable()
+        tracing.TRACER.clear()
+
+    def test_disabled(self):
+        tracing.disable()
+        with tracing.span("network", zone_key="FR"):
+            pass
+        self.assertEqual(tracing.TRACER.clear(), [])
+
+    def test_nested_spans(self):
+        session = MagicMock()
+        session.get.return_value.status_code = 200
+        session.get.return_value.text = "<html><td>1</td></html>"
+
+        def fetch_production(zone_key, session=None):
+            return web.get_response_soup(zone_key, "http://example.com", session)
+
+        parser = tracing.traced_parser(
+            fetch_production, zone_key="FR", data_type="production"
+        )
+        parser("FR", session=session)
+
+        spans = tracing.TRACER.clear()
+        self.assertEqual(
+            [span.path for span in spans],
+            [
+                ("parser", "network"),
+                ("parser", "decode"),
+                ("parser", "parse"),
+                ("parser",),
+            ],
+        )
+        self.assertTrue(all(span.zone_key == "FR" for span in spans))
+        self.assertTrue(all(span.data_type == "production" for span in spans))
+        parser_span = spans[-1]
+        self.assertAlmostEqual(
+            parser_span.duration,
+            parser_span.self_duration + sum(span.duration for span in spans[:-1]),
+        )
+
+    def test_exporters(self):
+        @tracing.traced("validation")
+        def validate():
+            pass
+
+        with tracing.span("parser", zone_key="FR", data_type="production"):
+            validate()
+            validate()
+        spans = tracing.TRACER.clear()
+
+        prometheus = tracing.to_prometheus(spans)
+        self.assertIn("# TYPE parser_phase_seconds summary", prometheus)
+        self.assertIn(
+            'parser_phase_seconds_count{zone="FR",data_type="production",phase="validation"} 2',
+            prometheus,
+        )
+
+        lines = tracing.to_jsonl(spans).splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(json.loads(lines[0])["path"], ["parser", "validation"])
+
+        folded = tracing.to_folded(spans).splitlines()
+        self.assertEqual(
+            [line.rsplit(" ", 1)[0] for line in folded],
+            ["FR;production;parser", "FR;production;parser;validation"],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
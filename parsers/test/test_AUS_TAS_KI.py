@@ -1,8 +1,13 @@
 #!/usr/bin/env python3
 
 import json
+import queue
 import unittest
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
 from unittest.mock import patch
+from urllib.parse import urlparse
 
 from pkg_resources import resource_string
 from requests import Session
@@ -44,5 +49,167 @@ class TestAusTasKi(unittest.TestCase):
     #     self.assertIsNotNone(data['production']['solar'])
 
 
+class FakeSignalRServer(ThreadingHTTPServer):
+    """
+    Local SignalR endpoint, speaking the server-sent events transport. Payloads
+    put with `push` are sent to the connected client, `drop` ends the current
+    connection and `refuse` makes the next connections fail.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, hub: str, method: str):
+        super().__init__(("127.0.0.1", 0), FakeSignalRHandler)
+        self.hub = hub
+        self.method = method
+        self.url = f"http://127.0.0.1:{self.server_port}/signalr"
+        self.negotiations = 0
+        self.refused = 0
+        self.messages: "queue.Queue" = queue.Queue()
+        Thread(
+            target=self.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        ).start()
+
+    def push(self, payload: dict) -> None:
+        self.messages.put({"M": [{"H": self.hub, "M": self.method, "A": [payload]}]})
+
+    def drop(self) -> None:
+        self.messages.put(None)
+
+    def refuse(self, connections: int) -> None:
+        self.refused = connections
+
+    def close(self) -> None:
+        self.drop()
+        self.shutdown()
+        self.server_close()
+
+
+class FakeSignalRHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, data: dict) -> None:
+        body = json.dumps(data).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        action = urlparse(self.path).path.rsplit("/", 1)[-1]
+        if action == "negotiate":
+            self.server.negotiations += 1
+            self.send_json(
+                {
+                    "ConnectionToken": "token",
+                    "ConnectionId": "id",
+                    "TryWebSockets": False,
+                }
+            )
+        elif action == "connect":
+            if self.server.refused > 0:
+                self.server.refused -= 1
+                self.send_error(503)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.end_headers()
+            # reconnect quickly if the stream ends
+            self.wfile.write(b"retry: 10\ndata: initialized\n\n")
+            self.wfile.flush()
+            while True:
+                try:
+                    message = self.server.messages.get(timeout=0.05)
+                except queue.Empty:
+                    # keep-alive, so that closing the client doesn't wait
+                    message = {}
+                if message is None:
+                    return
+                self.wfile.write(f"data: {json.dumps(message)}\n\n".encode())
+                self.wfile.flush()
+        else:
+            self.send_json({"Response": "started"})
+
+
+class TestHubSubscriber(unittest.TestCase):
+    def setUp(self):
+        self.server = FakeSignalRServer("TagHub", "Dashboard")
+        self.addCleanup(self.server.close)
+        with open("parsers/test/mocks/AUS_TAS_KI_payload1.json") as f:
+            self.payload = json.load(f)
+        patcher = patch.object(
+            ajenti, "CONNECTION_CHECK_INTERVAL", timedelta(milliseconds=10)
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def subscribe(self) -> ajenti.HubSubscriber:
+        subscriber = ajenti.HubSubscriber(
+            self.server.url,
+            "TagHub",
+            min_backoff=timedelta(milliseconds=10),
+            max_backoff=timedelta(milliseconds=40),
+        )
+        subscriber.subscribe("Dashboard")
+        subscriber.start()
+        self.addCleanup(subscriber.stop, 5)
+        return subscriber
+
+    def test_buffers_latest_payload(self):
+        subscriber = self.subscribe()
+        self.server.push({})
+        self.server.push(self.payload)
+        self.assertEqual(
+            subscriber.get("Dashboard", timeout=timedelta(seconds=5)), self.payload
+        )
+        # the buffered payload is returned without waiting
+        self.assertEqual(
+            subscriber.get("Dashboard", timeout=timedelta(0)), self.payload
+        )
+        self.assertEqual(subscriber.connections, 1)
+
+    def test_expired_payload(self):
+        subscriber = self.subscribe()
+        self.server.push(self.payload)
+        subscriber.get("Dashboard", timeout=timedelta(seconds=5))
+        self.assertEqual(
+            subscriber.get("Dashboard", max_age=timedelta(0), timeout=timedelta(0)), {}
+        )
+
+    def test_reconnects(self):
+        self.server.refuse(2)
+        subscriber = self.subscribe()
+        self.server.push(self.payload)
+        subscriber.get("Dashboard", timeout=timedelta(seconds=5))
+        self.assertEqual(self.server.negotiations, 3)
+
+        # the stream ends and the transport can't reopen it
+        self.server.refuse(1)
+        self.server.drop()
+        updated = dict(self.payload, events=1)
+        self.server.push(updated)
+        wait = timedelta(seconds=5)
+        while subscriber.get("Dashboard", timeout=wait) != updated:
+            pass
+        self.assertEqual(self.server.negotiations, 4)
+
+    def test_fetch_production(self):
+        self.server.push(self.payload)
+        with patch.object(ajenti, "SIGNALR_URL", self.server.url), patch.dict(
+            ajenti.SUBSCRIBERS, clear=True
+        ):
+            data = ajenti.extract_data().fetch_production("AUS-TAS-KI")
+            subscriber = ajenti.SUBSCRIBERS[(self.server.url, "TagHub")]
+            self.addCleanup(subscriber.stop, 5)
+            # later fetches use the same connection
+            ajenti.extract_data().fetch_production("AUS-TAS-KI")
+            self.assertIs(ajenti.get_subscriber(self.server.url, "TagHub"), subscriber)
+        self.assertEqual(data["production"]["wind"], 1.024)
+        self.assertEqual(data["storage"]["battery"], 0.149)
+        self.assertEqual(subscriber.connections, 1)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+from io import BytesIO
+from unittest.mock import patch
+
+import numpy as np
+from PIL import Image
+from requests import Session
+from requests_mock import Adapter
+
+from parsers import AX
+
+
+def draw(image: np.ndarray, text: str, x: int, y: int) -> None:
+    """Draws `text` in blue with the glyphs of the Kraftnät Åland image."""
+    for symbol in text:
+        glyph = AX.GLYPHS[AX.SYMBOLS.index(symbol)]
+        image[y : y + glyph.shape[0], x : x + glyph.shape[1]][glyph] = (0, 0, 255)
+        x += glyph.shape[1]
+
+
+class TestAX(unittest.TestCase):
+    def setUp(self):
+        image = np.full((620, 900, 3), 255, dtype=np.uint8)
+        # noise in other colours around the numbers is ignored
+        image[440:460, 60:140] = (0, 0, 200)
+        draw(image, "-12.5", 82, 443)
+        draw(image, "30.1", 790, 43)
+        draw(image, "0.0", 760, 328)
+        draw(image, "8.4", 655, 576)
+        draw(image, "1.2", 655, 588)
+        buffer = BytesIO()
+        Image.fromarray(image).save(buffer, format="PNG")
+
+        self.session = Session()
+        self.adapter = Adapter()
+        self.session.mount("http://", self.adapter)
+        self.adapter.register_uri("GET", AX.URL, content=buffer.getvalue())
+        patcher = patch.object(AX, "SCREENSHOTS", AX.ScreenshotCache())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_fetch_data(self):
+        data = AX.extract_data()._fetch_data(self.session)
+        self.assertEqual(data["SE3->AX"], -12.5)
+        self.assertEqual(data["FI->AX"], 30.1)
+        self.assertEqual(data["wind"], 8.4)
+        self.assertEqual(data["fossil"], 1.2)
+        self.assertEqual(data["production"], 9.6)
+        self.assertEqual(data["consumption"], 27.2)
+
+    def test_fetch_exchange(self):
+        exchange = AX.extract_data().fetch_exchange("AX", "SE", self.session)
+        self.assertEqual(exchange["netFlow"], 12.5)
+
+    def test_unchanged_image_is_decoded_once(self):
+        with patch("parsers.AX.decode_image", wraps=AX.decode_image) as decode:
+            first = AX.extract_data()._fetch_data(self.session)
+            second = AX.extract_data()._fetch_data(self.session)
+        self.assertEqual(decode.call_count, 1)
+        self.assertEqual(first["wind"], second["wind"])
+        self.assertEqual(len(self.adapter.request_history), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+from unittest.mock import patch
+
+from pkg_resources import resource_string
+from requests import Session
+from requests_mock import ANY, Adapter
+from testfixtures import LogCapture
+
+from parsers import BD
+from parsers.lib.excel import ExcelReader
+
+
+class TestBD(unittest.TestCase):
+    def setUp(self):
+        self.session = Session()
+        self.adapter = Adapter()
+        self.session.mount("https://", self.adapter)
+        self.adapter.register_uri(
+            ANY,
+            ANY,
+            content=resource_string("parsers.test.mocks", "BD_daily_report.xlsx"),
+        )
+        patcher = patch.object(BD, "EXCEL", ExcelReader())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_fetch_production(self):
+        with LogCapture("parsers.BD") as log:
+            data = BD.extract_data().fetch_production(
+                session=self.session, target_datetime="20190110"
+            )
+        # the fixture has the expected columns
+        log.check()
+        self.assertEqual(
+            self.adapter.last_request.url,
+            "https://pgcb.org.bd/PGCB/upload/Reports/Daily%20Report%2011-01-19.xlsm",
+        )
+        self.assertEqual(len(data), 24)
+        self.assertEqual(data[0]["datetime"].isoformat(), "2019-01-10T01:00:00+06:00")
+        self.assertEqual(
+            data[0]["production"],
+            {"coal": 1000, "hydro": 201, "solar": 0, "gas": 5002, "oil": 1902},
+        )
+        self.assertEqual(data[11]["production"]["solar"], 50)
+
+    def test_workbook_is_downloaded_once(self):
+        parser = BD.extract_data()
+        parser.fetch_production(session=self.session, target_datetime="20190110")
+        exchanges = parser.fetch_exchange(
+            "BD", "IN-NE", session=self.session, target_datetime="20190110"
+        )
+        self.assertEqual(len(self.adapter.request_history), 1)
+        self.assertEqual(exchanges[0]["netFlow"], -1050)
+
+
+if __name__ == "__main__":
+    unittest.main()
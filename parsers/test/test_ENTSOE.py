@@ -0,0 +1,302 @@
+import os
+import re
+import unittest
+from logging import WARNING
+from unittest.mock import patch
+
+import arrow
+from freezegun import freeze_time
+from pkg_resources import resource_string
+from requests import ConnectionError, Session
+from requests_mock import Adapter
+from testfixtures import LogCapture
+
+from parsers import ENTSOE
+from parsers.lib.exceptions import ParserException
+
+NO_MATCHING_DATA = """<?xml version="1.0" encoding="UTF-8"?>
+<Acknowledgement_MarketDocument xmlns="urn:iec62325.351:tc57wg16:451-1:acknowledgementdocument:7:0">
+    <Reason>
+        <code>999</code>
+        <text>No matching data found for Data item Aggregated Generation per Type</text>
+    </Reason>
+</Acknowledgement_MarketDocument>
+"""
+
+
+class TestIncrementalQueries(unittest.TestCase):
+    def setUp(self):
+        self.session = Session()
+        self.adapter = Adapter()
+        self.session.mount("https://", self.adapter)
+        for patcher in [
+            patch.object(ENTSOE, "SERIES_BUFFERS", {}),
+            patch.dict(os.environ, {"ENTSOE_TOKEN": "token"}),
+        ]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def register(self, filename: str):
+        self.adapter.register_uri(
+            "GET",
+            ENTSOE.ENTSOE_ENDPOINT,
+            content=resource_string("parsers.test.mocks", filename),
+        )
+
+    def production(self, data: list) -> dict:
+        return {
+            d["datetime"].strftime("%H:%M"): (
+                d["production"]["gas"],
+                d["production"]["solar"],
+                d["storage"]["hydro"],
+            )
+            for d in data
+        }
+
+    def test_first_poll(self):
+        self.register("ENTSOE_NL_production.xml")
+        with freeze_time("2022-03-15 12:10:00"):
+            data = ENTSOE.fetch_production("NL", self.session)
+        self.assertEqual(self.adapter.last_request.qs["periodstart"], ["202203131200"])
+        self.assertEqual(self.adapter.last_request.qs["periodend"], ["202203151200"])
+        self.assertEqual(len(data), 6)
+        self.assertEqual(data[0]["datetime"], arrow.get("2022-03-15T06:00Z").datetime)
+        self.assertEqual(self.production(data)["09:00"], (5300, 1500, 80))
+
+    def test_merges_new_points(self):
+        self.register("ENTSOE_NL_production.xml")
+        with freeze_time("2022-03-15 12:10:00"):
+            ENTSOE.fetch_production("NL", self.session)
+        self.register("ENTSOE_NL_production_update.xml")
+        with freeze_time("2022-03-15 13:10:00"):
+            data = ENTSOE.fetch_production("NL", self.session)
+        # storage lags, it was complete until 10:00
+        self.assertEqual(self.adapter.last_request.qs["periodstart"], ["202203150800"])
+        production = self.production(data)
+        self.assertEqual(list(production), [f"{h:02}:00" for h in range(6, 13)])
+        self.assertEqual(production["06:00"], (5000, 100, 50))
+        # revised points replace the buffered ones
+        self.assertEqual(production["11:00"], (5550, 2350, 100))
+        self.assertEqual(production["12:00"], (5600, 2400, None))
+
+        # storage is now complete until 12:00
+        with freeze_time("2022-03-15 14:10:00"):
+            ENTSOE.fetch_production("NL", self.session)
+        self.assertEqual(self.adapter.last_request.qs["periodstart"], ["202203151000"])
+
+    def test_series_no_longer_published(self):
+        self.register("ENTSOE_NL_production.xml")
+        with freeze_time("2022-03-15 12:10:00"):
+            ENTSOE.fetch_production("NL", self.session)
+        self.register("ENTSOE_NL_production_update.xml")
+        with freeze_time("2022-03-15 13:10:00"):
+            ENTSOE.fetch_production("NL", self.session)
+        # three hours later, without the storage series
+        xml_text = resource_string(
+            "parsers.test.mocks", "ENTSOE_NL_production_update.xml"
+        ).decode()
+        xml_text = re.sub(
+            r"<TimeSeries>((?!<TimeSeries>).)*?B10.*?</TimeSeries>",
+            "",
+            xml_text,
+            flags=re.DOTALL,
+        )
+        xml_text = xml_text.replace("T13:00Z", "T16:00Z").replace("T10:00Z", "T13:00Z")
+        self.adapter.register_uri("GET", ENTSOE.ENTSOE_ENDPOINT, text=xml_text)
+        with freeze_time("2022-03-15 16:10:00"):
+            ENTSOE.fetch_production("NL", self.session)
+        self.assertEqual(self.adapter.last_request.qs["periodstart"], ["202203151000"])
+        # storage stopped at 12:00, it no longer holds back the next poll
+        with freeze_time("2022-03-15 16:20:00"):
+            data = ENTSOE.fetch_production("NL", self.session)
+        self.assertEqual(self.adapter.last_request.qs["periodstart"], ["202203151400"])
+        self.assertEqual(self.production(data)["15:00"][2], None)
+
+    def test_nothing_new(self):
+        self.register("ENTSOE_NL_production.xml")
+        with freeze_time("2022-03-15 12:10:00"):
+            expected = ENTSOE.fetch_production("NL", self.session)
+        self.adapter.register_uri(
+            "GET", ENTSOE.ENTSOE_ENDPOINT, status_code=400, text=NO_MATCHING_DATA
+        )
+        with freeze_time("2022-03-15 12:20:00"):
+            data = ENTSOE.fetch_production("NL", self.session)
+        self.assertEqual(data, expected)
+
+        # without buffered data, there is no data
+        ENTSOE.SERIES_BUFFERS.clear()
+        with freeze_time("2022-03-15 12:20:00"), self.assertRaises(ParserException):
+            ENTSOE.fetch_production("NL", self.session)
+
+    def test_points_leave_the_window(self):
+        self.register("ENTSOE_NL_production.xml")
+        with freeze_time("2022-03-15 12:10:00"):
+            ENTSOE.fetch_production("NL", self.session)
+        self.register("ENTSOE_NL_production_update.xml")
+        with freeze_time("2022-03-17 09:30:00"):
+            data = ENTSOE.fetch_production("NL", self.session)
+        self.assertEqual(self.adapter.last_request.qs["periodstart"], ["202203151000"])
+        self.assertEqual(list(self.production(data)), ["10:00", "11:00", "12:00"])
+
+    def test_historical_queries(self):
+        self.register("ENTSOE_NL_production.xml")
+        target_datetime = arrow.get("2022-03-15T12:00Z").datetime
+        ENTSOE.fetch_production("NL", self.session, target_datetime)
+        self.assertEqual(self.adapter.last_request.qs["periodstart"], ["202203131200"])
+        self.assertEqual(ENTSOE.SERIES_BUFFERS, {})
+
+
+class TestProductionPerUnits(unittest.TestCase):
+    def setUp(self):
+        self.session = Session()
+        self.adapter = Adapter()
+        self.session.mount("https://", self.adapter)
+        self.adapter.register_uri("GET", ENTSOE.ENTSOE_ENDPOINT, text=self.respond)
+        self.failing = set()
+        for patcher in [
+            patch.object(ENTSOE, "UNIT_TABLE_CACHE", ENTSOE.OrderedDict()),
+            patch.dict(os.environ, {"ENTSOE_TOKEN": "token"}),
+        ]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def respond(self, request, context) -> str:
+        psr_type = request.qs["psrtype"][0].upper()
+        if psr_type in self.failing:
+            raise ConnectionError("Connection reset by peer")
+        if psr_type not in ("B05", "B18"):
+            context.status_code = 400
+            return NO_MATCHING_DATA
+        return resource_string(
+            "parsers.test.mocks", f"ENTSOE_DK_units_{psr_type}.xml"
+        ).decode()
+
+    def test_fetch_production_per_units(self):
+        with LogCapture("parsers.ENTSOE") as log:
+            data = ENTSOE.fetch_production_per_units(
+                "DK-DK1", self.session, arrow.get("2022-03-15T12:00Z").datetime
+            )
+        log.check(
+            (
+                "parsers.ENTSOE",
+                "WARNING",
+                "Unknown unit Mystery with id 45V0000000000999",
+            )
+        )
+        self.assertEqual(len(self.adapter.request_history), 20)
+        self.assertEqual(
+            [(d["unitName"], d["datetime"].strftime("%H:%M")) for d in data],
+            [("Fynsvaerket 7", "10:00"), ("Fynsvaerket 7", "11:00")]
+            + [
+                ("Anholt", f"{h}:{m}")
+                for h, m in [(10, "00"), (10, 15), (10, 30), (10, 45), (11, "00")]
+            ],
+        )
+        self.assertEqual(
+            data[0],
+            {
+                "datetime": arrow.get("2022-03-15T10:00Z").datetime,
+                "production": 123.4,
+                "productionType": "coal",
+                "unitKey": "45V000000000008Z",
+                "unitName": "Fynsvaerket 7",
+                "source": "entsoe.eu",
+                "zoneKey": "DK-DK1",
+            },
+        )
+        # overlapping series of a unit are summed
+        self.assertEqual(
+            [d["production"] for d in data[2:]], [350.5, 352.25, 359.1, 360, 30.3]
+        )
+        self.assertEqual(data[2]["productionType"], "wind")
+
+    def test_zones_of_a_domain_share_queries(self):
+        target_datetime = arrow.get("2022-03-15T12:00Z").datetime
+        ENTSOE.fetch_production_per_units("DK-DK1", self.session, target_datetime)
+        data = ENTSOE.fetch_production_per_units(
+            "DK-DK2", self.session, target_datetime
+        )
+        self.assertEqual(len(self.adapter.request_history), 20)
+        self.assertEqual({d["unitName"] for d in data}, {"Roedsand 2"})
+        self.assertEqual([d["production"] for d in data], [180, 181.4, 179.9, 175])
+
+    def test_aggregates_keep_their_zone_key(self):
+        with patch.dict(ENTSOE.ZONE_KEY_AGGREGATES, {"DK": ["DK-DK1", "DK-DK2"]}):
+            data = ENTSOE.fetch_production_per_units(
+                "DK", self.session, arrow.get("2022-03-15T12:00Z").datetime
+            )
+        self.assertEqual(
+            {d["unitName"] for d in data}, {"Fynsvaerket 7", "Anholt", "Roedsand 2"}
+        )
+        self.assertEqual({d["zoneKey"] for d in data}, {"DK"})
+
+    def test_failed_queries_are_skipped(self):
+        self.failing.add("B18")
+        target_datetime = arrow.get("2022-03-15T12:00Z").datetime
+        with LogCapture("parsers.ENTSOE", level=WARNING) as log:
+            data = ENTSOE.fetch_production_per_units(
+                "DK-DK1", self.session, target_datetime
+            )
+        self.assertIn(
+            (
+                "parsers.ENTSOE",
+                "WARNING",
+                "Failed to fetch units of B18 in 10Y1001A1001A796: "
+                "ConnectionError('Connection reset by peer')",
+            ),
+            log.actual(),
+        )
+        self.assertEqual({d["unitName"] for d in data}, {"Fynsvaerket 7"})
+        # the incomplete table isn't cached
+        self.failing.clear()
+        data = ENTSOE.fetch_production_per_units(
+            "DK-DK1", self.session, target_datetime
+        )
+        self.assertEqual(len(self.adapter.request_history), 40)
+        self.assertEqual({d["unitName"] for d in data}, {"Fynsvaerket 7", "Anholt"})
+
+
+class TestExchanges(unittest.TestCase):
+    # MW flowing into each domain
+    FLOWS = {"10YBE----------2": 300, "10YNL----------L": 100}
+
+    def setUp(self):
+        self.session = Session()
+        self.adapter = Adapter()
+        self.session.mount("https://", self.adapter)
+        self.adapter.register_uri("GET", ENTSOE.ENTSOE_ENDPOINT, text=self.respond)
+        for patcher in [
+            patch.object(ENTSOE, "SERIES_BUFFERS", {}),
+            patch.dict(os.environ, {"ENTSOE_TOKEN": "token"}),
+        ]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def respond(self, request, context) -> str:
+        quantity = self.FLOWS[request.qs["in_domain"][0].upper()]
+        return f"""<?xml version="1.0" encoding="UTF-8"?>
+<Publication_MarketDocument xmlns="urn:iec62325.351:tc57wg16:451-3:publicationdocument:7:0">
+    <TimeSeries>
+        <Period>
+            <timeInterval><start>2022-03-15T10:00Z</start><end>2022-03-15T11:00Z</end></timeInterval>
+            <resolution>PT60M</resolution>
+            <Point><position>1</position><quantity>{quantity}</quantity></Point>
+        </Period>
+    </TimeSeries>
+</Publication_MarketDocument>
+"""
+
+    def test_net_flows_follow_the_sorted_key(self):
+        target_datetime = arrow.get("2022-03-15T12:00Z").datetime
+        for zone_key1, zone_key2 in [("BE", "NL"), ("NL", "BE")]:
+            data = ENTSOE.fetch_exchange(
+                zone_key1, zone_key2, self.session, target_datetime
+            )
+            self.assertEqual(
+                [(d["sortedZoneKeys"], d["netFlow"]) for d in data],
+                [("BE->NL", -200)],
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+
+from freezegun import freeze_time
+from pkg_resources import resource_string
+from requests import Session
+from requests_mock import ANY, Adapter
+
+from parsers import GE
+from parsers.lib.excel import ExcelReader
+
+
+class TestGE(unittest.TestCase):
+    def setUp(self):
+        self.session = Session()
+        self.adapter = Adapter()
+        self.session.mount("https://", self.adapter)
+        self.adapter.register_uri(
+            ANY,
+            ANY,
+            content=resource_string("parsers.test.mocks", "GE_diagram.xlsx"),
+        )
+        patcher = patch.object(GE, "EXCEL", ExcelReader())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @freeze_time("2022-03-05 12:00:00")
+    def test_fetch_historical_production(self):
+        data = GE.fetch_production(
+            session=self.session, target_datetime=datetime(2022, 3, 1, 12)
+        )
+        self.assertEqual(len(data), 24)
+        self.assertEqual(data[0]["datetime"].isoformat(), "2022-03-01T00:00:00+04:00")
+        self.assertEqual(
+            data[0]["production"], {"gas": 500, "hydro": 1000, "wind": 20, "solar": 0}
+        )
+        self.assertEqual(data[12]["production"]["solar"], 5)
+        self.assertEqual(data[23]["production"]["hydro"], 1046)
+        self.assertIn("fromDate=2022-03-01T00", self.adapter.last_request.url)
+
+        # past days are downloaded once
+        GE.fetch_production(
+            session=self.session, target_datetime=datetime(2022, 3, 1, 18)
+        )
+        self.assertEqual(len(self.adapter.request_history), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -19,7 +19,7 @@ class Test_IN_HP(unittest.TestCase):
 
     def test_fetch_production(self):
         try:
-            with LogCapture() as log:
+            with LogCapture("parsers.IN_HP") as log:
                 data = IN_HP.fetch_production("IN-HP", self.session)
                 self.assertEqual(data["zoneKey"], "IN-HP")
                 self.assertEqual(data["source"], "hpsldc.com")
@@ -0,0 +1,157 @@
+import unittest
+from unittest.mock import patch
+
+import arrow
+import pandas as pd
+from freezegun import freeze_time
+from pkg_resources import resource_string
+from requests import Session
+from requests_mock import Adapter
+
+from parsers import IN_WE
+
+TARGET_DATETIME = arrow.get(2022, 3, 15, tzinfo="Asia/Kolkata").datetime
+
+
+class TestINWE(unittest.TestCase):
+    def setUp(self):
+        self.session = Session()
+        self.adapter = Adapter()
+        self.session.mount("https://", self.adapter)
+        for kind in ["production", "exchange", "consumption"]:
+            self.adapter.register_uri(
+                "POST",
+                IN_WE.KIND_MAPPING[kind]["url"],
+                content=resource_string("parsers.test.mocks", f"IN_WE_{kind}.json"),
+            )
+        patcher = patch.object(IN_WE, "DAY_CACHE", IN_WE.OrderedDict())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_round_to_minute(self):
+        datetimes = pd.to_datetime(
+            pd.Series(
+                ["2022-15-03 01:05:29", "2022-15-03 01:05:30", "2022-15-03 12:59:45"]
+            ),
+            format="%Y-%d-%m %H:%M:%S",
+        )
+        self.assertEqual(
+            IN_WE.round_to_minute(datetimes).dt.strftime("%H:%M").tolist(),
+            ["01:05", "01:06", "13:00"],
+        )
+
+    def test_fetch_consumption(self):
+        data = IN_WE.fetch_consumption(
+            session=self.session, target_datetime=TARGET_DATETIME
+        )
+        self.assertEqual(len(data), 24)
+        self.assertEqual(data[13]["datetime"].hour, 13)
+        self.assertAlmostEqual(data[0]["consumption"], 13903.66)
+        self.assertAlmostEqual(data[13]["consumption"], 18105.837)
+
+    def test_fetch_exchange(self):
+        data = IN_WE.fetch_exchange(
+            "IN-NO", "IN-WE", session=self.session, target_datetime=TARGET_DATETIME
+        )
+        self.assertEqual(len(data), 24)
+        self.assertEqual(data[0]["sortedZoneKeys"], "IN-NO->IN-WE")
+        self.assertAlmostEqual(data[13]["netFlow"], 2015.095)
+
+    def test_fetch_production(self):
+        data = IN_WE.fetch_production(
+            session=self.session, target_datetime=TARGET_DATETIME
+        )
+        self.assertEqual(len(data), 24)
+        self.assertEqual(
+            set(data[13]["production"]), {"coal", "gas", "hydro", "nuclear"}
+        )
+        self.assertAlmostEqual(data[13]["production"]["nuclear"], 1251.87)
+
+    @freeze_time("2022-03-20")
+    def test_days_are_fetched_once_per_kind(self):
+        for _ in range(2):
+            IN_WE.fetch_exchange(
+                "IN-NO", "IN-WE", session=self.session, target_datetime=TARGET_DATETIME
+            )
+            IN_WE.fetch_exchange(
+                "IN-SO", "IN-WE", session=self.session, target_datetime=TARGET_DATETIME
+            )
+            IN_WE.fetch_consumption(
+                session=self.session, target_datetime=TARGET_DATETIME
+            )
+        self.assertEqual(self.adapter.call_count, 2)
+
+    @freeze_time("2022-03-20")
+    def test_range(self):
+        data = IN_WE.fetch_range(
+            "consumption",
+            TARGET_DATETIME,
+            arrow.get(TARGET_DATETIME).shift(days=2).datetime,
+            session=self.session,
+            zone_key="IN-WE",
+        )
+        self.assertEqual(len(data), 72)
+        self.assertEqual([dt["datetime"].day for dt in data[::24]], [15, 16, 17])
+        # one request per day
+        self.assertEqual(self.adapter.call_count, 3)
+        self.assertEqual(
+            [request.json() for request in self.adapter.request_history],
+            [{"date": "2022-03-15"}, {"date": "2022-03-16"}, {"date": "2022-03-17"}],
+        )
+
+    def test_current_day_is_refetched(self):
+        with freeze_time("2022-03-15 12:00") as frozen:
+            IN_WE.fetch_data(
+                kind="consumption",
+                session=self.session,
+                target_datetime=TARGET_DATETIME,
+            )
+            frozen.tick(IN_WE.CURRENT_DAY_TTL.total_seconds() - 1)
+            IN_WE.fetch_data(
+                kind="consumption",
+                session=self.session,
+                target_datetime=TARGET_DATETIME,
+            )
+            self.assertEqual(self.adapter.call_count, 1)
+            frozen.tick(2)
+            IN_WE.fetch_data(
+                kind="consumption",
+                session=self.session,
+                target_datetime=TARGET_DATETIME,
+            )
+            self.assertEqual(self.adapter.call_count, 2)
+
+    def test_day_fetched_before_midnight_is_refetched(self):
+        # 23:55 in India
+        with freeze_time("2022-03-15 18:25") as frozen:
+            IN_WE.fetch_data(
+                kind="consumption",
+                session=self.session,
+                target_datetime=TARGET_DATETIME,
+            )
+            # the day is over, its last points are fetched once
+            frozen.tick(IN_WE.CURRENT_DAY_TTL.total_seconds() + 60)
+            for _ in range(2):
+                IN_WE.fetch_data(
+                    kind="consumption",
+                    session=self.session,
+                    target_datetime=TARGET_DATETIME,
+                )
+            frozen.tick(IN_WE.CURRENT_DAY_TTL.total_seconds() + 60)
+            IN_WE.fetch_data(
+                kind="consumption",
+                session=self.session,
+                target_datetime=TARGET_DATETIME,
+            )
+        self.assertEqual(self.adapter.call_count, 2)
+
+    @freeze_time("2022-03-15 20:00")
+    def test_days_are_indian_days(self):
+        # 01:30 on the 16th in India
+        data = IN_WE.fetch_consumption(session=self.session)
+        self.assertEqual(self.adapter.last_request.json(), {"date": "2022-03-16"})
+        self.assertEqual(data[0]["datetime"].day, 16)
+
+
+if __name__ == "__main__":
+    unittest.main()
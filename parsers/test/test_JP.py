@@ -0,0 +1,101 @@
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+
+import pandas as pd
+from freezegun import freeze_time
+from pkg_resources import resource_string
+from requests import Session
+from requests_mock import ANY, Adapter
+
+from parsers import JP
+from parsers.lib.exceptions import ParserException
+
+
+def fake_exchange(zone_key1, zone_key2, session=None, target_datetime=None):
+    # No flows, so that production is consumption minus solar
+    return [
+        {
+            "datetime": dt.to_pydatetime(),
+            "sortedZoneKeys": "->".join(sorted([zone_key1, zone_key2])),
+            "netFlow": 0.0,
+            "source": "occtonet.occto.or.jp",
+        }
+        for dt in pd.date_range("2022-03-01", periods=288, freq="5min", tz="Asia/Tokyo")
+    ]
+
+
+class TestJP(unittest.TestCase):
+    def setUp(self) -> None:
+        JP.CYCLE_CACHE.clear()
+        self.session = Session()
+        self.adapter = Adapter()
+        self.session.mount("http://", self.adapter)
+        self.session.mount("https://", self.adapter)
+        self.adapter.register_uri(
+            ANY,
+            JP.get_consumption_url("JP-CG", "20220301"),
+            content=resource_string("parsers.test.mocks", "JP_juyo_07_20220301.csv"),
+        )
+        self.adapter.register_uri(
+            ANY,
+            "http://www.jepx.org/market/excel/spot_2021.csv",
+            content=resource_string("parsers.test.mocks", "JP_spot_2021.csv"),
+        )
+
+    def test_parse_area_csv(self):
+        area_csv = JP.parse_area_csv(
+            resource_string("parsers.test.mocks", "JP_juyo_07_20220301.csv").decode(
+                "shift-jis"
+            )
+        )
+        self.assertEqual(len(area_csv.hourly), 24)
+        self.assertEqual(
+            list(area_csv.five_minutes.columns), ["datetime", "cons", "solar"]
+        )
+        # Rows without values yet are dropped
+        self.assertEqual(len(area_csv.five_minutes), 145)
+        self.assertEqual(
+            area_csv.five_minutes["datetime"].iloc[0].isoformat(),
+            "2022-02-28T15:00:00+00:00",
+        )
+        self.assertEqual(area_csv.five_minutes["cons"].iloc[0], 4950.0)
+
+    def test_parse_area_csv_unexpected_layout(self):
+        text = resource_string("parsers.test.mocks", "JP_juyo_07_20220301.csv").decode(
+            "shift-jis"
+        )
+        # cut before the hourly table, and an empty file
+        for truncated in ["\n".join(text.splitlines()[:10]), ""]:
+            with self.assertRaisesRegex(ParserException, "unexpected CSV layout"):
+                JP.parse_area_csv(truncated, "JP-CG")
+
+    @freeze_time("2022-03-01 04:00:00")
+    @patch("parsers.JP.occtonet.fetch_exchange", fake_exchange)
+    def test_production_and_forecast_share_the_area_csv(self):
+        production = JP.fetch_production("JP-CG", session=self.session)
+        forecast = JP.fetch_consumption_forecast("JP-CG", session=self.session)
+
+        self.assertEqual(len(self.adapter.request_history), 1)
+        self.assertEqual(len(production), 145)
+        self.assertIsInstance(production[-1]["datetime"], datetime)
+        self.assertEqual(
+            production[-1]["datetime"].isoformat(), "2022-03-01T03:00:00+00:00"
+        )
+        self.assertEqual(production[-1]["production"]["solar"], 3000.0)
+        self.assertEqual(production[-1]["production"]["unknown"], 5980.0)
+        self.assertEqual(len(forecast), 24)
+        self.assertEqual(forecast[0]["value"], 5000.0)
+
+    def test_fetch_price(self):
+        target_datetime = datetime(2022, 3, 1, 12)
+        prices = JP.fetch_price(
+            "JP-CG", session=self.session, target_datetime=target_datetime
+        )
+        JP.fetch_price("JP-KY", session=self.session, target_datetime=target_datetime)
+
+        self.assertEqual(len(self.adapter.request_history), 1)
+        self.assertEqual(len(prices), 96)
+        self.assertEqual(prices[0]["datetime"].isoformat(), "2022-02-27T15:00:00+00:00")
+        self.assertEqual(prices[0]["price"], 27000)
+        self.assertEqual(prices[-1]["price"], 16290)
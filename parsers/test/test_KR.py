@@ -0,0 +1,43 @@
+import unittest
+
+import arrow
+from pkg_resources import resource_string
+from requests import Session
+from requests_mock import ANY, Adapter
+
+from parsers import KR
+
+
+class TestKRLongTermProduction(unittest.TestCase):
+    def setUp(self):
+        self.session = Session()
+        self.adapter = Adapter()
+        self.session.mount("https://", self.adapter)
+        # the CSRF token is set by the first request
+        self.session.cookies.set("XSRF-TOKEN", "token")
+        self.adapter.register_uri("GET", ANY, text="")
+        self.adapter.register_uri(
+            "POST",
+            KR.LONG_TERM_PRODUCTION_URL,
+            content=resource_string("parsers.test.mocks", "KR_powerSource.html"),
+        )
+
+    def test_fetch_production(self):
+        data = KR.fetch_production(
+            session=self.session,
+            target_datetime=arrow.get(2022, 3, 14, tzinfo=KR.TIMEZONE).datetime,
+        )
+        self.assertEqual(len(data), 288)
+        self.assertEqual(self.adapter.last_request.text.count("_csrf=token"), 1)
+        self.assertEqual(data[0]["datetime"].isoformat(), "2022-03-14T00:00:00+09:00")
+        self.assertEqual(data[-1]["datetime"].isoformat(), "2022-03-14T23:55:00+09:00")
+        # other and renewable are unknown, thousands separators are removed
+        self.assertEqual(
+            data[0]["production"],
+            {"unknown": -244 + 4997, "gas": 21843, "coal": 24221, "nuclear": 18335},
+        )
+        self.assertEqual(data[0]["source"], "https://new.kpx.or.kr")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import os
+import unittest
+from datetime import datetime
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+from freezegun import freeze_time
+from pkg_resources import resource_string
+from requests import Session
+from requests_mock import Adapter
+
+from parsers import MX
+
+
+class TestMXProduction(unittest.TestCase):
+    def setUp(self):
+        self.session = Session()
+        self.adapter = Adapter()
+        self.session.mount("https://", self.adapter)
+        self.adapter.register_uri(
+            "POST",
+            MX.MX_PRODUCTION_URL,
+            content=resource_string(
+                "parsers.test.mocks", "MX_EnergiaGenLiqAgregada.csv"
+            ),
+            headers={"Content-Type": "application/octet-stream"},
+        )
+        self.tmp_dir = TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        for patcher in [
+            patch.dict(os.environ, {"PARSER_CACHE_DIR": self.tmp_dir.name}),
+            patch.object(MX, "DATA_CACHE", MX.OrderedDict()),
+        ]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    @freeze_time("2022-01-01")
+    def test_fetch_production(self):
+        data = MX.fetch_production("MX", self.session, datetime(2019, 7, 1))
+        # one row per hour and system
+        self.assertEqual(len(data), 3 * 24 * 2)
+        self.assertEqual(data[0]["datetime"].isoformat(), "2019-07-01T00:00:00-06:00")
+        self.assertEqual(data[-1]["datetime"].isoformat(), "2019-07-03T23:00:00-06:00")
+        production = data[0]["production"]
+        self.assertEqual(set(production), set(MX.PRODUCTION_MODES))
+        self.assertAlmostEqual(production["wind"], 428.246)
+        # "Ciclo Combinado" and "Turbo Gas"
+        self.assertAlmostEqual(production["gas"], 470.643 + 1956.141)
+        # "Combustion Interna", "Termica Convencional" and unmapped "Otros"
+        self.assertAlmostEqual(production["unknown"], 3672.886 + 568.360 + 2583.701)
+        self.assertEqual(production["oil"], 0)
+
+    @freeze_time("2022-01-01")
+    def test_past_months_are_cached_on_disk(self):
+        data = MX.fetch_production("MX", self.session, datetime(2019, 7, 1))
+        MX.DATA_CACHE.clear()
+        cached = MX.fetch_production("MX", self.session, datetime(2019, 7, 15))
+        self.assertEqual(len(self.adapter.request_history), 1)
+        self.assertEqual(cached, data)
+        self.assertIsInstance(cached[0]["datetime"].tzinfo, MX.tz.tzoffset)
+
+    @freeze_time("2019-07-04")
+    def test_current_month_is_refetched(self):
+        MX.fetch_production("MX", self.session, datetime(2019, 7, 1))
+        MX.fetch_production("MX", self.session, datetime(2019, 7, 2))
+        self.assertEqual(len(self.adapter.request_history), 1)
+        with freeze_time("2019-07-04 02:00"):
+            MX.fetch_production("MX", self.session, datetime(2019, 7, 3))
+        self.assertEqual(len(self.adapter.request_history), 2)
+        # the current month is never written to disk
+        self.assertEqual(os.listdir(self.tmp_dir.name), [])
+
+    @freeze_time("2022-01-01")
+    def test_cached_months_are_copied(self):
+        df = MX.get_month_data(datetime(2019, 7, 1), self.session)
+        df.drop(df.index, inplace=True)
+        self.assertFalse(MX.get_month_data(datetime(2019, 7, 1), self.session).empty)
+        self.assertEqual(len(self.adapter.request_history), 1)
+
+    def test_months_are_final_after_the_publication_delay(self):
+        # 23:30 on the last day of the month in Mexico
+        with freeze_time("2019-08-01 05:30"):
+            MX.fetch_production("MX", self.session, datetime(2019, 7, 31))
+        # the month is over, but its last points may still be published
+        with freeze_time("2019-08-01 06:40"):
+            MX.fetch_production("MX", self.session, datetime(2019, 7, 31))
+        self.assertEqual(len(self.adapter.request_history), 2)
+        self.assertEqual(os.listdir(self.tmp_dir.name), [])
+        with freeze_time("2019-08-09"):
+            MX.fetch_production("MX", self.session, datetime(2019, 7, 31))
+            MX.fetch_production("MX", self.session, datetime(2019, 7, 31))
+        self.assertEqual(len(self.adapter.request_history), 3)
+        self.assertEqual(
+            os.listdir(os.path.join(self.tmp_dir.name, "MX")), ["2019-07.parquet"]
+        )
+
+    @freeze_time("2022-01-01")
+    def test_memory_cache_is_bounded(self):
+        with patch.object(MX, "DATA_CACHE_SIZE", 2):
+            for month in [1, 2, 3]:
+                MX.fetch_production("MX", self.session, datetime(2019, month, 1))
+        self.assertEqual(list(MX.DATA_CACHE), ["2019-02", "2019-03"])
+
+
+if __name__ == "__main__":
+    unittest.main()
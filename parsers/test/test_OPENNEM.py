@@ -1,11 +1,38 @@
+import json
 import unittest
 from datetime import datetime
+from unittest.mock import MagicMock
 
 import arrow
 import numpy as np
 import pandas as pd
 
-from parsers.OPENNEM import filter_production_objs, process_solar_rooftop, sum_vector
+from parsers.OPENNEM import (
+    datasets_to_df,
+    fetch_network,
+    fetch_production,
+    filter_production_objs,
+    process_solar_rooftop,
+    sum_categories,
+    sum_vector,
+)
+
+
+def make_dataset(name, start, interval, data):
+    return {
+        "id": f"au.nem.nsw1.fuel_tech.{name}.power",
+        "type": "power",
+        "data_type": "power",
+        "region": "NSW1",
+        "history": {
+            "start": start,
+            "last": (
+                arrow.get(start).shift(minutes=int(interval[:-1]) * (len(data) - 1))
+            ).isoformat(),
+            "interval": interval,
+            "data": data,
+        },
+    }
 
 
 class TestOPENNEM(unittest.TestCase):
@@ -66,6 +93,98 @@ class TestOPENNEM(unittest.TestCase):
         assert sum_solar_ignore_nans == sum(values_solar[:1])
         assert sum_wind == sum(values_wind)
 
+    def test_sum_categories(self):
+        emap_to_parser = {
+            "coal": ["COAL_a", "COAL_b"],
+            "solar": ["SOLAR_1", "SOLAR_2"],
+            "wind": ["WIND"],
+            "hydro": ["HYDRO"],
+        }
+        columns = ["COAL_a", "COAL_b", "SOLAR_1", "SOLAR_2", "WIND"]
+        values = np.array([[1, 2, 4, np.nan, 1], [3, 4, 5, 6, np.nan]])
+
+        sums = sum_categories(values, columns, emap_to_parser)
+        for row, row_sums in zip(values, sums):
+            row = pd.Series(row, index=columns)
+            for category, keys in emap_to_parser.items():
+                expected = sum_vector(row, keys)
+                total = row_sums[list(emap_to_parser).index(category)]
+                if expected is None:
+                    assert np.isnan(total)
+                else:
+                    assert total == expected
+
+        sums_ignore_nans = sum_categories(
+            values[0], columns, emap_to_parser, ignore_nans=True
+        )
+        assert sums_ignore_nans[1] == 4
+
+    def test_datasets_to_df(self):
+        datasets = [
+            make_dataset("coal_black", "2021-01-01T10:00:00+10:00", "5m", [1, 2, 3]),
+            make_dataset("solar_rooftop", "2021-01-01T10:00:00+10:00", "30m", [4]),
+            make_dataset("wind", "2021-01-01T10:05:00+10:00", "5m", [5, None]),
+            make_dataset("wind", "2021-01-01T10:05:00+10:00", "5m", [6, 7]),
+        ]
+        df = datasets_to_df(datasets)
+        assert df.index.equals(
+            pd.date_range(start="2021-01-01 00:00:00+00:00", periods=3, freq="5min")
+        )
+        assert list(df.columns) == ["COAL_BLACK", "SOLAR_ROOFTOP", "WIND"]
+        np.testing.assert_array_equal(
+            df.to_numpy(),
+            [[1, 4, np.nan], [2, np.nan, 5], [3, np.nan, np.nan]],
+        )
+
+    def test_fetch_production(self):
+        with open("parsers/test/mocks/OPENNEM_latest.json") as f:
+            payload = json.load(f)
+        session = MagicMock()
+        session.get.return_value.json.return_value = payload
+
+        data = fetch_production("AUS-SA", session=session)
+        assert len(data) == 4
+        assert data[0]["zoneKey"] == "AUS-SA"
+        assert data[0]["datetime"] == arrow.get("2021-09-01T00:00:00Z").datetime
+        assert set(data[0]["production"]) == {
+            "coal",
+            "gas",
+            "oil",
+            "hydro",
+            "wind",
+            "biomass",
+            "solar",
+        }
+        assert data[0]["production"]["coal"] is None
+        assert data[0]["production"]["oil"] == 0
+        assert data[0]["capacity"]["wind"] == 1260.0
+        # Discharging is reported negatively, charging positively
+        assert data[0]["storage"]["battery"] < 0
+        assert data[0]["storage"]["hydro"] is None
+
+    def test_fetch_network(self):
+        with open("parsers/test/mocks/OPENNEM_latest.json") as f:
+            payload = json.load(f)
+        session = MagicMock()
+        session.get.return_value.json.return_value = payload
+
+        events = fetch_network("NEM", session=session)
+        # The whole network is served from a single download
+        session.get.assert_called_once()
+        assert sorted(events["production"]) == [
+            "AUS-NSW",
+            "AUS-QLD",
+            "AUS-SA",
+            "AUS-TAS",
+            "AUS-VIC",
+        ]
+        assert sorted(events["price"]) == sorted(events["production"])
+        assert len(events["exchange"]) == 4
+        assert events["production"]["AUS-SA"] == fetch_production(
+            "AUS-SA", session=session
+        )
+        assert events["exchange"]["AUS-TAS->AUS-VIC"][0]["netFlow"] == 580.347
+
     def test_filter_production_objs(self):
         now = arrow.utcnow()
         objs = [
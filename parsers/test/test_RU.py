@@ -0,0 +1,77 @@
+import unittest
+from threading import Barrier
+
+from freezegun import freeze_time
+from pkg_resources import resource_string
+from requests import Session
+from requests_mock import ANY, Adapter
+
+from parsers import RU
+
+
+def read_mock(request, context):
+    if "GenEquipOptions_Z2" in request.url:
+        return resource_string("parsers.test.mocks", "RU_GenEquipOptions_Z2.json")
+    price_zone = request.qs["pricezone[]"][0]
+    return resource_string(
+        "parsers.test.mocks", f"RU_PowerGeneration_{price_zone}.json"
+    )
+
+
+@freeze_time("2021-06-15 20:00")
+class TestRUProduction(unittest.TestCase):
+    def setUp(self):
+        self.session = Session()
+        self.adapter = Adapter()
+        self.session.mount("https://", self.adapter)
+        self.adapter.register_uri(ANY, ANY, content=read_mock)
+
+    def test_subzones(self):
+        data = RU.fetch_production("RU-1", self.session)
+        # datapoints up to an hour ago
+        self.assertEqual(len(data), 23)
+        self.assertEqual(data[0]["datetime"].isoformat(), "2021-06-15T00:00:00+03:00")
+        self.assertEqual(data[3]["production"]["solar"], 0)
+        data = RU.fetch_production("RU-AS", self.session)
+        self.assertEqual(len(data), 23)
+        self.assertEqual(data[5]["production"]["unknown"], 0)
+
+    def test_sum_of_subzones(self):
+        subzones = [
+            RU.fetch_production(subzone_key, self.session)
+            for subzone_key in RU.SUBZONES
+        ]
+        data = RU.fetch_production("RU", self.session)
+        # RU-AS is hourly, so only whole hours are complete
+        self.assertEqual(len(data), 23)
+        for i, datapoint in enumerate(data):
+            self.assertEqual(datapoint["datetime"], subzones[0][i]["datetime"])
+            for mode in ["hydro", "nuclear", "unknown"]:
+                self.assertAlmostEqual(
+                    datapoint["production"][mode],
+                    sum(subzone[i]["production"][mode] for subzone in subzones),
+                )
+            # unknown values count as 0
+            self.assertEqual(datapoint["production"]["biomass"], 0)
+        self.assertEqual(
+            data[0]["production"]["solar"],
+            subzones[0][0]["production"]["solar"]
+            + subzones[1][0]["production"]["solar"],
+        )
+        self.assertEqual(data[0]["zoneKey"], "RU")
+        self.assertEqual(data[0]["source"], "so-ups.ru")
+
+    def test_subzones_are_fetched_concurrently(self):
+        # every request waits until all sub-zones have been requested
+        barrier = Barrier(len(RU.SUBZONES), timeout=5)
+
+        def wait_for_all(request, context):
+            barrier.wait()
+            return read_mock(request, context)
+
+        self.adapter.register_uri(ANY, ANY, content=wait_for_all)
+        self.assertEqual(len(RU.fetch_production("RU", self.session)), 23)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+import unittest
+from datetime import datetime
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from freezegun import freeze_time
+from pkg_resources import resource_string
+from requests import Session
+from requests_mock import ANY, Adapter
+
+from parsers import US_CA
+
+
+class TestUSCA(unittest.TestCase):
+    def setUp(self) -> None:
+        self.session = Session()
+        self.adapter = Adapter()
+        self.session.mount("http://", self.adapter)
+        self.session.mount("https://", self.adapter)
+
+    @freeze_time("2022-11-06 12:00:00")
+    def test_fetch_production(self):
+        fuel_source = resource_string("parsers.test.mocks", "US_CA_fuelsource.csv")
+        self.adapter.register_uri(ANY, ANY, content=fuel_source)
+
+        production = US_CA.fetch_production(session=self.session)
+
+        self.assertEqual(len(production), 288)
+        first = production[0]
+        self.assertIsInstance(first["datetime"], datetime)
+        self.assertEqual(first["datetime"].isoformat(), "2022-11-06T00:00:00-07:00")
+        self.assertEqual(first["production"]["solar"], 0.0)
+        self.assertEqual(first["production"]["wind"], 3009.0)
+        self.assertEqual(first["production"]["biomass"], 498.0)
+        self.assertEqual(first["production"]["hydro"], 2864.0)
+        self.assertEqual(first["storage"]["battery"], 2.0)
+
+    @freeze_time("2022-11-06 12:00:00")
+    def test_fetch_exchange(self):
+        fuel_source = resource_string("parsers.test.mocks", "US_CA_fuelsource.csv")
+        self.adapter.register_uri(ANY, ANY, content=fuel_source)
+
+        exchange = US_CA.fetch_exchange("US-CA", "US", session=self.session)
+
+        self.assertEqual(len(exchange), 288)
+        self.assertEqual(exchange[-1]["sortedZoneKeys"], "US->US-CA")
+        self.assertEqual(exchange[-1]["netFlow"], 7203.0)
+
+    def test_fetch_historical_production(self):
+        renewables_watch = resource_string(
+            "parsers.test.mocks", "US_CA_DailyRenewablesWatch.txt"
+        )
+        self.adapter.register_uri(ANY, ANY, content=renewables_watch)
+
+        production = US_CA.fetch_production(
+            session=self.session, target_datetime=datetime(2020, 3, 1, 12)
+        )
+
+        self.assertEqual(len(production), 24)
+        self.assertEqual(len(self.adapter.request_history), 1)
+        self.assertIsInstance(production[4]["datetime"], datetime)
+        self.assertEqual(
+            production[4]["datetime"].isoformat(), "2020-03-01T05:00:00-08:00"
+        )
+        self.assertEqual(production[4]["production"]["nuclear"], 0)
+        self.assertEqual(production[4]["production"]["gas"], 5780.0)
+
+    @freeze_time("2020-03-10 12:00:00")
+    def test_fetch_historical_data_range(self):
+        renewables_watch = resource_string(
+            "parsers.test.mocks", "US_CA_DailyRenewablesWatch.txt"
+        )
+        self.adapter.register_uri(ANY, ANY, content=renewables_watch)
+
+        with TemporaryDirectory() as cache_dir:
+            production, exchange = US_CA.fetch_historical_data_range(
+                datetime(2020, 3, 1, 12),
+                datetime(2020, 3, 3, 12),
+                session=self.session,
+                cache_dir=Path(cache_dir),
+            )
+            self.assertEqual(len(self.adapter.request_history), 3)
+            self.assertEqual(len(production), 72)
+            self.assertEqual(len(exchange), 72)
+            self.assertEqual(
+                production[-1]["datetime"].isoformat(), "2020-03-04T00:00:00-08:00"
+            )
+            self.assertEqual(
+                sorted(path.name for path in Path(cache_dir).iterdir())[:2],
+                [
+                    "20200301_DailyRenewablesWatch.npz",
+                    "20200301_DailyRenewablesWatch.txt",
+                ],
+            )
+
+            # Past days are served from the cache
+            cached_production, cached_exchange = US_CA.fetch_historical_data_range(
+                datetime(2020, 3, 1, 12),
+                datetime(2020, 3, 3, 12),
+                session=self.session,
+                cache_dir=Path(cache_dir),
+            )
+            self.assertEqual(len(self.adapter.request_history), 3)
+            self.assertEqual(cached_production, production)
+            self.assertEqual(cached_exchange, exchange)
+
+    @freeze_time("2020-03-10 12:00:00")
+    def test_fetch_historical_data_range_skips_missing_days(self):
+        renewables_watch = resource_string(
+            "parsers.test.mocks", "US_CA_DailyRenewablesWatch.txt"
+        )
+        self.adapter.register_uri(ANY, ANY, content=renewables_watch)
+        self.adapter.register_uri(
+            ANY, US_CA.DAILY_RENEWABLES_WATCH_URL.format("20200302"), status_code=404
+        )
+
+        with TemporaryDirectory() as cache_dir:
+            production, _ = US_CA.fetch_historical_data_range(
+                datetime(2020, 3, 1, 12),
+                datetime(2020, 3, 3, 12),
+                session=self.session,
+                cache_dir=Path(cache_dir),
+            )
+            self.assertEqual(len(production), 48)
+            self.assertFalse(
+                Path(cache_dir, "20200302_DailyRenewablesWatch.txt").exists()
+            )
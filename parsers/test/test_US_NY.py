@@ -0,0 +1,81 @@
+import os
+import unittest
+from datetime import datetime
+from io import StringIO
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+import pandas as pd
+from freezegun import freeze_time
+from pkg_resources import resource_string
+from requests import Session
+from requests_mock import ANY, Adapter
+
+from parsers import US_NY
+
+
+class TestUSNY(unittest.TestCase):
+    def test_data_parser(self):
+        df = pd.read_csv(
+            StringIO(
+                resource_string("parsers.test.mocks", "US_NY_rtfuelmix.csv").decode()
+            )
+        )
+        datetimes, productions = US_NY.data_parser(df)
+
+        self.assertEqual(len(datetimes), 288)
+        self.assertEqual(datetimes[0].isoformat(), "2022-03-01T00:00:00-05:00")
+        self.assertEqual(datetimes[-1].isoformat(), "2022-03-01T23:55:00-05:00")
+        # Dual Fuel and Natural Gas are both mapped to gas
+        self.assertEqual(
+            productions[0],
+            {
+                "gas": 4673.0,
+                "hydro": 2982.0,
+                "nuclear": 3295.0,
+                "unknown": 293.0,
+                "wind": 444.0,
+            },
+        )
+        # Wind is missing at 00:35
+        self.assertNotIn("wind", productions[7])
+
+    def test_parse_timestamps_ambiguous(self):
+        datetimes = US_NY.parse_timestamps(
+            pd.Series(["11/06/2022 01:30:00", "11/06/2022 01:30", "11/06/2022 02:00"]),
+            pd.Series(["EDT", "EST", "EST"]),
+        )
+        self.assertEqual(
+            [dt.isoformat() for dt in datetimes],
+            [
+                "2022-11-06T01:30:00-04:00",
+                "2022-11-06T01:30:00-05:00",
+                "2022-11-06T02:00:00-05:00",
+            ],
+        )
+
+    @freeze_time("2022-03-05 12:00:00")
+    def test_fetch_production_range(self):
+        session = Session()
+        adapter = Adapter()
+        session.mount("http://", adapter)
+        adapter.register_uri(
+            ANY,
+            ANY,
+            content=resource_string("parsers.test.mocks", "US_NY_rtfuelmix.csv"),
+        )
+        adapter.register_uri(ANY, US_NY.MIX_URL.format("20220302"), status_code=404)
+
+        with TemporaryDirectory() as cache_dir, patch.dict(
+            os.environ, {"PARSER_CACHE_DIR": cache_dir}
+        ):
+            production = US_NY.fetch_production_range(
+                datetime(2022, 3, 1, 12), datetime(2022, 3, 3, 12), session=session
+            )
+            US_NY.fetch_production_range(
+                datetime(2022, 3, 1, 12), datetime(2022, 3, 3, 12), session=session
+            )
+
+        # The fixture is the same file for every day, and past days are cached
+        self.assertEqual(len(production), 288)
+        self.assertEqual(len(adapter.request_history), 4)
@@ -0,0 +1,58 @@
+import unittest
+
+from freezegun import freeze_time
+from pkg_resources import resource_string
+from requests import Session
+from requests_mock import ANY, Adapter
+
+from parsers import US_PJM
+
+
+@freeze_time("2022-06-01 22:00:00")
+class TestUSPJM(unittest.TestCase):
+    def setUp(self):
+        self.session = Session()
+        self.adapter = Adapter()
+        self.session.mount("http://", self.adapter)
+
+    def test_fetch_production(self):
+        self.adapter.register_uri(
+            ANY,
+            US_PJM.url,
+            content=resource_string(
+                "parsers.test.mocks", "US_PJM_markets_and_operations.html"
+            ),
+        )
+        data = US_PJM.fetch_production(session=self.session)
+        self.assertEqual(data["datetime"].isoformat(), "2022-06-01T15:05:00-04:00")
+        self.assertEqual(data["production"]["coal"], 29011.4)
+        self.assertEqual(data["production"]["nuclear"], 32560.7)
+        # Multiple Fuels, Other and Other Renewables
+        self.assertAlmostEqual(data["production"]["unknown"], 310.0 + 55.1 + 812.3)
+
+    def test_missing_generation_mix(self):
+        self.adapter.register_uri(
+            ANY, US_PJM.url, text='<div id="asOfDate">3:05 p.m.</div>'
+        )
+        with self.assertRaises(LookupError):
+            US_PJM.fetch_production(session=self.session)
+
+    def test_fetch_exchange(self):
+        self.adapter.register_uri(
+            ANY,
+            ANY,
+            content=resource_string("parsers.test.mocks", "US_PJM_InterfaceChart.html"),
+        )
+        data = US_PJM.fetch_exchange("US-NY", "US-PJM", session=self.session)
+        # the trailing null is dropped
+        self.assertEqual(len(data), 288)
+        self.assertEqual(data[0]["sortedZoneKeys"], "US-NY->US-PJM")
+        self.assertEqual(data[0]["datetime"].isoformat(), "2022-06-01T00:00:00-04:00")
+        self.assertEqual(data[-1]["datetime"].isoformat(), "2022-06-01T23:55:00-04:00")
+        # the four New York interfaces are summed
+        single = US_PJM.get_exchange_data("nyiso", session=self.session)
+        self.assertAlmostEqual(data[5]["netFlow"], 4 * single[5][0])
+
+
+if __name__ == "__main__":
+    unittest.main()
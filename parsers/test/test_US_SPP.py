@@ -8,6 +8,7 @@ from datetime import datetime
 from unittest.mock import patch
 
 from arrow import get
+from freezegun import freeze_time
 from pandas import read_pickle
 from testfixtures import LogCapture
 
@@ -69,6 +70,53 @@ class TestUSSPP(unittest.TestCase):
                 )
             )
 
+    def test_historical_market_and_self_columns(self):
+        fake_data = read_pickle("parsers/test/mocks/US_SPP_Gen_Mix.pkl").rename(
+            columns={
+                "GMT MKT Interval": "GMTTime",
+                " Coal": "Coal Market",
+                " Natural Gas": "Natural Gas Market",
+            }
+        )
+        fake_data["Coal Self"] = 100.0
+        fake_data["Gas Self"] = 10.0
+
+        with freeze_time("2019-06-01"), patch("parsers.US_SPP.get_data") as gd:
+            gd.return_value = fake_data
+            data = US_SPP.fetch_production(
+                target_datetime=get(2018, 7, 27, 11, 0).datetime,
+                logger=logging.getLogger("test"),
+            )
+
+        # the day up to the target datetime
+        self.assertEqual(len(data), 14)
+        self.assertEqual(data[-1]["datetime"], get(2018, 7, 27, 11, 0).datetime)
+        self.assertEqual(
+            data[0]["production"]["coal"], fake_data["Coal Market"][0] + 100
+        )
+        self.assertEqual(
+            data[0]["production"]["gas"], fake_data["Natural Gas Market"][0] + 10
+        )
+
+    def test_column_plan(self):
+        header = (
+            "GMT MKT Interval",
+            " Coal Market",
+            " Coal Self",
+            " Wind",
+            " Other",
+            "Load",
+            " Waste Heat",
+        )
+        plan = US_SPP.compile_column_plan(header)
+        # combined columns come after the others, as they used to
+        self.assertEqual(plan.modes, ("wind", "coal", "unknown"))
+        self.assertEqual(plan.sources, (3, 1, 2, 4, 6))
+        self.assertEqual(plan.starts, (0, 1, 3))
+        self.assertEqual(plan.warnings, ())
+        # plans are compiled once per header
+        self.assertIs(US_SPP.compile_column_plan(header), plan)
+
 
 if __name__ == "__main__":
     unittest.main(buffer=True)
@@ -0,0 +1,96 @@
+import json
+import unittest
+from datetime import datetime
+from urllib.parse import parse_qs
+
+from freezegun import freeze_time
+from pkg_resources import resource_string
+from requests import Session
+from requests_mock import ANY, Adapter
+
+from parsers import occtonet
+
+
+class TestOcctonet(unittest.TestCase):
+    def setUp(self) -> None:
+        occtonet.SWEEPS.clear()
+        self.session = Session()
+        self.adapter = Adapter()
+        self.session.mount("http://", self.adapter)
+        self.session.mount("https://", self.adapter)
+        self.updated = "2022/03/01 12:05"
+        self.csv = resource_string("parsers.test.mocks", "occtonet_CA01S070C.csv")
+        self.adapter.register_uri("GET", occtonet.LOGIN_URL, text="")
+        self.adapter.register_uri("POST", occtonet.EXCHANGE_URL, content=self.respond)
+
+    def respond(self, request, context) -> bytes:
+        form_data = {k: v[0] for k, v in parse_qs(request.text).items()}
+        step = form_data["fwExtention.actionSubType"]
+        if step == "download":
+            return self.csv
+        header = {
+            "msgArea": {"value": ""},
+            "searchReqHdn": {"value": ""},
+            "spcDayHdn": {"value": form_data["spcDay"]},
+            "updDaytime": {"value": self.updated},
+            "downloadKey": {"value": "key"},
+            "requestToken": {"value": "token"},
+        }
+        return json.dumps(
+            {"root": {"errMessage": "", "errFields": {}, "bizRoot": {"header": header}}}
+        ).encode()
+
+    def count_requests(self, method: str, url: str) -> int:
+        return sum(
+            1
+            for request in self.adapter.request_history
+            if request.method == method and request.url == url
+        )
+
+    @freeze_time("2022-03-01 04:00:00")
+    def test_fetch_exchange(self):
+        exchange = occtonet.fetch_exchange("JP-TH", "JP-TK", session=self.session)
+
+        self.assertEqual(len(exchange), 24)
+        self.assertEqual(exchange[0]["sortedZoneKeys"], "JP-TH->JP-TK")
+        self.assertEqual(exchange[0]["source"], "occtonet.occto.or.jp")
+        self.assertIsInstance(exchange[0]["datetime"], datetime)
+        self.assertEqual(
+            exchange[0]["datetime"].isoformat(), "2022-03-01T00:00:00+09:00"
+        )
+        self.assertEqual(exchange[0]["netFlow"], -22.0)
+        self.assertEqual(exchange[-1]["netFlow"], 445.0)
+
+    @freeze_time("2022-03-01 04:00:00")
+    def test_exchanges_share_a_daily_sweep(self):
+        reverted = occtonet.fetch_exchange("JP-TK", "JP-CB", session=self.session)
+        summed = occtonet.fetch_exchange("JP-CB", "JP-HR", session=self.session)
+        forecast = occtonet.fetch_exchange_forecast(
+            "JP-TH", "JP-TK", session=self.session
+        )
+
+        self.assertEqual(self.count_requests("GET", occtonet.LOGIN_URL), 1)
+        self.assertEqual(
+            self.count_requests("POST", occtonet.EXCHANGE_URL),
+            3 * len(occtonet.INTERCONNECTOR_IDS),
+        )
+        self.assertEqual(reverted[0]["netFlow"], 22.0)
+        self.assertEqual(summed[0]["netFlow"], -44.0)
+        self.assertEqual(len(forecast), 48)
+        self.assertEqual(forecast[0]["netFlow"], -57.0)
+
+    def test_unchanged_csvs_are_not_downloaded_again(self):
+        with freeze_time("2022-03-01 04:00:00"):
+            first = occtonet.fetch_exchange("JP-TH", "JP-TK", session=self.session)
+        with freeze_time("2022-03-01 04:30:00"):
+            occtonet.SWEEPS["2022/03/01"] = occtonet.SWEEPS["2022/03/01"]._replace(
+                fetched_at=0
+            )
+            second = occtonet.fetch_exchange("JP-TH", "JP-TK", session=self.session)
+
+        self.assertEqual(first, second)
+        # Headers were requested twice, but CSVs were downloaded only once
+        self.assertEqual(
+            self.count_requests("POST", occtonet.EXCHANGE_URL),
+            4 * len(occtonet.INTERCONNECTOR_IDS),
+        )
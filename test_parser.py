@@ -13,6 +13,8 @@ import arrow
 import click
 
 from electricitymap.contrib.config import ZoneKey
+from electricitymap.contrib.lib.event_store import ParquetEventStore
+from parsers.lib import tracing
 from parsers.lib.parsers import PARSER_KEY_TO_DICT
 from parsers.lib.quality import (
     ValidationError,
@@ -29,7 +31,18 @@ basicConfig(level=DEBUG, format="%(asctime)s %(levelname)-8s %(name)-30s %(messa
 @click.argument("zone")
 @click.argument("data-type", default="production")
 @click.option("--target_datetime", default=None, show_default=True)
-def test_parser(zone: ZoneKey, data_type, target_datetime):
+@click.option(
+    "--store",
+    default=None,
+    help="Directory of a Parquet event store the results are appended to",
+)
+@click.option(
+    "--trace",
+    type=click.Choice(["prometheus", "jsonl", "folded"]),
+    default=None,
+    help="Print the time spent per parser phase in the given format",
+)
+def test_parser(zone: ZoneKey, data_type, target_datetime, store, trace):
     """\b
     Parameters
     ----------
@@ -37,6 +50,9 @@ def test_parser(zone: ZoneKey, data_type, target_datetime):
     data_type: in ['production', 'exchangeForecast', 'production', 'exchange',
       'price', 'consumption', 'generationForecast', 'consumptionForecast']
     target_datetime: string parseable by arrow, such as 2018-05-30 15:00
+    store: directory of a Parquet event store the results are appended to
+    trace: print the time spent per parser phase, in 'prometheus', 'jsonl' or
+      'folded' (flame graph) format
     \b
     Examples
     -------
@@ -44,10 +60,14 @@ def test_parser(zone: ZoneKey, data_type, target_datetime):
     # >>> poetry run test_parser FR production
     # >>> poetry run test_parser "NO-NO3->SE" exchange
     # >>> poetry run test_parser GE production --target_datetime="2022-04-10 15:00"
+    # >>> poetry run test_parser FR production --store=data
+    # >>> poetry run test_parser FR production --trace=folded
 
     """
     if target_datetime:
         target_datetime = arrow.get(target_datetime).datetime
+    if trace:
+        tracing.enable()
     start = time.time()
 
     parser: Callable[
@@ -119,15 +139,28 @@ def test_parser(zone: ZoneKey, data_type, target_datetime):
         res = [res]
     for event in res:
         try:
-            if data_type == "production":
-                validate_production(event, zone)
-            elif data_type == "consumption":
-                validate_consumption(event, zone)
-            elif data_type == "exchange":
-                validate_exchange(event, zone)
+            with tracing.span("validation", zone_key=zone, data_type=data_type):
+                if data_type == "production":
+                    validate_production(event, zone)
+                elif data_type == "consumption":
+                    validate_consumption(event, zone)
+                elif data_type == "exchange":
+                    validate_exchange(event, zone)
         except ValidationError as e:
             logger.warning("Validation failed @ {}: {}".format(event["datetime"], e))
 
+    if store:
+        paths = ParquetEventStore(store).write(data_type, res)
+        print("stored {} events in {} files".format(len(res), len(paths)))
+
+    if trace:
+        exporters = {
+            "prometheus": tracing.to_prometheus,
+            "jsonl": tracing.to_jsonl,
+            "folded": tracing.to_folded,
+        }
+        print(exporters[trace](tracing.TRACER.clear()), end="")
+
 
 if __name__ == "__main__":
     # pylint: disable=no-value-for-parameter
@@ -1,4 +1,5 @@
 import json
+import math
 import unittest
 from pathlib import Path
 
@@ -132,6 +133,32 @@ class ConfigTestcase(unittest.TestCase):
             len(dk_neighbours), 1, "expected a few neighbours for DK-DK1"
         )
 
+    def test_generate_exchange_index(self):
+        exchanges = {
+            "DE->FR": {"capacity": [-3000, 2000]},
+            "AT->DE": {"parsers": {}},
+        }
+        index = config.generate_exchange_index(exchanges)
+        self.assertEqual(index.keys, ("AT->DE", "DE->FR"))
+        self.assertEqual(index.resolve("FR->DE"), (1, True))
+        self.assertEqual(index.resolve("ES->FR"), (-1, False))
+        self.assertEqual(index.capacities, (None, (-3000, 2000)))
+        self.assertEqual(index.lower_bounds[1:], (-3300, -math.inf))
+        self.assertEqual(index.upper_bounds[1:], (2200, math.inf))
+        self.assertEqual(index.orient("FR", "DE"), ("DE->FR", True))
+        self.assertEqual(index.orient("ES", "FR"), ("ES->FR", False))
+        self.assertTrue(index.is_within_capacity("FR->DE", 3300))
+        self.assertFalse(index.is_within_capacity("FR->DE", -2300))
+        self.assertTrue(index.is_within_capacity("AT->DE", 10**6))
+
+    def test_EXCHANGE_INDEX(self):
+        self.assertEqual(
+            set(config.EXCHANGE_INDEX.keys), set(config.EXCHANGES_CONFIG.keys())
+        )
+        exchange_id, reversed = config.EXCHANGE_INDEX.resolve("DK-DK2->DK-DK1")
+        self.assertTrue(reversed)
+        self.assertEqual(config.EXCHANGE_INDEX.keys[exchange_id], "DK-DK1->DK-DK2")
+
 
 if __name__ == "__main__":
     unittest.main(buffer=True)
@@ -0,0 +1,101 @@
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import numpy as np
+
+from electricitymap.contrib.lib.event_store import ParquetEventStore
+
+START = datetime(2022, 1, 1, tzinfo=timezone.utc)
+
+
+def production_events(zone_key, hours, gas=None):
+    return [
+        {
+            "zoneKey": zone_key,
+            "datetime": START + timedelta(hours=hour),
+            "production": {"gas": float(hour) if gas is None else gas},
+            "source": "mysource.com",
+        }
+        for hour in hours
+    ]
+
+
+class ParquetEventStoreTestcase(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.store = ParquetEventStore(self.tmp_dir.name)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_partitions(self):
+        events = production_events("FR", range(0, 48, 6))
+        events += production_events("DE", range(0, 24, 6))
+        paths = self.store.write("production", events)
+        self.assertEqual(len(paths), 3)
+        self.assertEqual(
+            self.store.zones("production"),
+            {"DE": ["2022-01-01"], "FR": ["2022-01-01", "2022-01-02"]},
+        )
+        self.assertEqual(
+            sorted(p.relative_to(self.tmp_dir.name).parent for p in paths),
+            [
+                Path("kind=production/zone=DE/day=2022-01-01"),
+                Path("kind=production/zone=FR/day=2022-01-01"),
+                Path("kind=production/zone=FR/day=2022-01-02"),
+            ],
+        )
+
+    def test_read_with_predicates(self):
+        self.store.write("production", production_events("FR", range(0, 48, 6)))
+        self.store.write("production", production_events("DE", range(0, 48, 6)))
+
+        batch = self.store.read(
+            "production",
+            zone_keys=["FR"],
+            start=START + timedelta(hours=12),
+            end="2022-01-02T06:00:00Z",
+        )
+        self.assertEqual(list(batch.labels["zoneKey"].unique()), ["FR"])
+        np.testing.assert_array_equal(batch.column("production.gas"), [12, 18, 24])
+        self.assertEqual(len(self.store.read("production")), 16)
+        self.assertEqual(len(self.store.read("consumption")), 0)
+
+    def test_upserts_are_idempotent(self):
+        self.store.write("production", production_events("FR", range(4)))
+        self.store.write("production", production_events("FR", range(4)))
+        self.store.write("production", production_events("FR", range(2), gas=-1.0))
+
+        batch = self.store.read("production", zone_keys=["FR"])
+        np.testing.assert_array_equal(batch.column("production.gas"), [-1, -1, 2, 3])
+
+        self.assertEqual(self.store.compact("production"), 3)
+        self.assertEqual(len(list(Path(self.tmp_dir.name).glob("**/*.parquet"))), 1)
+        compacted = self.store.read("production", zone_keys=["FR"])
+        self.assertEqual(compacted.to_dicts(), batch.to_dicts())
+
+        # Events written after compaction still take precedence
+        self.store.write("production", production_events("FR", [3], gas=0.0))
+        batch = self.store.read("production", zone_keys=["FR"])
+        np.testing.assert_array_equal(batch.column("production.gas"), [-1, -1, 2, 0])
+
+    def test_exchanges(self):
+        events = [
+            {
+                "sortedZoneKeys": "DE->FR",
+                "datetime": START,
+                "netFlow": 100.0,
+                "source": "mysource.com",
+            }
+        ]
+        self.store.write("exchange", events)
+        self.assertEqual(self.store.zones("exchange"), {"DE_FR": ["2022-01-01"]})
+        self.assertEqual(
+            self.store.read("exchange", zone_keys=["DE->FR"]).to_dicts(), events
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import unittest
+from datetime import datetime, timezone
+
+import numpy as np
+
+from electricitymap.contrib.lib.events import EventBatch
+from validators.sanity_checks import validate_positive_production
+
+PRODUCTION_EVENTS = [
+    {
+        "zoneKey": "FR",
+        "datetime": datetime(2022, 1, 1, 0, tzinfo=timezone.utc),
+        "production": {"gas": 100.0, "nuclear": None, "wind": 10.0},
+        "storage": {"hydro": -10.0},
+        "source": "mysource.com",
+    },
+    {
+        "zoneKey": "FR",
+        "datetime": datetime(2022, 1, 1, 1, tzinfo=timezone.utc),
+        "production": {"gas": -1.0, "nuclear": 800.0, "wind": None},
+        "storage": {"hydro": 5.0},
+        "source": "mysource.com",
+    },
+]
+
+
+class EventBatchTestcase(unittest.TestCase):
+    def test_production_round_trip(self):
+        batch = EventBatch.from_dicts("production", PRODUCTION_EVENTS)
+        self.assertEqual(len(batch), 2)
+        self.assertEqual(batch.datetimes.dtype, np.int64)
+        np.testing.assert_array_equal(batch.column("production.gas"), [100.0, -1.0])
+        self.assertTrue(np.isnan(batch.column("production.coal")).all())
+        self.assertEqual(batch.to_dicts(), PRODUCTION_EVENTS)
+
+    def test_unknown_mode(self):
+        events = [{**PRODUCTION_EVENTS[0], "production": {"fusion": 1.0}}]
+        with self.assertRaises(ValueError):
+            EventBatch.from_dicts("production", events)
+
+    def test_to_pandas_is_zero_copy(self):
+        batch = EventBatch.from_dicts("production", PRODUCTION_EVENTS)
+        df = batch.to_pandas()
+        self.assertTrue(np.shares_memory(df["production.gas"].to_numpy(), batch.values))
+        self.assertEqual(df["zoneKey"].dtype, "category")
+        # The layout is the one expected by validators
+        self.assertEqual(validate_positive_production(df).tolist(), [1, 0])
+        self.assertEqual(
+            EventBatch.from_pandas("production", df).to_dicts(), PRODUCTION_EVENTS
+        )
+
+    def test_to_arrow(self):
+        batch = EventBatch.from_dicts("production", PRODUCTION_EVENTS)
+        table = batch.to_arrow()
+        self.assertEqual(table.num_rows, 2)
+        self.assertEqual(
+            str(table.schema.field("datetime").type), "timestamp[ns, tz=UTC]"
+        )
+        self.assertEqual(
+            table.column("production.gas").chunk(0).buffers()[1].address,
+            batch.column("production.gas").ctypes.data,
+        )
+
+    def test_concat_exchanges(self):
+        events = [
+            {
+                "sortedZoneKeys": key,
+                "datetime": datetime(2022, 1, 1, tzinfo=timezone.utc),
+                "netFlow": flow,
+                "source": "mysource.com",
+            }
+            for key, flow in [("DE->FR", 10.0), ("BE->FR", -5.0)]
+        ]
+        batch = EventBatch.concat(
+            [EventBatch.from_dicts("exchange", [event]) for event in events]
+        )
+        self.assertEqual(batch.to_dicts(), events)
+        self.assertEqual(list(batch.labels["sortedZoneKeys"]), ["DE->FR", "BE->FR"])
+
+
+if __name__ == "__main__":
+    unittest.main()
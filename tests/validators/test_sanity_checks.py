@@ -2,6 +2,7 @@ import pandas as pd
 
 from electricitymap.contrib.config import EXCHANGES_CONFIG
 from validators.sanity_checks import (
+    net_flows_within_capacity,
     validate_exchange_netflow_doesnt_exceed_capacity,
     validate_exchange_netflow_is_plausible,
     validate_positive_production,
@@ -70,3 +71,27 @@ def test_validate_exchange_netflow_doesnt_exceed_capacity():
 
     res = validate_exchange_netflow_doesnt_exceed_capacity(events, "DK-DK1->DK-DK2")
     assert (res.values == [1, 1, 1, 0, 0]).all()
+
+
+def test_validate_exchange_netflow_doesnt_exceed_capacity_reversed():
+    events = pd.DataFrame([600, -590, 660, -649, -700], columns=["netFlow"])
+
+    res = validate_exchange_netflow_doesnt_exceed_capacity(events, "DK-DK2->DK-DK1")
+    assert (res.values == [1, 1, 1, 1, 0]).all()
+
+
+def test_validate_exchange_netflow_doesnt_exceed_capacity_unknown_exchange():
+    events = pd.DataFrame([0, 1e6, -1e6], columns=["netFlow"])
+
+    res = validate_exchange_netflow_doesnt_exceed_capacity(events, "XX->YY")
+    assert (res.values == [1, 1, 1]).all()
+
+
+def test_net_flows_within_capacity_mixed_exchanges():
+    events = pd.DataFrame([650, 650, 100, -700], columns=["netFlow"])
+    exchange_keys = pd.Series(
+        ["DK-DK1->DK-DK2", "DK-DK2->DK-DK1", "XX->YY", "DK-DK2->DK-DK1"]
+    )
+
+    res = net_flows_within_capacity(events, exchange_keys)
+    assert (res.values == [False, True, True, False]).all()
@@ -1,11 +1,43 @@
 from datetime import datetime
+from typing import Tuple
 
 import numpy as np
 import pandas as pd
 
-from electricitymap.contrib.config import EXCHANGES_CONFIG
+from electricitymap.contrib.config import EXCHANGE_INDEX
 from validators.lib.config import validator
 
+# Net flow bounds by exchange id, the last entry is for unknown exchanges
+EXCHANGE_LOWER_BOUNDS = np.array(EXCHANGE_INDEX.lower_bounds)
+EXCHANGE_UPPER_BOUNDS = np.array(EXCHANGE_INDEX.upper_bounds)
+
+
+def resolve_exchanges(exchange_keys: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Returns the exchange ids of a batch of exchange keys in either direction,
+    and the signs turning their net flows in the direction of the sorted keys.
+    Each distinct key is only looked up once.
+    """
+    keys, inverse = np.unique(exchange_keys.to_numpy(dtype=str), return_inverse=True)
+    resolved = [EXCHANGE_INDEX.resolve(key) for key in keys]
+    ids = np.array([exchange_id for exchange_id, _ in resolved], dtype=np.intp)
+    signs = np.array([-1.0 if reversed else 1.0 for _, reversed in resolved])
+    return ids[inverse], signs[inverse]
+
+
+def net_flows_within_capacity(
+    events: pd.DataFrame, exchange_keys: pd.Series
+) -> pd.Series:
+    """
+    Returns whether the net flows of a batch of exchanges, along their keys,
+    are within capacity. Exchanges without capacity are always within it.
+    """
+    ids, signs = resolve_exchanges(exchange_keys)
+    net_flows = events["netFlow"] * signs
+    return (EXCHANGE_LOWER_BOUNDS[ids] <= net_flows) & (
+        net_flows <= EXCHANGE_UPPER_BOUNDS[ids]
+    )
+
 
 @validator(kind="production")
 def validate_positive_production(events: pd.DataFrame) -> pd.Series:
@@ -78,14 +110,6 @@ def validate_exchange_netflow_doesnt_exceed_capacity(
     """
     Validates that exchanges doesn't exceed the interconnector capacity by more than 10%
     """
-    ALLOWED_MARGIN = 1.1
-    interconnector_capacities = EXCHANGES_CONFIG[zone_key].get(
-        "capacity", [-np.inf, np.inf]
-    )
-
-    res = (
-        (min(interconnector_capacities) * ALLOWED_MARGIN <= events["netFlow"])
-        & (events["netFlow"] <= max(interconnector_capacities) * ALLOWED_MARGIN)
-    ).astype(int)
-
+    exchange_keys = pd.Series(zone_key, index=events.index)
+    res = net_flows_within_capacity(events, exchange_keys).astype(int)
     return res